@@ -0,0 +1,44 @@
+"""Add holidays table for the working-day calendar
+
+Revision ID: 20261018hday
+Revises: 20261018ncoal
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018hday'
+down_revision: Union[str, None] = '20261018ncoal'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Global and per-project days off used by attendance analytics."""
+    op.create_table(
+        'holidays',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.uuid']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.uuid']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid')
+    )
+    op.create_index('idx_holidays_holiday_date', 'holidays', ['holiday_date'])
+
+
+def downgrade() -> None:
+    """Remove holidays."""
+    op.drop_index('idx_holidays_holiday_date', table_name='holidays')
+    op.drop_table('holidays')
@@ -0,0 +1,37 @@
+"""Add idempotency_key to khatabook_entries for batch uploads
+
+Revision ID: 20261018kbik
+Revises: 20261018sync
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018kbik'
+down_revision: Union[str, None] = '20261018sync'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """A client key may be used once per user; entries without a key are unaffected."""
+    op.add_column(
+        'khatabook_entries',
+        sa.Column('idempotency_key', sa.String(length=64), nullable=True)
+    )
+    op.create_index(
+        'uq_khatabook_entries_created_by_idempotency_key',
+        'khatabook_entries',
+        ['created_by', 'idempotency_key'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Remove idempotency_key from khatabook_entries."""
+    op.drop_index('uq_khatabook_entries_created_by_idempotency_key', table_name='khatabook_entries')
+    op.drop_column('khatabook_entries', 'idempotency_key')
@@ -0,0 +1,34 @@
+"""Add a (created_by, start_time) index for machinery log date filters
+
+Revision ID: 20261018mchidx
+Revises: 20261018hday
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018mchidx'
+down_revision: Union[str, None] = '20261018hday'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Let per-user machinery logs be filtered by start_time with an index range scan.
+
+    The matching (user_id, attendance_date) index on self_attendance already
+    exists (idx_self_attendance_user_date, 20250628_attendance_indexes).
+    """
+    op.create_index(
+        'idx_machinery_created_by_start_time',
+        'machinery',
+        ['created_by', 'start_time']
+    )
+
+
+def downgrade() -> None:
+    """Remove the machinery log index."""
+    op.drop_index('idx_machinery_created_by_start_time', table_name='machinery')
@@ -0,0 +1,43 @@
+"""Add notification kinds, amounts and badge clear times for digests
+
+Revision ID: 20261018ncoal
+Revises: 20261018nobx
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018ncoal'
+down_revision: Union[str, None] = '20261018nobx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Let the outbox merge notifications per recipient and kind."""
+    op.add_column('notification_outbox', sa.Column('kind', sa.String(length=40), nullable=True))
+    op.add_column('notification_outbox', sa.Column('amount', sa.Float(), nullable=True))
+    op.create_index(
+        'idx_notification_outbox_topic_kind_created_at',
+        'notification_outbox',
+        ['topic', 'kind', 'created_at']
+    )
+
+    op.create_table(
+        'notification_badges',
+        sa.Column('topic', sa.String(length=64), nullable=False),
+        sa.Column('cleared_at', sa.TIMESTAMP(), nullable=False),
+        sa.PrimaryKeyConstraint('topic')
+    )
+
+
+def downgrade() -> None:
+    """Remove notification digests."""
+    op.drop_table('notification_badges')
+    op.drop_index('idx_notification_outbox_topic_kind_created_at', table_name='notification_outbox')
+    op.drop_column('notification_outbox', 'amount')
+    op.drop_column('notification_outbox', 'kind')
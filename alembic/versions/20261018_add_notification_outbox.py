@@ -0,0 +1,51 @@
+"""Add notification_outbox for transactional push notifications
+
+Revision ID: 20261018nobx
+Revises: 20261018kbik
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018nobx'
+down_revision: Union[str, None] = '20261018kbik'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the outbox and the partial index the dispatcher polls."""
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('topic', sa.String(length=64), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('sent_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid')
+    )
+    op.create_index(
+        'idx_notification_outbox_pending',
+        'notification_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    """Drop the notification outbox."""
+    op.drop_index('idx_notification_outbox_pending', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
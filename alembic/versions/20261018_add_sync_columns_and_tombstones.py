@@ -0,0 +1,60 @@
+"""Add updated_at columns, sync indexes and sync_tombstones for delta sync
+
+Revision ID: 20261018sync
+Revises: 20261018tcc
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018sync'
+down_revision: Union[str, None] = '20261018tcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track row changes on the entities served by GET /sync."""
+    for table in ('khatabook_entries', 'person', 'items'):
+        op.add_column(
+            table,
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False)
+        )
+
+    # Existing rows have not changed since they were created
+    op.execute("UPDATE khatabook_entries SET updated_at = created_at")
+    op.execute("UPDATE items SET updated_at = created_at")
+
+    op.create_index('idx_payments_updated_at', 'payments', ['updated_at'])
+    op.create_index('idx_khatabook_entries_created_by_updated_at', 'khatabook_entries', ['created_by', 'updated_at'])
+    op.create_index('idx_person_updated_at', 'person', ['updated_at'])
+    op.create_index('idx_items_updated_at', 'items', ['updated_at'])
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('entity_uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('deleted_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sync_tombstones_entity_deleted_at', 'sync_tombstones', ['entity', 'deleted_at'])
+
+
+def downgrade() -> None:
+    """Remove delta sync tracking."""
+    op.drop_index('idx_sync_tombstones_entity_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+
+    op.drop_index('idx_items_updated_at', table_name='items')
+    op.drop_index('idx_person_updated_at', table_name='person')
+    op.drop_index('idx_khatabook_entries_created_by_updated_at', table_name='khatabook_entries')
+    op.drop_index('idx_payments_updated_at', table_name='payments')
+
+    for table in ('items', 'person', 'khatabook_entries'):
+        op.drop_column(table, 'updated_at')
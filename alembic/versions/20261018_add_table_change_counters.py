@@ -0,0 +1,32 @@
+"""Add table_change_counters for conditional GET on list endpoints
+
+Revision ID: 20261018tcc
+Revises: 20250720aab
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018tcc'
+down_revision: Union[str, None] = '20250720aab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the per-table change counters used to build list ETags."""
+    op.create_table(
+        'table_change_counters',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    """Drop the change counters."""
+    op.drop_table('table_change_counters')
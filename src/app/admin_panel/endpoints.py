@@ -1,4 +1,3 @@
-import os
 import json
 from collections import defaultdict
 from fastapi import FastAPI, Body, Response
@@ -6,6 +5,7 @@ from fastapi_sqlalchemy import DBSessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from src.app.database.database import settings
 from src.app.services.auth_service import get_current_user, get_password_hash
+from src.app.services.khatabook_service import khatabook_file_preview, khatabook_file_url
 from src.app.schemas.auth_service_schamas import UserRole
 from src.app.admin_panel.services import (
     create_project_user_mapping,
@@ -87,6 +87,10 @@ from src.app.schemas import constants
 from src.app.admin_panel.services import get_default_config_service
 from src.app.database.database import get_db
 from src.app.utils.logging_config import get_logger, get_api_logger
+from src.app.middleware.flight_recorder import flight_recorder
+from src.app.utils.resilience import DEPENDENCIES
+from src.app.utils.attachment_store import store_upload
+from src.app.utils.uploads import upload_size_error
 from src.app.admin_panel.schemas import (
     AdminPanelResponse,
     DefaultConfigCreate,
@@ -1808,6 +1812,15 @@ def upload_single_invoice_for_po(
     current_user: User = Depends(get_current_user),
     response: Response = None,  # Add this
 ):
+    size_error = upload_size_error([invoice_file])
+    if size_error:
+        response.status_code = 413
+        return ProjectServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         try:
             item = json.loads(invoice)
@@ -1888,13 +1901,7 @@ def upload_single_invoice_for_po(
         # Save file if present
         file_path = None
         if invoice_file:
-            ext = os.path.splitext(invoice_file.filename)[1]
-            filename = f"Invoice_{str(uuid4())}{ext}"
-            upload_dir = "uploads/invoices"
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                buffer.write(invoice_file.file.read())
+            file_path = store_upload(invoice_file).path
 
         # Create Invoice
         new_invoice = Invoice(
@@ -2038,6 +2045,15 @@ def upload_multiple_invoices_for_po(
     current_user: User = Depends(get_current_user),
     response: Response = None,  # Add response!
 ):
+    size_error = upload_size_error(invoice_files or [])
+    if size_error:
+        response.status_code = 413
+        return ProjectServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         # Parse and validate input
         try:
@@ -2138,14 +2154,7 @@ def upload_multiple_invoices_for_po(
             # Optional file
             file_path = None
             if invoice_files and len(invoice_files) > index:
-                file = invoice_files[index]
-                ext = os.path.splitext(file.filename)[1]
-                filename = f"Invoice_{str(uuid4())}{ext}"
-                upload_dir = "uploads/invoices"
-                os.makedirs(upload_dir, exist_ok=True)
-                file_path = os.path.join(upload_dir, filename)
-                with open(file_path, "wb") as buffer:
-                    buffer.write(file.file.read())
+                file_path = store_upload(invoice_files[index]).path
 
             # Save Invoice
             new_invoice = Invoice(
@@ -3430,7 +3439,7 @@ def get_all_khatabook_entries_admin(
             query = query.filter(Khatabook.payment_mode == payment_mode)
 
         # Order by most recent first
-        query = query.order_by(Khatabook.created_at.desc())
+        query = query.order_by(Khatabook.created_at.desc(), Khatabook.id.desc())
 
         # Execute query with eager loading of relationships
         entries = (
@@ -3449,13 +3458,12 @@ def get_all_khatabook_entries_admin(
         response_data = []
         for entry in entries:
             # Process files (only non-deleted files)
-            file_urls = []
+            file_urls, file_previews = [], []
             if entry.files:
                 for f in entry.files:
                     if not f.is_deleted:
-                        filename = os.path.basename(f.file_path)
-                        file_url = f"{constants.HOST_URL}/uploads/khatabook_files/{filename}"
-                        file_urls.append(file_url)
+                        file_urls.append(khatabook_file_url(f.file_path))
+                        file_previews.append(khatabook_file_preview(f.file_path))
 
             # Process items (only non-deleted items)
             items_data = []
@@ -3506,6 +3514,7 @@ def get_all_khatabook_entries_admin(
                 "expense_date": entry.expense_date.isoformat() if entry.expense_date else None,
                 "created_at": entry.created_at.isoformat(),
                 "files": file_urls,
+                "file_previews": file_previews,
                 "items": items_data,
                 "is_suspicious": entry.is_suspicious,
                 "payment_mode": entry.payment_mode,
@@ -4240,6 +4249,93 @@ def get_all_logs(
         ).model_dump()
 
 
+@admin_app.get(
+    "/slow-requests",
+    tags=["Monitoring"],
+    description="Get the most recent slow requests recorded by this worker, with their SQL timings and plans"
+)
+def get_slow_requests(
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of requests to return"),
+    path: Optional[str] = Query(None, description="Only include requests whose path contains this value"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the slow requests kept by the flight recorder, newest first.
+    The buffer is in-memory and per worker, so each worker only reports
+    the requests it served itself.
+    """
+    try:
+        if isinstance(current_user, dict):
+            return AdminPanelResponse(
+                data=None,
+                status_code=current_user.get("status_code", 401),
+                message=current_user.get("message", "Authentication error")
+            ).model_dump()
+
+        if current_user.role not in [UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value]:
+            return AdminPanelResponse(
+                data=None,
+                status_code=403,
+                message="Only admin and super admin can access slow requests"
+            ).model_dump()
+
+        return AdminPanelResponse(
+            data=flight_recorder.snapshot(limit=limit, path=path),
+            message="Slow requests fetched successfully",
+            status_code=200
+        ).model_dump()
+
+    except Exception as e:
+        logger.error(f"Error in get_slow_requests API: {str(e)}")
+        return AdminPanelResponse(
+            data=None,
+            status_code=500,
+            message=f"An error occurred while fetching slow requests: {str(e)}"
+        ).model_dump()
+
+
+@admin_app.get(
+    "/dependencies",
+    tags=["Monitoring"],
+    description="Get circuit breaker state and call metrics of the external services, for this worker"
+)
+def get_dependency_health(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the state (closed, open, half_open) and call counts of the Firebase
+    and Twilio circuit breakers. Breakers are per worker.
+    """
+    try:
+        if isinstance(current_user, dict):
+            return AdminPanelResponse(
+                data=None,
+                status_code=current_user.get("status_code", 401),
+                message=current_user.get("message", "Authentication error")
+            ).model_dump()
+
+        if current_user.role not in [UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value]:
+            return AdminPanelResponse(
+                data=None,
+                status_code=403,
+                message="Only admin and super admin can access dependency health"
+            ).model_dump()
+
+        return AdminPanelResponse(
+            data={name: dependency.snapshot() for name, dependency in DEPENDENCIES.items()},
+            message="Dependency health fetched successfully",
+            status_code=200
+        ).model_dump()
+
+    except Exception as e:
+        logger.error(f"Error in get_dependency_health API: {str(e)}")
+        return AdminPanelResponse(
+            data=None,
+            status_code=500,
+            message=f"An error occurred while fetching dependency health: {str(e)}"
+        ).model_dump()
+
+
 @admin_app.get("/items/user-project/{user_id}/{project_id}", tags=["Mappings"], deprecated=True)
 def get_user_project_items(
     user_id: UUID,
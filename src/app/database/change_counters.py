@@ -0,0 +1,227 @@
+"""
+Per-table change counters.
+
+Every ORM write to a tracked table bumps that table's row in
+``table_change_counters``. List endpoints hash the counters of the tables
+they read into an ETag (see ``src.app.utils.conditional_get``).
+
+The tables a transaction writes are collected in ``session.info`` and
+bumped after it commits, on a separate short autocommit transaction. The
+writing transaction never holds a counter row lock, so concurrent writes to
+the same table do not queue behind each other. An ETag only has to change
+after a commit, never to be exact: a rollback bumps nothing, and a reader
+between the commit and the bump gets the new rows under the old ETag for a
+moment, never old rows under a new one.
+
+Both flushes (``db.add`` / attribute changes / ``db.delete``) and ORM bulk
+statements (``query.update()``, ``query.delete()``, ``db.execute(update(...))``)
+are covered. Raw ``text()`` SQL is not; such writes must call
+``mark_tables_changed`` themselves.
+
+Counters are bumped in sorted table order, so concurrent bumps lock the
+counter rows in the same order and can not deadlock on them.
+
+A failed bump is retried a few times. If it still fails, the worker keeps
+the tables pending: they are bumped with its next bump, and until then its
+list endpoints send no ETag for them, so no client gets a 304 for a list
+whose committed change the counters do not show yet.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.app.database.database import AsyncBackedSession, SessionLocal
+from src.app.database.models import TableChangeCounter
+from src.app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# session.info key of the tracked tables written in the current transaction
+CHANGED_TABLES_KEY = "changed_tables"
+
+# Attempts of a post-commit bump, and the pause before each retry (seconds)
+BUMP_ATTEMPTS = 3
+BUMP_RETRY_DELAY = 0.05
+
+PAYMENT_LIST_TABLES = (
+    "payments",
+    "payment_status_history",
+    "payment_edit_histories",
+    "payment_files",
+    "payment_items",
+    "items",
+    "person",
+    "projects",
+    "users",
+    "priorities",
+    "balance_details",
+    "project_user_map",
+)
+PROJECT_LIST_TABLES = (
+    "projects",
+    "project_user_map",
+    "project_item_map",
+    "project_pos",
+    "invoices",
+    "items",
+    "payments",
+    "payment_items",
+    "users",
+)
+KHATABOOK_LIST_TABLES = (
+    "khatabook_entries",
+    "khatabook_files",
+    "khatabook_items",
+    "items",
+    "person",
+    "projects",
+    "users",
+    "payments",
+)
+ITEM_LIST_TABLES = (
+    "items",
+    "item_groups",
+    "item_group_map",
+    "payment_items",
+    "payments",
+)
+USER_PROFILE_TABLES = (
+    "users",
+    "person",
+)
+SELF_ATTENDANCE_TABLES = (
+    "self_attendance",
+)
+ATTENDANCE_ANALYTICS_TABLES = SELF_ATTENDANCE_TABLES + (
+    "holidays",
+)
+
+TRACKED_TABLES = frozenset(
+    PAYMENT_LIST_TABLES + PROJECT_LIST_TABLES + KHATABOOK_LIST_TABLES + ITEM_LIST_TABLES
+    + USER_PROFILE_TABLES + ATTENDANCE_ANALYTICS_TABLES
+)
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def bump_change_counters(connection, tables: Iterable[str]):
+    """Increment the counters of the given tables on this connection's transaction."""
+    tables = sorted(set(tables) & TRACKED_TABLES)
+    insert = _INSERTS.get(connection.dialect.name)
+    if not tables or insert is None:
+        return
+    counters = TableChangeCounter.__table__
+    for table_name in tables:
+        statement = insert(counters).values(table_name=table_name, version=1)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[counters.c.table_name],
+                set_={"version": counters.c.version + 1},
+            )
+        )
+
+
+def read_change_counters(db, tables: Iterable[str]) -> Dict[str, int]:
+    """Current versions of the given tables; tables never written count as 0."""
+    tables = sorted(set(tables))
+    rows = db.execute(
+        select(TableChangeCounter.table_name, TableChangeCounter.version)
+        .where(TableChangeCounter.table_name.in_(tables))
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update({name: version for name, version in rows})
+    return versions
+
+
+# Tables of this worker whose committed writes are not in their counters yet
+_pending_bumps: Set[str] = set()
+_pending_lock = threading.Lock()
+
+
+def pending_bumps(tables: Iterable[str]) -> Set[str]:
+    """Those of ``tables`` whose last post-commit bump in this worker failed."""
+    with _pending_lock:
+        return _pending_bumps & set(tables)
+
+
+def bump_after_commit(bind, tables: Iterable[str]) -> bool:
+    """
+    Bump ``tables``, and any left pending by earlier failures, on a short
+    transaction of their own. Returns False, leaving them pending, if every
+    attempt fails.
+    """
+    with _pending_lock:
+        tables = set(tables) | _pending_bumps
+    if not tables:
+        return True
+    for attempt in range(1, BUMP_ATTEMPTS + 1):
+        try:
+            with bind.begin() as connection:
+                bump_change_counters(connection, tables)
+            break
+        except Exception as e:
+            error = e
+            if attempt < BUMP_ATTEMPTS:
+                time.sleep(BUMP_RETRY_DELAY * attempt)
+    else:
+        logger.warning(f"Could not bump change counters for {sorted(tables)}: {str(error)}")
+        with _pending_lock:
+            _pending_bumps.update(tables)
+        return False
+    with _pending_lock:
+        _pending_bumps.difference_update(tables)
+    return True
+
+
+def _table_names(objects) -> set:
+    names = set()
+    for obj in objects:
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            names.add(table.name)
+    return names
+
+
+def mark_tables_changed(session, tables: Iterable[str]):
+    """Bump the counters of ``tables`` once ``session``'s transaction commits."""
+    changed = set(tables) & TRACKED_TABLES
+    if changed:
+        session.info.setdefault(CHANGED_TABLES_KEY, set()).update(changed)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(AsyncBackedSession, "after_commit")
+def bump_committed_tables(session):
+    changed = session.info.pop(CHANGED_TABLES_KEY, None)
+    if changed:
+        # Always the primary, whatever the session last read from
+        bump_after_commit(session.bind, changed)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+@event.listens_for(AsyncBackedSession, "after_rollback")
+def forget_rolled_back_tables(session):
+    session.info.pop(CHANGED_TABLES_KEY, None)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+@event.listens_for(AsyncBackedSession, "after_flush")
+def mark_flushed_tables(session, flush_context):
+    changed = _table_names(session.new) | _table_names(session.dirty) | _table_names(session.deleted)
+    mark_tables_changed(session, changed)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+@event.listens_for(AsyncBackedSession, "do_orm_execute")
+def mark_bulk_statement_tables(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.local_table.name not in TRACKED_TABLES:
+        return None
+    mark_tables_changed(orm_execute_state.session, [mapper.local_table.name])
+    return None
@@ -1,7 +1,16 @@
+import asyncio
+from typing import Optional
+import anyio.from_thread
+import anyio.to_thread
+import redis
+from fastapi import Request
 from pydantic_settings import BaseSettings
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from src.app.database.replica import RoutingSession, WriteTracker, user_key_from_token
+from src.app.middleware.admission_control import ANALYTICS, READ_METHODS, WRITE, classify_request
 from src.app.schemas.constants import HOST_URL
 from src.app.utils.logging_config import get_database_logger, get_performance_logger
 import time
@@ -24,6 +33,74 @@ class Settings(BaseSettings):
     HOST_URL: str
     LOG_LEVEL: str = "INFO"
     LOG_DIR: str = "/app/logs"
+    # Slow-request flight recorder (per worker)
+    SLOW_REQUEST_THRESHOLD: float = 1.0
+    SLOW_STATEMENT_THRESHOLD: float = 0.2
+    FLIGHT_RECORDER_SIZE: int = 50
+    # Admission control; class limits together should stay within
+    # pool_size + max_overflow of the sync engine below (30) and, for the
+    # async endpoints, of the async pool (ASYNC_POOL_SIZE + ASYNC_MAX_OVERFLOW)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_ANALYTICS_LIMIT: int = 4
+    ADMISSION_READ_LIMIT: int = 16
+    ADMISSION_WRITE_LIMIT: int = 8
+    ADMISSION_QUEUE_SIZE: int = 32
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+    ADMISSION_RETRY_AFTER: int = 2
+    # Per endpoint class statement timeouts in milliseconds (0 disables)
+    STATEMENT_TIMEOUT_READ_MS: int = 10000
+    STATEMENT_TIMEOUT_WRITE_MS: int = 15000
+    STATEMENT_TIMEOUT_ANALYTICS_MS: int = 60000
+    CANCEL_QUERIES_ON_DISCONNECT: bool = True
+    # Pool of the asyncpg engine used by the async read endpoints. It comes
+    # on top of the sync pool: at most each worker opens 30 (sync) +
+    # ASYNC_POOL_SIZE + ASYNC_MAX_OVERFLOW (async) + 1 (/payments/events
+    # LISTEN) connections to the primary, 51 with the defaults, and 50 more
+    # to DATABASE_REPLICA_URL when set. With the 4 uvicorn workers of
+    # entrypoint.sh that is 204 per server, so Postgres max_connections
+    # (100 by default) must be raised, or these pools shrunk, to fit.
+    ASYNC_POOL_SIZE: int = 10
+    ASYNC_MAX_OVERFLOW: int = 10
+    # Extra connections run_concurrently may hold at once (per worker); with
+    # ADMISSION_READ_LIMIT it should stay within the async pool above
+    ASYNC_FANOUT_CONNECTIONS: int = 4
+    # Optional streaming replica (psycopg2 URL) for GET traffic; users read
+    # from the primary for this many seconds after their last write
+    DATABASE_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_WINDOW: float = 5.0
+    # Push notification outbox; "fcm" delivers through Firebase, "stub" only
+    # records messages (tests, local development). An interval of 0 stops
+    # this worker from dispatching.
+    NOTIFICATION_TRANSPORT: str = "fcm"
+    NOTIFICATION_DISPATCH_INTERVAL: float = 2.0
+    NOTIFICATION_BATCH_SIZE: int = 500
+    NOTIFICATION_MAX_ATTEMPTS: int = 6
+    NOTIFICATION_RETRY_BASE: float = 30.0
+    # Seconds during which further notifications of one kind to a recipient
+    # are merged into a single digest (0 sends every notification)
+    NOTIFICATION_COALESCE_WINDOW: float = 60.0
+    # External services: per call timeouts (seconds) and circuit breakers
+    FIREBASE_TIMEOUT: float = 10.0
+    TWILIO_TIMEOUT: float = 5.0
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30.0
+    # Seconds between keepalive comments on idle /payments/events streams
+    PAYMENT_EVENTS_KEEPALIVE: float = 15.0
+    # Attachments: largest accepted file and the read size used to stream it
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # How /uploads is served: "static" (StaticFiles mount), "sendfile" or
+    # "x-accel" (X-Accel-Redirect to nginx's internal UPLOADS_ACCEL_PREFIX)
+    UPLOADS_SERVING: str = "static"
+    UPLOADS_ACCEL_PREFIX: str = "/protected_uploads/"
+    UPLOADS_REQUIRE_AUTH: bool = False
+    # Files read in parallel ahead of the one being sent in documents.zip
+    DOCUMENTS_ZIP_READ_AHEAD: int = 4
+    # Photo variants: longest side in pixels, encoder quality and background workers
+    IMAGE_THUMB_SIZE: int = 320
+    IMAGE_MEDIUM_SIZE: int = 1280
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_VARIANT_WORKERS: int = 2
 
 
     @property
@@ -33,6 +110,21 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.DB_USERNAME}:{self.DB_PASSWORD}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        )
+
+    @property
+    def ASYNC_DATABASE_REPLICA_URL(self) -> Optional[str]:
+        if not self.DATABASE_REPLICA_URL:
+            return None
+        return self.DATABASE_REPLICA_URL.replace(
+            "postgresql+psycopg2://", "postgresql://", 1
+        ).replace("postgresql://", "postgresql+asyncpg://", 1)
+
     class Config:
         env_file = ".env"
 
@@ -69,17 +161,182 @@ def receive_checkin(dbapi_connection, connection_record):
     """Log connection checkin to pool."""
     db_logger.debug("Database connection checked in to pool")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Optional read replica; without it every session uses the primary
+replica_engine = None
+write_tracker = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_size=20,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+    write_tracker = WriteTracker(
+        window=settings.READ_YOUR_WRITES_WINDOW,
+        redis_client=redis.Redis(
+            host=settings.REDIS_HOST,
+            port=int(settings.REDIS_PORT),
+            socket_timeout=0.2,
+            socket_connect_timeout=0.2
+        )
+    )
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replica_bind=replica_engine
+)
 Base = declarative_base()
 
+# Async engine (asyncpg) for the hot read endpoints; it has its own pool,
+# counted with the sync one in the connection budget above ASYNC_POOL_SIZE
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_size=settings.ASYNC_POOL_SIZE,
+    max_overflow=settings.ASYNC_MAX_OVERFLOW,
+    pool_timeout=30,
+    pool_recycle=1800,
+    pool_pre_ping=True
+)
+
+
+async_replica_engine = None
+if settings.ASYNC_DATABASE_REPLICA_URL:
+    async_replica_engine = create_async_engine(
+        settings.ASYNC_DATABASE_REPLICA_URL,
+        pool_size=settings.ASYNC_POOL_SIZE,
+        max_overflow=settings.ASYNC_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+
+
+class AsyncBackedSession(RoutingSession):
+    """Sync session class driven by AsyncSession, so session events can target it."""
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=AsyncBackedSession,
+    replica_bind=async_replica_engine.sync_engine if async_replica_engine else None,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Log database initialization
 db_logger.info("Database engine and session factory initialized")
 db_logger.info(f"Database URL: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
 
+# How often an in-flight request checks whether its client is still there
+DISCONNECT_POLL_INTERVAL = 1.0
+
+
+def statement_timeout_for(method: str, path: str) -> int:
+    """Return the statement timeout (ms) for the endpoint class of a request."""
+    route_class = classify_request(method, path)
+    if route_class == ANALYTICS:
+        return settings.STATEMENT_TIMEOUT_ANALYTICS_MS
+    if route_class == WRITE:
+        return settings.STATEMENT_TIMEOUT_WRITE_MS
+    return settings.STATEMENT_TIMEOUT_READ_MS
+
+
+@event.listens_for(SessionLocal, "after_begin")
+@event.listens_for(AsyncBackedSession, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """
+    Scope the session's statement timeout to every transaction it begins and
+    remember the DBAPI connection so the running query can be cancelled.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    session.info["dbapi_connection"] = connection.connection.dbapi_connection
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+@event.listens_for(AsyncBackedSession, "after_transaction_end")
+def forget_dbapi_connection(session, transaction):
+    """The connection goes back to the pool; never cancel on it after this."""
+    if transaction.parent is None:
+        session.info.pop("dbapi_connection", None)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(AsyncBackedSession, "after_commit")
+def record_user_write(session):
+    """Start the user's read-your-writes window once their write is committed."""
+    if session.info.pop("wrote", False) and write_tracker is not None:
+        write_tracker.record_write(session.info.get("user_key"))
+
+
+def route_reads(info: dict, request: Request):
+    """
+    Let the session read from the replica for GETs of @replica_reads endpoints
+    outside the user's write window. Every other request reads from the primary.
+    """
+    info["user_key"] = user_key_from_token(request.headers.get("authorization"))
+    info["use_replica"] = (
+        replica_engine is not None
+        and request.method in READ_METHODS
+        and getattr(request.scope.get("endpoint"), "replica_reads", False)
+        and not write_tracker.wrote_recently(info["user_key"])
+    )
+
+
+def cancel_session_query(db) -> bool:
+    """Ask Postgres to cancel the statement currently running on a session."""
+    dbapi_connection = db.info.get("dbapi_connection")
+    if dbapi_connection is None or not hasattr(dbapi_connection, "cancel"):
+        return False
+    try:
+        dbapi_connection.cancel()
+        return True
+    except Exception as e:
+        db_logger.error(f"Failed to cancel query: {str(e)}")
+        return False
+
+
+async def _cancel_on_disconnect(request: Request, db):
+    while True:
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+        if await request.is_disconnected():
+            if cancel_session_query(db):
+                db_logger.warning(
+                    f"Client disconnected, cancelled query for {request.method} {request.url.path}"
+                )
+            return
+
+
+def _start_disconnect_watcher(request: Request, db):
+    """Spawn the watcher on the event loop from the worker thread running get_db."""
+    def spawn():
+        return asyncio.get_running_loop().create_task(_cancel_on_disconnect(request, db))
+    try:
+        return anyio.from_thread.run_sync(spawn)
+    except RuntimeError:
+        # Not running in an anyio worker thread (scripts, tests)
+        return None
+
+
 # DB Dependency with logging
-def get_db():
+def get_db(request: Request = None):
     db = SessionLocal()
     db_logger.debug("Database session created")
+    watcher: Optional[asyncio.Task] = None
+    if request is not None:
+        db.info["statement_timeout_ms"] = statement_timeout_for(request.method, request.url.path)
+        route_reads(db.info, request)
+        if settings.CANCEL_QUERIES_ON_DISCONNECT and engine.dialect.name == "postgresql":
+            watcher = _start_disconnect_watcher(request, db)
     try:
         yield db
         db_logger.debug("Database session yielded successfully")
@@ -87,5 +344,78 @@ def get_db():
         db_logger.error(f"Database session error: {str(e)}")
         raise
     finally:
+        if watcher is not None:
+            try:
+                anyio.from_thread.run_sync(watcher.cancel)
+            except RuntimeError:
+                pass
         db.close()
         db_logger.debug("Database session closed")
+
+
+# Async DB Dependency
+async def get_async_db(request: Request = None):
+    async with AsyncSessionLocal() as db:
+        db_logger.debug("Async database session created")
+        if request is not None:
+            db.sync_session.info["statement_timeout_ms"] = statement_timeout_for(
+                request.method, request.url.path
+            )
+            if replica_engine is not None:
+                # wrote_recently may wait on Redis; keep it off the event loop
+                await anyio.to_thread.run_sync(route_reads, db.sync_session.info, request)
+            else:
+                route_reads(db.sync_session.info, request)
+        try:
+            yield db
+        except Exception as e:
+            db_logger.error(f"Async database session error: {str(e)}")
+            raise
+    db_logger.debug("Async database session closed")
+
+
+# Request-level session settings copied to the sessions of run_concurrently
+SHARED_SESSION_INFO = ("statement_timeout_ms", "use_replica", "user_key")
+
+
+# Shared by every run_concurrently call of this worker, so fan-out cannot
+# multiply the admitted requests into more connections than the pool has
+fanout_connections = asyncio.Semaphore(settings.ASYNC_FANOUT_CONNECTIONS)
+
+
+async def run_concurrently(db: AsyncSession, *work):
+    """
+    Run independent blocks of ORM code concurrently and return their results
+    in order.
+
+    Each callable receives a sync ``Session`` (see ``AsyncSession.run_sync``),
+    so the existing query helpers can be reused unchanged. A session can only
+    run one statement at a time, so the first callable runs on ``db`` and
+    the others on their own session and pooled connection while
+    ``fanout_connections`` has room; the rest run after it on ``db``.
+    """
+    async def run_on_own_session(fn):
+        async with AsyncSessionLocal() as session:
+            for key in SHARED_SESSION_INFO:
+                if key in db.sync_session.info:
+                    session.sync_session.info[key] = db.sync_session.info[key]
+            return await session.run_sync(fn)
+
+    async def run_on_db(fns):
+        return [await db.run_sync(fn) for fn in fns]
+
+    first, *rest = work
+    acquired = 0
+    while acquired < len(rest) and not fanout_connections.locked():
+        await fanout_connections.acquire()
+        acquired += 1
+    try:
+        own, sequential = rest[:acquired], rest[acquired:]
+        on_db, *on_own = await asyncio.gather(
+            run_on_db([first, *sequential]),
+            *(run_on_own_session(fn) for fn in own)
+        )
+    finally:
+        for _ in range(acquired):
+            fanout_connections.release()
+    return [on_db[0], *on_own, *on_db[1:]]
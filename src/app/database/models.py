@@ -7,6 +7,7 @@ from sqlalchemy import (
     Column,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -33,9 +34,13 @@ class Khatabook(Base):
     payment_mode = Column(String(50), nullable=True)
     entry_type = Column(String(50), nullable=False, default="Debit")  # New field: "Debit" for manual entries, "Credit" for self payments
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
     is_deleted = Column(Boolean, nullable=False, default=False)
     balance_after_entry = Column(Float, nullable=True)
     is_suspicious = Column(Boolean, nullable=False, server_default='false')  # New field to mark entries as suspicious
+    idempotency_key = Column(String(64), nullable=True)  # Client key of entries uploaded in a batch
     project_id = Column(
         UUID(as_uuid=True),
         ForeignKey("projects.uuid"),
@@ -203,6 +208,9 @@ class Person(Base):
     is_deleted = Column(Boolean, nullable=False, default=False)
     upi_number = Column(String(50), nullable=True)
     role = Column(String(30), nullable=True)  # Optional role field using same enum values as User.role
+    updated_at = Column(
+        TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.uuid"),
@@ -563,6 +571,9 @@ class Item(Base):
     payments = relationship("PaymentItem", back_populates="item", cascade="all, delete-orphan")
     khatabook_items = relationship("KhatabookItem", back_populates="item", cascade="all, delete-orphan")
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
     machinery = relationship("Machinery", back_populates="item", cascade="all, delete-orphan")
 
     def __repr__(self):
@@ -946,6 +957,9 @@ class InquiryData(Base):
 
 class SelfAttendance(Base):
     __tablename__ = "self_attendance"
+    __table_args__ = (
+        Index('idx_self_attendance_user_date', 'user_id', 'attendance_date'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     uuid = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
@@ -1053,6 +1067,9 @@ class ProjectAttendanceWage(Base):
 
 class Machinery(Base):
     __tablename__ = "machinery"
+    __table_args__ = (
+        Index('idx_machinery_created_by_start_time', 'created_by', 'start_time'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     uuid = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
@@ -1090,4 +1107,79 @@ class MachineryPhotos(Base):
     machinery = relationship("Machinery", back_populates="photos")
 
     def __repr__(self):
-        return f"<MachineryPhotos(id={self.id}, machinery_id={self.machinery_id}, photo_path={self.photo_path})>"
\ No newline at end of file
+        return f"<MachineryPhotos(id={self.id}, machinery_id={self.machinery_id}, photo_path={self.photo_path})>"
+
+
+class TableChangeCounter(Base):
+    """
+    Per-table version, bumped after each committed write to the table, on a
+    separate transaction (see change_counters.py); it can briefly lag a commit.
+    """
+    __tablename__ = "table_change_counters"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class SyncTombstone(Base):
+    """Record of a hard-deleted row, so delta sync clients can drop their copy."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(30), nullable=False)  # "khatabook", "item", ...
+    entity_uuid = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class NotificationOutbox(Base):
+    """
+    Push notification written in the same transaction as the change it
+    announces and delivered afterwards by the notification dispatcher.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
+    topic = Column(String(64), nullable=False)  # FCM topic, the recipient's user uuid
+    kind = Column(String(40), nullable=True)  # digest kind, see constants.NOTIFICATION_KIND_*
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    data = Column(Text, nullable=True)  # JSON string
+    amount = Column(Float, nullable=True)  # summed in digests
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    sent_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, topic={self.topic}, status={self.status})>"
+
+
+class NotificationBadge(Base):
+    """When a user last cleared their badge; outbox rows after it are unread."""
+    __tablename__ = "notification_badges"
+
+    topic = Column(String(64), primary_key=True)  # the user's uuid, as in NotificationOutbox
+    cleared_at = Column(TIMESTAMP, nullable=False)
+
+
+class Holiday(Base):
+    """
+    A day off on top of the weekly Sunday: for every project when
+    ``project_id`` is NULL, otherwise only for that project.
+    """
+    __tablename__ = "holidays"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4)
+    holiday_date = Column(Date, nullable=False)
+    name = Column(String(255), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.uuid"), nullable=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.uuid"), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    is_deleted = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<Holiday(date={self.holiday_date}, name={self.name}, project_id={self.project_id})>"
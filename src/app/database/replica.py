@@ -0,0 +1,125 @@
+"""
+Read-replica routing.
+
+Replica reads are opt-in per endpoint: only handlers marked with
+``@replica_reads`` (listings, analytics, exports) may read from the replica,
+everything else stays on the primary. For those requests the session sends
+SELECTs to the replica engine (``session.info["use_replica"]``) and
+everything else - writes, flushes, raw SQL, statements marked with
+``PRIMARY_ONLY`` - to the primary. A session pins itself to the primary as
+soon as it flushes, so a request always reads its own writes.
+
+Across requests, ``WriteTracker`` remembers when each user last wrote. For a
+short window after that their reads also go to the primary, which hides
+replication lag from the user who just made the change. The timestamps are
+kept in Redis so every worker sees them; if Redis is unavailable, the
+in-process copy is used and reads fall back to the primary when in doubt.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from jose import jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.app.utils.logging_config import get_database_logger
+
+db_logger = get_database_logger()
+
+LAST_WRITE_KEY_PREFIX = "ipm:last-write:"
+MAX_LOCAL_ENTRIES = 10000
+
+# Execution options of statements that must never read from the replica
+PRIMARY_ONLY = {"primary_only": True}
+
+
+def replica_reads(endpoint):
+    """Mark a read-only endpoint whose GETs may be served from the replica."""
+    endpoint.replica_reads = True
+    return endpoint
+
+
+class RoutingSession(Session):
+    """Session that routes SELECTs to a replica when allowed."""
+
+    def __init__(self, *args, replica_bind=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica_bind is not None
+            and self.info.get("use_replica")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and not clause._execution_options.get("primary_only")
+        ):
+            return self.replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def pin_to_primary(session, flush_context):
+    """After the first write, the rest of the session reads from the primary."""
+    session.info["use_replica"] = False
+    session.info["wrote"] = True
+
+
+def user_key_from_token(authorization: Optional[str]) -> Optional[str]:
+    """
+    Return the user id from a bearer token without verifying it. Only used to
+    pick a database; authentication still happens in get_current_user.
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.get_unverified_claims(authorization.split(" ", 1)[1]).get("sub")
+    except Exception:
+        return None
+
+
+class WriteTracker:
+    """Remembers when each user last wrote, for read-your-writes routing."""
+
+    def __init__(self, window: float, redis_client=None):
+        self.window = window
+        self.redis = redis_client
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, user_key: Optional[str]):
+        if not user_key:
+            return
+        now = time.time()
+        with self._lock:
+            self._local[user_key] = now
+            if len(self._local) > MAX_LOCAL_ENTRIES:
+                self._local = {
+                    key: at for key, at in self._local.items() if now - at < self.window
+                }
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    LAST_WRITE_KEY_PREFIX + user_key,
+                    now,
+                    px=int(self.window * 1000),
+                )
+            except Exception as e:
+                db_logger.warning(f"Could not record last write in Redis: {str(e)}")
+
+    def wrote_recently(self, user_key: Optional[str]) -> bool:
+        """True if the user wrote within the window (or we can not tell)."""
+        if not user_key:
+            return False
+        with self._lock:
+            last_write = self._local.get(user_key)
+        if last_write is not None and time.time() - last_write < self.window:
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return self.redis.exists(LAST_WRITE_KEY_PREFIX + user_key) > 0
+        except Exception as e:
+            db_logger.warning(f"Could not read last write from Redis, using primary: {str(e)}")
+            return True
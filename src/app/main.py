@@ -18,6 +18,14 @@ from src.app.services.wage_endpoints import wage_router
 from src.app.admin_panel.endpoints import admin_app
 from src.app.sms_service.auth_service import sms_service_router
 from src.app.services.machinery import machinery_router
+from src.app.services.sync_service import sync_router
+from src.app.services.bootstrap_service import bootstrap_router
+from src.app.services.notification_endpoints import notification_router
+from src.app.services.media_endpoints import media_router
+from src.app.middleware.flight_recorder import flight_recorder
+from src.app.notification.outbox import dispatcher as notification_dispatcher
+from src.app.services.payment_events import payment_event_hub
+from src.app.middleware.admission_control import AdmissionControlMiddleware, build_admission_controller
 
 from dotenv import load_dotenv
 from fastapi_cache import FastAPICache
@@ -59,6 +67,12 @@ templates = Jinja2Templates(directory=TEMPLATES_DIR)
 # FastAPI App
 app = FastAPI()
 
+# Admission control - added first so it runs innermost, after CORS headers
+# and request logging have been applied
+admission_controller = build_admission_controller(settings)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
 # Configure CORS - Allow specific origins including Netlify domain
 app.add_middleware(
     CORSMiddleware,
@@ -84,20 +98,30 @@ app.add_middleware(DBSessionMiddleware, db_url=settings.DATABASE_URL)
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
+    recording_token = flight_recorder.start_request()
 
     # Log incoming request
     api_logger.info(f"Request: {request.method} {request.url.path} - Client: {request.client.host if request.client else 'unknown'}")
 
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception:
+        flight_recorder.finish_request(
+            recording_token, request.method, request.url.path, 500, time.time() - start_time
+        )
+        raise
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
 
     # Log response with timing
     api_logger.info(f"Response: {request.method} {request.url.path} - Status: {response.status_code} - Time: {process_time:.4f}s")
 
-    # Log slow requests as warnings
-    if process_time > 1.0:  # Log requests taking more than 1 second
+    # Log slow requests as warnings and keep their SQL in the flight recorder
+    if process_time > settings.SLOW_REQUEST_THRESHOLD:
         logger.warning(f"Slow request detected: {request.method} {request.url.path} took {process_time:.4f}s")
+    flight_recorder.finish_request(
+        recording_token, request.method, request.url.path, response.status_code, process_time
+    )
 
     return response
 
@@ -111,8 +135,10 @@ async def add_process_time_header(request: Request, call_next):
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
 # Mount /uploads so that all subdirectories
-# (including /payments) are accessible
-app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
+# (including /payments) are accessible. In the "sendfile" and "x-accel"
+# modes media_router serves them instead (see utils/file_serving.py)
+if settings.UPLOADS_SERVING == "static":
+    app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
 
 # Mount static files directory
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
@@ -128,6 +154,10 @@ app.include_router(attendance_router)
 app.include_router(wage_router)
 app.include_router(sms_service_router)
 app.include_router(machinery_router)
+app.include_router(sync_router)
+app.include_router(bootstrap_router)
+app.include_router(notification_router)
+app.include_router(media_router)
 app.mount(path='/admin', app=admin_app)
 
 
@@ -136,7 +166,8 @@ SERVICE_ACCOUNT_PATH = SERVICE_FILE # noqa
 
 if not firebase_admin._apps:
     cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
-    firebase_admin.initialize_app(cred)
+    # Bounds each HTTP attempt; the Firebase circuit breaker bounds the call
+    firebase_admin.initialize_app(cred, options={"httpTimeout": settings.FIREBASE_TIMEOUT})
     logger.info("--------------------------------")
     logger.info(f"Firebase Service Account Path: {SERVICE_ACCOUNT_PATH}")
     logger.info("Firebase Admin SDK Initialized Successfully")
@@ -166,6 +197,15 @@ async def startup_event():
         except ImportError:
             logger.error("Failed to initialize fallback cache. Cache will be disabled.")
 
+    # Deliver queued push notifications from this worker
+    notification_dispatcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await notification_dispatcher.stop()
+    await payment_event_hub.stop()
+
 
 @app.get("/")
 async def root():
@@ -187,6 +227,7 @@ def performance_stats():
 
     return {
         "query_stats": query_stats,
+        "admission_control": admission_controller.metrics(),
         "cache_status": "active"
     }
 
@@ -0,0 +1,215 @@
+"""
+Admission control for the API.
+
+Most routes are plain ``def`` handlers executed in anyio's thread pool, which
+is larger than the SQLAlchemy connection pool. Without a limit, bursts park
+threads on ``pool_timeout`` for up to 30 seconds. This middleware caps the
+number of in-flight requests per route class (heavy analytics, light reads,
+writes), lets a bounded number of requests wait briefly for a slot, and
+rejects the rest immediately with ``503`` and ``Retry-After``.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Dict, Optional
+
+from src.app.utils.logging_config import get_performance_logger
+
+perf_logger = get_performance_logger()
+
+# Route classes
+ANALYTICS = "analytics"
+READ = "read"
+WRITE = "write"
+
+# Path fragments that identify heavy aggregation endpoints
+ANALYTICS_PATH_MARKERS = ("analytics", "/export", "-stats")
+
+# Requests that never touch the database or must not be queued
+EXEMPT_PATHS = ("/", "/healthcheck", "/performance", "/payments/events")
+EXEMPT_PREFIXES = ("/static", "/uploads", "/variants", "/docs", "/openapi.json", "/admin/docs", "/admin/openapi.json")
+# Long file streams; they only query the database before the first byte
+EXEMPT_SUFFIXES = ("/documents.zip",)
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """
+    Return the route class of a request, or None if it is not admission
+    controlled.
+    """
+    if (method == "OPTIONS" or path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES)
+            or path.endswith(EXEMPT_SUFFIXES)):
+        return None
+    if any(marker in path for marker in ANALYTICS_PATH_MARKERS):
+        return ANALYTICS
+    if method in READ_METHODS:
+        return READ
+    return WRITE
+
+
+class ConcurrencyLimiter:
+    """
+    Concurrency limit with a bounded FIFO wait queue.
+
+    All state is touched from the event loop only, so no locking is needed.
+    A released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters = deque()
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if allowed. Returns False when rejected."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted_total += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_total += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.timed_out_total += 1
+            self.rejected_total += 1
+            return False
+        except BaseException:
+            # Client went away while queued; give back a slot handed to us
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+        self.admitted_total += 1
+        return True
+
+    def release(self):
+        """Free a slot, handing it to the oldest live waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def metrics(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+        }
+
+
+class AdmissionController:
+    """Set of limiters keyed by route class."""
+
+    def __init__(self, limits: Dict[str, int], max_queue: int, queue_timeout: float, retry_after: int):
+        self.retry_after = retry_after
+        self.limiters = {
+            name: ConcurrencyLimiter(name, limit, max_queue, queue_timeout)
+            for name, limit in limits.items()
+        }
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to HTTP requests.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        limiter = self.controller.limiters.get(route_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            perf_logger.warning(
+                f"Request rejected by admission control: {scope['method']} {scope['path']} "
+                f"({route_class}: {limiter.active} active, {limiter.queue_depth} queued)"
+            )
+            await self._reject(send, route_class)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, route_class: str):
+        body = json.dumps({
+            "data": None,
+            "message": f"Server is busy handling {route_class} requests, please retry shortly",
+            "status_code": 503,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def build_admission_controller(settings) -> AdmissionController:
+    """Create the application controller from Settings."""
+    return AdmissionController(
+        limits={
+            ANALYTICS: settings.ADMISSION_ANALYTICS_LIMIT,
+            READ: settings.ADMISSION_READ_LIMIT,
+            WRITE: settings.ADMISSION_WRITE_LIMIT,
+        },
+        max_queue=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+    )
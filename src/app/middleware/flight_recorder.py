@@ -0,0 +1,206 @@
+"""
+Slow-request flight recorder.
+
+Every request records the SQL statements it executes (in order, with timings)
+into a per-request context variable. When the request turns out to be slow the
+recording is kept in a bounded, per-worker ring buffer; otherwise it is thrown
+away. For statements that were individually slow, an ``EXPLAIN (ANALYZE off)``
+plan is captured in a background thread so the request itself never waits on it.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import event
+from src.app.database.database import async_engine, engine, settings
+from src.app.utils.logging_config import get_performance_logger
+
+perf_logger = get_performance_logger()
+
+# Only SELECT-like statements are explained; EXPLAIN without ANALYZE never
+# executes the statement, but there is no value in planning writes here.
+EXPLAINABLE_PREFIXES = ("select", "with")
+
+# Per-request caps so a pathological request can not exhaust worker memory
+MAX_STATEMENTS_PER_REQUEST = 200
+MAX_STATEMENT_LENGTH = 4000
+
+
+class RequestRecording:
+    """Mutable holder for the statements executed while serving one request."""
+
+    def __init__(self):
+        self.statements: List[Dict] = []
+        self.dropped_statements = 0
+
+    def add(self, statement: str, parameters, duration: float):
+        if len(self.statements) >= MAX_STATEMENTS_PER_REQUEST:
+            self.dropped_statements += 1
+            return
+        self.statements.append({
+            "sql": statement[:MAX_STATEMENT_LENGTH],
+            "duration_ms": round(duration * 1000, 3),
+            # Needed for plan capture only; dropped when the request finishes
+            "_raw": (statement, parameters),
+        })
+
+
+# Context variable holding the recording of the request being served
+current_recording: ContextVar[Optional[RequestRecording]] = ContextVar(
+    "current_recording", default=None
+)
+
+
+class FlightRecorder:
+    """
+    Bounded in-memory ring buffer of the last N slow requests in this worker.
+    """
+
+    def __init__(
+        self,
+        size: int = 50,
+        slow_request_threshold: float = 1.0,
+        slow_statement_threshold: float = 0.2,
+    ):
+        self.slow_request_threshold = slow_request_threshold
+        self.slow_statement_threshold = slow_statement_threshold
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._engine = None
+        self._instrumented = []
+        self._explain_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="flight-recorder-explain"
+        )
+
+    # ------------------------------------------------------------ engine hooks
+    def instrument(self, engine):
+        """
+        Attach statement timing listeners to a SQLAlchemy engine. Plans are
+        captured on the first engine instrumented.
+        """
+        if engine in self._instrumented:
+            return
+        self._instrumented.append(engine)
+        if self._engine is None:
+            self._engine = engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("flight_recorder_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("flight_recorder_start")
+            if not starts:
+                return
+            duration = time.perf_counter() - starts.pop()
+            recording = current_recording.get()
+            if recording is not None:
+                recording.add(statement, parameters, duration)
+
+    # ------------------------------------------------------- request lifecycle
+    def start_request(self):
+        """Begin recording statements for the current request."""
+        return current_recording.set(RequestRecording())
+
+    def finish_request(self, token, method: str, path: str, status_code: int, duration: float):
+        """
+        Stop recording. If the request was slow, store it in the ring buffer
+        and schedule plan capture for its slow statements.
+        """
+        recording = current_recording.get()
+        current_recording.reset(token)
+
+        if recording is None or duration <= self.slow_request_threshold:
+            return None
+
+        entry = {
+            "id": str(uuid4()),
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "recorded_at": datetime.now().isoformat(),
+            "statement_count": len(recording.statements) + recording.dropped_statements,
+            "dropped_statements": recording.dropped_statements,
+            "statements": recording.statements,
+        }
+
+        pending_plans = []
+        for statement in recording.statements:
+            raw = statement.pop("_raw", None)
+            if statement["duration_ms"] >= self.slow_statement_threshold * 1000:
+                statement["plan"] = None
+                pending_plans.append((statement, raw))
+
+        with self._lock:
+            self._entries.append(entry)
+
+        for statement, raw in pending_plans:
+            self._explain_executor.submit(self._capture_plan, statement, *raw)
+
+        perf_logger.warning(
+            f"Slow request recorded: {method} {path} took {duration:.4f}s "
+            f"with {entry['statement_count']} statements"
+        )
+        return entry
+
+    # ------------------------------------------------------------ explain
+    def _capture_plan(self, statement: Dict, sql: str, parameters):
+        if self._engine is None or self._engine.dialect.name != "postgresql":
+            statement["plan"] = "unavailable: plans are only captured on PostgreSQL"
+            return
+        if not sql.lstrip().lower().startswith(EXPLAINABLE_PREFIXES):
+            statement["plan"] = "skipped: only SELECT statements are explained"
+            return
+
+        raw_connection = None
+        try:
+            raw_connection = self._engine.raw_connection()
+            cursor = raw_connection.cursor()
+            cursor.execute(f"EXPLAIN (ANALYZE off) {sql}", parameters or None)
+            statement["plan"] = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.close()
+            raw_connection.rollback()
+        except Exception as e:
+            statement["plan"] = f"error: {str(e)}"
+        finally:
+            if raw_connection is not None:
+                raw_connection.close()
+
+    # ------------------------------------------------------------ queries
+    def snapshot(self, limit: Optional[int] = None, path: Optional[str] = None) -> List[Dict]:
+        """Return the recorded slow requests, newest first."""
+        with self._lock:
+            entries = list(self._entries)
+
+        entries.reverse()
+        if path:
+            entries = [e for e in entries if path in e["path"]]
+        if limit:
+            entries = entries[:limit]
+
+        return [
+            {**entry, "statements": [dict(s) for s in entry["statements"]]}
+            for entry in entries
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Per-worker recorder attached to the application engine
+flight_recorder = FlightRecorder(
+    size=settings.FLIGHT_RECORDER_SIZE,
+    slow_request_threshold=settings.SLOW_REQUEST_THRESHOLD,
+    slow_statement_threshold=settings.SLOW_STATEMENT_THRESHOLD,
+)
+flight_recorder.instrument(engine)
+flight_recorder.instrument(async_engine.sync_engine)
@@ -6,6 +6,7 @@ import logging
 from src.app.notification.notification_schemas import (
     NotificationServiceResponse
 )
+from src.app.utils.resilience import firebase_dependency
 
 SERVICE_ACCOUNT_PATH = "/app/src/app/utils/firebase/secret_files.json" # noqa
 
@@ -46,7 +47,7 @@ def send_push_notification(
         android=messaging.AndroidConfig(priority="high")
     )
     try:
-        response = messaging.send(message)
+        response = firebase_dependency.call(messaging.send, message)
         logger.info(f"Successfully sent message: {response}")
         return response
     except Exception as e:
@@ -54,10 +55,52 @@ def send_push_notification(
         return None
 
 
+def send_push_notification_batch(messages: list) -> list:
+    """
+    Send up to 500 topic notifications in one FCM request.
+    :param messages: dicts with topic, title, body and optional data and
+    badge (the app icon count).
+    :return: per message, None when delivered or the exception FCM
+    reported for it. Raises if the request itself fails or the Firebase
+    circuit is open.
+    """
+    fcm_messages = [
+        messaging.Message(
+            topic=message["topic"],
+            notification=messaging.Notification(
+                title=message["title"], body=message["body"]
+            ),
+            data=message.get("data") or {},
+            android=messaging.AndroidConfig(
+                priority="high",
+                notification=messaging.AndroidNotification(
+                    notification_count=message.get("badge")
+                )
+            ),
+            apns=messaging.APNSConfig(
+                payload=messaging.APNSPayload(
+                    aps=messaging.Aps(badge=message.get("badge"))
+                )
+            )
+        )
+        for message in messages
+    ]
+    response = firebase_dependency.call(messaging.send_each, fcm_messages)
+    logger.info(
+        f"Sent {response.success_count} of {len(fcm_messages)} messages"
+    )
+    return [
+        None if result.success else result.exception
+        for result in response.responses
+    ]
+
+
 def subscribe_news(tokens, topic):
     try:
         # check_or_up_firebase_app()
-        response = messaging.subscribe_to_topic(tokens, str(topic))
+        response = firebase_dependency.call(
+            messaging.subscribe_to_topic, tokens, str(topic)
+        )
         if response.failure_count > 0:
             return NotificationServiceResponse(
                 data=None,
@@ -65,6 +108,7 @@ def subscribe_news(tokens, topic):
                 status_code=200
             ).model_dump()
     except Exception as e:
+        logger.warning(f"Error in subscribe_news: {str(e)}")
         return NotificationServiceResponse(
             data=None,
             message=f"Error in subscribe_news: {str(e)}",
@@ -73,7 +117,9 @@ def subscribe_news(tokens, topic):
 
 
 def unsubscribe_news(tokens, topic):
-    response = messaging.unsubscribe_from_topic(tokens, topic)
+    response = firebase_dependency.call(
+        messaging.unsubscribe_from_topic, tokens, topic
+    )
     if response.failure_count > 0:
         return NotificationServiceResponse(
             data=None,
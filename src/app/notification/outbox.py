@@ -0,0 +1,375 @@
+"""
+Transactional outbox for push notifications.
+
+Request handlers call ``enqueue_notification`` instead of sending: the
+message is a ``notification_outbox`` row written in the handler's own
+transaction, so it is delivered exactly when the change it announces is
+committed and the request never waits on FCM.
+
+``NotificationDispatcher`` runs in every worker's event loop. It claims due
+rows with ``FOR UPDATE SKIP LOCKED`` (so workers never send the same row),
+delivers them through a transport in batches, and records the outcome:
+``sent``, a retry with exponential backoff, or ``failed`` once the attempts
+run out or the error is permanent. Committing a session that enqueued
+messages wakes the dispatcher, so delivery normally starts right away.
+
+Notifications with a ``kind`` that has a digest are coalesced per recipient:
+the first one goes out at once, and any more of that kind within
+``NOTIFICATION_COALESCE_WINDOW`` are held until the window ends and sent as
+one digest ("12 new payment requests (₹3.4L)"). Every message carries the
+recipient's badge, the number of notifications queued for them since they
+last cleared it.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from firebase_admin import exceptions as firebase_exceptions
+from firebase_admin import messaging
+from sqlalchemy import event, func, insert, or_
+from sqlalchemy.orm import Session
+from src.app.database.database import SessionLocal, settings
+from src.app.database.models import NotificationBadge, NotificationOutbox
+from src.app.schemas import constants
+from src.app.notification.notification_service import send_push_notification_batch
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# Session.info flag set by enqueue_notification, read on commit
+_ENQUEUED = "notifications_enqueued"
+
+
+class Delivery(NamedTuple):
+    """Outcome of one message; ``retryable`` only matters when there is an error."""
+    error: Optional[str] = None
+    retryable: bool = True
+
+
+def format_inr(amount: float) -> str:
+    """Short rupee amount for notification text: ₹45,000, ₹3.4L, ₹1.2Cr."""
+    for size, suffix in ((10_000_000, "Cr"), (100_000, "L")):
+        if abs(amount) >= size:
+            return f"₹{amount / size:.1f}".rstrip("0").rstrip(".") + suffix
+    return f"₹{amount:,.0f}"
+
+
+def _payment_request_digest(rows) -> tuple:
+    total = sum(row.amount or 0 for row in rows)
+    return "Payment Requests", f"{len(rows)} new payment requests ({format_inr(total)})"
+
+
+def _payment_status_digest(rows) -> tuple:
+    total = sum(row.amount or 0 for row in rows)
+    return "Payment Status Updated", f"{len(rows)} payments updated ({format_inr(total)})"
+
+
+# kind -> function of the merged rows returning (title, body)
+DIGESTS = {
+    constants.NOTIFICATION_KIND_PAYMENT_REQUEST: _payment_request_digest,
+    constants.NOTIFICATION_KIND_PAYMENT_STATUS: _payment_status_digest,
+}
+
+
+def coalesce_window() -> timedelta:
+    return timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW)
+
+
+def enqueue_notifications(
+    db: Session,
+    topics: Iterable[str],
+    title: str,
+    body: str,
+    data: dict = None,
+    kind: str = None,
+    amount: float = None,
+):
+    """
+    Queue one notification per topic in the caller's transaction; the caller
+    commits. With a digest ``kind``, recipients who got one of that kind
+    within the coalescing window join their open digest (or start one due at
+    the end of the window) instead of being notified right away.
+    """
+    topics = list(dict.fromkeys(topics))
+    if not topics:
+        return
+    now = datetime.now()
+    due = dict.fromkeys(topics, now)
+
+    window = coalesce_window()
+    if kind in DIGESTS and window:
+        recent = {
+            row[0] for row in db.query(NotificationOutbox.topic).filter(
+                NotificationOutbox.kind == kind,
+                NotificationOutbox.topic.in_(topics),
+                NotificationOutbox.created_at > now - window
+            ).distinct()
+        }
+        open_digests = dict(
+            db.query(NotificationOutbox.topic, func.min(NotificationOutbox.next_attempt_at)).filter(
+                NotificationOutbox.kind == kind,
+                NotificationOutbox.topic.in_(recent),
+                NotificationOutbox.status == OUTBOX_PENDING,
+                NotificationOutbox.attempts == 0,
+                NotificationOutbox.next_attempt_at > now
+            ).group_by(NotificationOutbox.topic).all()
+        ) if recent else {}
+        for topic in recent:
+            due[topic] = open_digests.get(topic, now + window)
+
+    # Executed right away, so a later call in this transaction sees these rows
+    db.execute(insert(NotificationOutbox), [
+        {
+            "topic": topic,
+            "kind": kind,
+            "title": title,
+            "body": body,
+            "data": json.dumps(data) if data else None,
+            "amount": amount,
+            "created_at": now,
+            "next_attempt_at": due[topic],
+        }
+        for topic in topics
+    ])
+    db.info[_ENQUEUED] = True
+
+
+def enqueue_notification(db: Session, topic: str, title: str, body: str, data: dict = None,
+                         kind: str = None, amount: float = None):
+    """Queue a push notification in the caller's transaction; the caller commits."""
+    enqueue_notifications(db, [topic], title, body, data=data, kind=kind, amount=amount)
+
+
+def badge_counts(db: Session, topics: Iterable[str]) -> Dict[str, int]:
+    """Notifications queued for each topic since its badge was last cleared."""
+    topics = list(set(topics))
+    rows = db.query(NotificationOutbox.topic, func.count(NotificationOutbox.id)).outerjoin(
+        NotificationBadge, NotificationBadge.topic == NotificationOutbox.topic
+    ).filter(
+        NotificationOutbox.topic.in_(topics),
+        or_(
+            NotificationBadge.cleared_at.is_(None),
+            NotificationOutbox.created_at > NotificationBadge.cleared_at
+        )
+    ).group_by(NotificationOutbox.topic).all()
+    counts = dict.fromkeys(topics, 0)
+    counts.update(dict(rows))
+    return counts
+
+
+def clear_badge(db: Session, topic: str):
+    """Reset a topic's badge to zero; the caller commits."""
+    badge = db.query(NotificationBadge).filter(NotificationBadge.topic == topic).first()
+    if badge is None:
+        db.add(NotificationBadge(topic=topic, cleared_at=datetime.now()))
+    else:
+        badge.cleared_at = datetime.now()
+
+
+def build_message(rows: List[NotificationOutbox], badges: Dict[str, int]) -> dict:
+    """The push for one outbox row, or the digest of several of one kind."""
+    first = rows[0]
+    if len(rows) == 1:
+        title, body = first.title, first.body
+        data = json.loads(first.data) if first.data else {}
+    else:
+        title, body = DIGESTS[first.kind](rows)
+        data = {"kind": first.kind, "count": str(len(rows))}
+    badge = badges.get(first.topic, 0)
+    return {
+        "topic": first.topic,
+        "title": title,
+        "body": body,
+        "data": {**data, "badge": str(badge)},
+        "badge": badge,
+    }
+
+
+class FCMTransport:
+    """Delivers through Firebase Cloud Messaging, one request per batch."""
+
+    PERMANENT_ERRORS = (
+        messaging.UnregisteredError,
+        messaging.SenderIdMismatchError,
+        firebase_exceptions.InvalidArgumentError,
+    )
+
+    def send(self, messages: List[dict]) -> List[Delivery]:
+        try:
+            errors = send_push_notification_batch(messages)
+        except Exception as e:
+            return [Delivery(error=str(e))] * len(messages)
+        return [
+            Delivery() if error is None
+            else Delivery(error=str(error), retryable=not isinstance(error, self.PERMANENT_ERRORS))
+            for error in errors
+        ]
+
+
+class StubTransport:
+    """
+    Records messages instead of sending them. ``fail`` may be set to a
+    function of the message returning a Delivery to simulate FCM errors.
+    """
+
+    def __init__(self, fail=None):
+        self.sent: List[dict] = []
+        self.fail = fail
+
+    def send(self, messages: List[dict]) -> List[Delivery]:
+        results = []
+        for message in messages:
+            result = self.fail(message) if self.fail else None
+            if result is None or result.error is None:
+                self.sent.append(message)
+                result = Delivery()
+            results.append(result)
+        return results
+
+
+TRANSPORTS = {"fcm": FCMTransport, "stub": StubTransport}
+
+
+def retry_delay(attempts: int, base: float) -> timedelta:
+    """Backoff before the next attempt: base, 2*base, 4*base ... capped at an hour."""
+    return min(timedelta(seconds=base * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def dispatch_pending(
+    db: Session,
+    transport,
+    limit: int = 500,
+    max_attempts: int = 6,
+    retry_base: float = 30.0,
+) -> int:
+    """
+    Deliver up to ``limit`` due notifications and record the outcome of each.
+    Returns the number of rows processed.
+    """
+    now = datetime.now()
+    rows = db.query(NotificationOutbox).filter(
+        NotificationOutbox.status == OUTBOX_PENDING,
+        NotificationOutbox.next_attempt_at <= now
+    ).order_by(NotificationOutbox.id).limit(limit).with_for_update(skip_locked=True).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    # Rows of a digest kind for the same recipient become one message
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.topic, row.kind) if row.kind in DIGESTS else row.id].append(row)
+    groups = list(groups.values())
+    badges = badge_counts(db, {row.topic for row in rows})
+    deliveries = transport.send([build_message(group, badges) for group in groups])
+
+    failed = 0
+    for group, delivery in zip(groups, deliveries):
+        for row in group:
+            row.attempts += 1
+            row.last_error = delivery.error
+            if delivery.error is None:
+                row.status = OUTBOX_SENT
+                row.sent_at = now
+            elif not delivery.retryable or row.attempts >= max_attempts:
+                row.status = OUTBOX_FAILED
+                failed += 1
+            else:
+                row.next_attempt_at = now + retry_delay(row.attempts, retry_base)
+                failed += 1
+    db.commit()
+
+    if failed:
+        logger.warning(f"Notification dispatch: {len(rows) - failed} sent, {failed} not delivered")
+    return len(rows)
+
+
+class NotificationDispatcher:
+    """Background loop delivering the outbox; see the module docstring."""
+
+    def __init__(self, transport, interval: float, batch_size: int, max_attempts: int, retry_base: float):
+        self.transport = transport
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def dispatch_once(self) -> int:
+        db = SessionLocal()
+        try:
+            return dispatch_pending(
+                db, self.transport, self.batch_size, self.max_attempts, self.retry_base
+            )
+        finally:
+            db.close()
+
+    async def run(self):
+        while True:
+            self._wake.clear()
+            try:
+                processed = await asyncio.to_thread(self.dispatch_once)
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {str(e)}")
+                processed = 0
+            # A full batch means more are probably due
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self.run())
+        logger.info(f"Notification dispatcher started ({type(self.transport).__name__})")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self):
+        """Thread-safe: start a dispatch pass now instead of at the next interval."""
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+
+dispatcher = NotificationDispatcher(
+    transport=TRANSPORTS.get(settings.NOTIFICATION_TRANSPORT, FCMTransport)(),
+    interval=settings.NOTIFICATION_DISPATCH_INTERVAL,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+    retry_base=settings.NOTIFICATION_RETRY_BASE,
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def wake_dispatcher(session):
+    if session.info.pop(_ENQUEUED, False):
+        dispatcher.wake()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def forget_enqueued(session):
+    session.info.pop(_ENQUEUED, None)
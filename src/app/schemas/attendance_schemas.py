@@ -132,6 +132,8 @@ class ProjectAttendanceResponse(BaseModel):
     no_of_labours: int
     attendance_date: date
     photo_path: Optional[str] = None
+    photo_thumb_url: Optional[str] = None
+    photo_medium_url: Optional[str] = None
     marked_at: datetime
     location: LocationData
     notes: Optional[str] = None
@@ -280,3 +282,10 @@ class AdminAttendanceAnalyticsRequest(BaseModel):
             raise ValueError("Year must be between 2020 and 2030")
 
         return value
+
+
+# Holiday Schemas
+class HolidayCreate(BaseModel):
+    holiday_date: date = Field(..., description="Day off")
+    name: str = Field(..., min_length=1, max_length=255, description="Holiday name")
+    project_id: Optional[UUID] = Field(None, description="Only for this project; all projects when omitted")
@@ -11,6 +11,8 @@ ONLY_PDFS_ALLOWED = "Only PDF files are allowed."
 UPLOAD_DIR = "uploads/payments"
 UPLOAD_DIR_ADMIN = "uploads/admin"
 KHATABOOK_FOLDER = "uploads/khatabook_files"
+# Content-addressed attachment store, sharded as <sha[:2]>/<sha[2:4]>/<sha><ext>
+ATTACHMENT_STORE_DIR = "uploads/store"
 CANT_DECLINE_PAYMENTS = "Not authorized to decline payments"
 PERSON_EXISTS = (
     "A person with the same account number or ifsc code already exists."
@@ -31,4 +33,14 @@ KHATABOOK_PAYMENT_TYPE = "Khatabook"
 KHATABOOK_ENTRY_TYPE_DEBIT = "Debit"
 KHATABOOK_ENTRY_TYPE_CREDIT = "Credit"
 
+# Entities with hard-delete tombstones for delta sync; payments and persons
+# are only soft-deleted
+SYNC_ENTITY_KHATABOOK = "khatabook"
+SYNC_ENTITY_ITEM = "item"
+
+# Push notification kinds; notifications of the same kind to the same
+# recipient are merged into digests (see src.app.notification.outbox)
+NOTIFICATION_KIND_PAYMENT_REQUEST = "payment_request"
+NOTIFICATION_KIND_PAYMENT_STATUS = "payment_status"
+
 HOST_URL = os.getenv("HOST_URL")
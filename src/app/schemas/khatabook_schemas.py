@@ -1,6 +1,7 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Any
 from uuid import UUID
+from datetime import datetime
 
 #
 # PersonOut
@@ -86,6 +87,24 @@ class MarkSuspiciousRequest(BaseModel):
     is_suspicious: bool
 
 
+#
+# Batch upload of entries recorded offline
+#
+class KhatabookBatchEntry(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+    amount: float
+    remarks: Optional[str] = None
+    person_id: UUID
+    project_id: Optional[UUID] = None
+    item_ids: List[UUID] = []
+    expense_date: Optional[datetime] = None
+    payment_mode: Optional[str] = None
+
+
+class KhatabookBatchRequest(BaseModel):
+    entries: List[KhatabookBatchEntry] = Field(..., min_length=1, max_length=200)
+
+
 class KhatabookServiceResponse(BaseModel):
     data: Optional[Any] = None
     message: str
@@ -168,6 +168,22 @@ class CreatePaymentRequest(BaseModel):
         }
 
 
+class BulkApprovePaymentsRequest(BaseModel):
+    payment_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    bank_uuid: Optional[UUID] = Field(None, description="Bank to deduct from; required when transferring")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "payment_ids": [
+                    "f82481f7-ec85-4790-8868-aa9a24906d36",
+                    "6f3e55da-1734-42d6-90ef-ae1b3e9ef759"
+                ],
+                "bank_uuid": "9c4f2ae4-a046-421f-b52f-a50c169165c3"
+            }
+        }
+
+
 class PersonDetail(BaseModel):
     uuid: UUID
     name: str
@@ -4,10 +4,11 @@ Combines self attendance and project attendance functionality
 """
 
 import os
+import base64
 import json
 import re
 import traceback
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID, uuid4
 from datetime import datetime, date, timedelta
 from src.app.schemas import constants
@@ -24,11 +25,16 @@ from fastapi import Form, File, UploadFile, Depends, Response
 from fastapi import status
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, func
+from sqlalchemy import Float, desc, func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from pydantic import ValidationError
-from src.app.database.database import get_db
+from src.app.database.database import get_async_db, get_db
+from src.app.database.replica import replica_reads
 from src.app.database.models import (
+    Holiday,
     SelfAttendance,
     ProjectAttendance,
     ProjectDailyWage,
@@ -63,25 +69,60 @@ from src.app.schemas.attendance_schemas import (
     ItemListView,
     AttendanceAnalyticsResponse,
     AttendanceAnalyticsData,
-    AdminAttendanceAnalyticsRequest
+    AdminAttendanceAnalyticsRequest,
+    HolidayCreate
 )
-from src.app.services.auth_service import get_current_user, verify_password
+from src.app.services.auth_service import get_current_user, get_current_user_async, verify_password
 from src.app.services.wage_service import get_effective_wage_rate, calculate_and_save_wage
 from src.app.utils.logging_config import get_logger
+from src.app.utils.image_variants import remove_variants, variant_urls
+from src.app.utils.uploads import save_upload, upload_size_error
 from src.app.utils.attendance_utils import (
     get_current_month_working_days,
     calculate_attendance_percentage,
     get_attendance_feedback,
     parse_month_year,
     get_month_date_range,
+    get_months_in_range,
     get_working_days_in_month
 )
+from src.app.utils.date_filters import date_range_filter, inclusive_range, month_range
+from src.app.utils.working_calendar import WorkingCalendar, load_holidays, load_month_holidays
 
 logger = get_logger(__name__)
 
 # Create the main attendance router
 attendance_router = APIRouter(prefix="/attendance")
 
+# Widest month range /admin/analytics/batch answers in one call
+MAX_ANALYTICS_BATCH_MONTHS = 12
+
+# Page sizes of /attendance/self/history when paginated
+SELF_HISTORY_PAGE_SIZE = 50
+SELF_HISTORY_MAX_PAGE_SIZE = 200
+
+class hours_between(FunctionElement):
+    """Hours from ``start`` to ``end`` computed by the database; NULL if either is NULL."""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(hours_between)
+def _hours_between_postgresql(element, compiler, **kw):
+    start, end = element.clauses
+    return f"(EXTRACT(EPOCH FROM {compiler.process(end, **kw)} - {compiler.process(start, **kw)}) / 3600)"
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    # SQLite has no interval type; subtracting timestamps would compare their text
+    start, end = element.clauses
+    return f"(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)})) * 24"
+
+
+# Hours between punch in and punch out (NULL until punched out)
+SELF_ATTENDANCE_HOURS = hours_between(SelfAttendance.punch_in_time, SelfAttendance.punch_out_time)
+
 
 def validate_coordinates(latitude: float, longitude: float) -> bool:
     """Validate latitude and longitude coordinates"""
@@ -149,6 +190,39 @@ def calculate_hours_worked(punch_in: datetime, punch_out: datetime) -> str:
         return None
 
 
+def encode_history_cursor(attendance_date: date, record_id: int) -> str:
+    """Opaque cursor for the self-attendance history page after this record."""
+    return base64.urlsafe_b64encode(f"{attendance_date.isoformat()}|{record_id}".encode()).decode()
+
+
+def decode_history_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        attendance_date, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.strptime(attendance_date, "%Y-%m-%d").date(), int(record_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def summarize_self_attendance(query) -> dict:
+    """Status counts and total hours of the records ``query`` matches, in one grouped query."""
+    rows = query.with_entities(
+        SelfAttendance.status,
+        func.count(SelfAttendance.id),
+        func.sum(SELF_ATTENDANCE_HOURS)
+    ).group_by(SelfAttendance.status).all()
+
+    status_counts = {attendance_status.value: 0 for attendance_status in AttendanceStatus}
+    total_hours = 0.0
+    for attendance_status, count, hours in rows:
+        status_counts[attendance_status] = status_counts.get(attendance_status, 0) + count
+        total_hours += float(hours or 0)
+    return {
+        "total_records": sum(status_counts.values()),
+        "status_counts": status_counts,
+        "total_hours": round(total_hours, 1)
+    }
+
+
 def get_current_hours_worked(punch_in: datetime) -> str:
     """Calculate current hours worked since punch in"""
     try:
@@ -658,6 +732,7 @@ def cancel_self_day_off(
     "/attendance/self/history",
     tags=["Self Attendance"],
 )
+@replica_reads
 def get_self_attendance_history(
     db: Session = Depends(get_db),
     user_uuid: Optional[UUID] = Query(None),
@@ -667,19 +742,31 @@ def get_self_attendance_history(
     from_date: Optional[str] = Query(None),
     to_date: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=SELF_HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    summary: bool = Query(False),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get self attendance history for the current user, or for all users if admin/super admin.
+
+    Without limit, cursor or summary, returns every matching record as a list;
+    for an admin without user_uuid (the whole company) only the latest
+    SELF_HISTORY_MAX_PAGE_SIZE. With any of them, returns a page of at most
+    ``limit`` records (newest first, SELF_HISTORY_PAGE_SIZE by default) with
+    ``next_cursor`` to pass back for the following page, and with
+    summary=true also the status counts and total hours over everything the
+    filters match.
     """
     try:
         # Build base query with user join
         query = (db.query(SelfAttendance, User)
                 .join(User, SelfAttendance.user_id == User.uuid)
                 .filter(SelfAttendance.is_deleted.is_(False)))
+        is_admin = current_user.role in {UserRole.ADMIN, UserRole.SUPER_ADMIN}
 
         # Role-based filtering
-        if current_user.role not in {UserRole.ADMIN, UserRole.SUPER_ADMIN}:
+        if not is_admin:
             # Non-admins: can only see their own
             query = query.filter(SelfAttendance.user_id == current_user.uuid)
         elif user_uuid:
@@ -712,16 +799,21 @@ def get_self_attendance_history(
                     status_code=400
                 ).to_dict()
             year, mon = map(int, month.split("-"))
-            query = query.filter(
-                func.extract('year', SelfAttendance.attendance_date) == year,
-                func.extract('month', SelfAttendance.attendance_date) == mon
-            )
+            try:
+                month_dates = month_range(year, mon)
+            except ValueError:
+                return AttendanceResponse(
+                    data=None,
+                    message="Invalid month format. Use 'YYYY-MM'.",
+                    status_code=400
+                ).to_dict()
+            query = query.filter(*date_range_filter(SelfAttendance.attendance_date, month_dates))
 
         # Filter by from_date/to_date
+        from_date_obj = to_date_obj = None
         if from_date:
             try:
                 from_date_obj = datetime.strptime(from_date, "%Y-%m-%d").date()
-                query = query.filter(SelfAttendance.attendance_date >= from_date_obj)
             except Exception:
                 return AttendanceResponse(
                     data=None,
@@ -731,23 +823,61 @@ def get_self_attendance_history(
         if to_date:
             try:
                 to_date_obj = datetime.strptime(to_date, "%Y-%m-%d").date()
-                query = query.filter(SelfAttendance.attendance_date <= to_date_obj)
             except Exception:
                 return AttendanceResponse(
                     data=None,
                     message="Invalid to_date format. Use 'YYYY-MM-DD'.",
                     status_code=400
                 ).to_dict()
+        query = query.filter(
+            *date_range_filter(SelfAttendance.attendance_date, inclusive_range(from_date_obj, to_date_obj))
+        )
+
+        paginated = bool(limit or cursor or summary)
+        # Old app releases list the whole company without paging; they still
+        # get a list, but a bounded one
+        capped = not paginated and is_admin and not user_uuid
+        summary_data = summarize_self_attendance(query) if summary else None
+
+        query = query.add_columns(SELF_ATTENDANCE_HOURS.label("hours_worked"))
 
         # Order and fetch
-        query = query.order_by(SelfAttendance.attendance_date.desc())
+        if paginated:
+            page_size = limit or SELF_HISTORY_PAGE_SIZE
+            # Keyset pagination on (attendance_date, id); undated rows have no place in it
+            query = query.filter(SelfAttendance.attendance_date.isnot(None))
+            if cursor:
+                try:
+                    cursor_date, cursor_id = decode_history_cursor(cursor)
+                except ValueError:
+                    return AttendanceResponse(
+                        data=None,
+                        message="Invalid cursor.",
+                        status_code=400
+                    ).to_dict()
+                query = query.filter(
+                    tuple_(SelfAttendance.attendance_date, SelfAttendance.id) < tuple_(cursor_date, cursor_id)
+                )
+            query = query.order_by(
+                SelfAttendance.attendance_date.desc(), SelfAttendance.id.desc()
+            ).limit(page_size + 1)
+        else:
+            query = query.order_by(SelfAttendance.attendance_date.desc(), SelfAttendance.id.desc())
 
-        if recent:
-            query = query.limit(5)
+            if recent:
+                query = query.limit(5)
+            elif capped:
+                query = query.limit(SELF_HISTORY_MAX_PAGE_SIZE)
 
         attendance_records = query.all()
 
-        if not attendance_records:
+        next_cursor = None
+        if paginated and len(attendance_records) > page_size:
+            attendance_records = attendance_records[:page_size]
+            last_record = attendance_records[-1][0]
+            next_cursor = encode_history_cursor(last_record.attendance_date, last_record.id)
+
+        if not attendance_records and not paginated:
             return AttendanceResponse(
                 data=[],
                 message="No attendance records found",
@@ -756,12 +886,8 @@ def get_self_attendance_history(
 
         # Prepare response data
         response_data = []
-        for record, user in attendance_records:
-            total_hours = None
-            if record.punch_in_time and record.punch_out_time:
-                total_hours = calculate_hours_worked(
-                    record.punch_in_time, record.punch_out_time
-                )
+        for record, user, hours_worked in attendance_records:
+            total_hours = f"{hours_worked:.1f}" if hours_worked is not None else None
 
             # Safely handle None for location fields
             punch_in_lat = record.punch_in_latitude if record.punch_in_latitude is not None else 0.0
@@ -793,9 +919,23 @@ def get_self_attendance_history(
                 status=AttendanceStatus(record.status)
             ).model_dump())
 
+        if paginated:
+            response_data = {
+                "attendances": response_data,
+                "next_cursor": next_cursor,
+                "summary": summary_data
+            }
+
+        message = "Self attendance history retrieved successfully"
+        if capped and not recent and len(response_data) == SELF_HISTORY_MAX_PAGE_SIZE:
+            message = (
+                f"Latest {SELF_HISTORY_MAX_PAGE_SIZE} records; pass user_uuid, "
+                "or limit and cursor, for the rest"
+            )
+
         return AttendanceResponse(
             data=response_data,
-            message="Self attendance history retrieved successfully",
+            message=message,
             status_code=200
         ).to_dict()
 
@@ -813,9 +953,9 @@ def get_self_attendance_history(
     "/self/status", 
     tags=["Self Attendance"]
 )
-def get_self_attendance_status(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_self_attendance_status(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Get current self attendance status for today.
@@ -826,11 +966,14 @@ def get_self_attendance_status(
     """
     try:
         today = date.today()
-        attendance_record = db.query(SelfAttendance).filter(
-            SelfAttendance.user_id == current_user.uuid,
-            SelfAttendance.attendance_date == today,
-            SelfAttendance.is_deleted.is_(False)
-        ).first()
+        result = await db.execute(
+            select(SelfAttendance).filter(
+                SelfAttendance.user_id == current_user.uuid,
+                SelfAttendance.attendance_date == today,
+                SelfAttendance.is_deleted.is_(False)
+            )
+        )
+        attendance_record = result.scalars().first()
 
         if not attendance_record:
             # No record means absent
@@ -917,6 +1060,11 @@ def mark_project_attendance(
     current_user: User = Depends(get_current_user),
     response: Response = None,
 ):
+    size_error = upload_size_error([attendance_photo])
+    if size_error:
+        response.status_code = 413
+        return {"status_code": 413, "message": size_error}
+
     try:
         # 1️⃣ Parse & validate JSON payload
         try:
@@ -972,13 +1120,9 @@ def mark_project_attendance(
         # 3️⃣ Handle photo upload
         photo_path = None
         if attendance_photo:
-            ext = os.path.splitext(attendance_photo.filename)[1]
-            fname = f"Attendance_{str(uuid4())}{ext}"
-            upload_dir = "uploads/attendance_photos"
-            os.makedirs(upload_dir, exist_ok=True)
-            photo_path = os.path.join(upload_dir, fname)
-            with open(photo_path, "wb") as buffer:
-                buffer.write(attendance_photo.file.read())
+            photo_path = save_upload(
+                attendance_photo, "uploads/attendance_photos", prefix="Attendance_"
+            ).path
 
         # 4️⃣ Create & save attendance record
         today = date.today()
@@ -1028,6 +1172,8 @@ def mark_project_attendance(
                 constants.HOST_URL + "/" + photo_path
                 if photo_path else None
             ),
+            "photo_thumb_url": variant_urls(photo_path)["thumb"],
+            "photo_medium_url": variant_urls(photo_path)["medium"],
             "wage_calculation": wage_calc and {
                 "uuid": str(wage_calc.uuid),
                 "daily_wage_rate": wage_calc.daily_wage_rate,
@@ -1084,6 +1230,11 @@ def update_project_attendance(
     current_user: User = Depends(get_current_user),
     response: Response = None,
 ):
+    size_error = upload_size_error([attendance_photo])
+    if size_error:
+        response.status_code = 413
+        return {"status_code": 413, "message": size_error}
+
     try:
         # 1️⃣ Fetch existing record
         att = db.query(ProjectAttendance).filter(
@@ -1183,18 +1334,14 @@ def update_project_attendance(
             if att.photo_path and os.path.exists(att.photo_path):
                 try:
                     os.remove(att.photo_path)
+                    remove_variants(att.photo_path)
                 except Exception as e:
                     logger.warning(f"Failed to delete old photo: {e}")
 
             # Save new photo
-            ext = os.path.splitext(attendance_photo.filename)[1]
-            fname = f"Attendance_{str(uuid4())}{ext}"
-            upload_dir = "uploads/attendance_photos"
-            os.makedirs(upload_dir, exist_ok=True)
-            photo_path = os.path.join(upload_dir, fname)
-            with open(photo_path, "wb") as buffer:
-                buffer.write(attendance_photo.file.read())
-            att.photo_path = photo_path
+            att.photo_path = save_upload(
+                attendance_photo, "uploads/attendance_photos", prefix="Attendance_"
+            ).path
 
         # 6️⃣ Update fields
         for key, value in update_data.items():
@@ -1277,7 +1424,9 @@ def update_project_attendance(
             "photo_url": (
                 constants.HOST_URL + "/" + att.photo_path
                 if att.photo_path else None
-            )
+            ),
+            "photo_thumb_url": variant_urls(att.photo_path)["thumb"],
+            "photo_medium_url": variant_urls(att.photo_path)["medium"]
         }
 
         if att.wage_calculation:
@@ -1458,6 +1607,7 @@ def get_project_attendance_history(
                     wage_config_effective_date=wc.project_daily_wage.effective_date if wc.project_daily_wage else None
                 )
 
+            photo_variants = variant_urls(attendance.photo_path)
             attendance_data = ProjectAttendanceResponse(
                 uuid=attendance.uuid,
                 project=ProjectInfo(
@@ -1476,6 +1626,8 @@ def get_project_attendance_history(
                 no_of_labours=attendance.no_of_labours or 0,
                 attendance_date=attendance.attendance_date,
                 photo_path=constants.HOST_URL + "/" + attendance.photo_path if attendance.photo_path else None,
+                photo_thumb_url=photo_variants["thumb"],
+                photo_medium_url=photo_variants["medium"],
                 marked_at=attendance.marked_at,
                 location=LocationData(
                     latitude=attendance.latitude or 0.0,
@@ -1517,12 +1669,15 @@ def get_project_attendance_history(
 
 
 @attendance_router.get("/analytics", tags=["Attendance Analytics"])
+@replica_reads
 def get_user_attendance_analytics(
+    project_id: Optional[UUID] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get attendance analytics for the current logged-in user for the current month.
+    Global holidays, and project_id's own when given, are not working days.
 
     Returns:
         - Attendance percentage for current month
@@ -1542,7 +1697,16 @@ def get_user_attendance_analytics(
         current_month = today.month
 
         # Get total working days in current month
-        total_working_days = get_current_month_working_days()
+        try:
+            holidays = load_month_holidays(db, current_year, current_month, project_id)
+        except Exception as e:
+            logger.error(f"Error querying holidays for user {current_user.uuid}: {str(e)}")
+            return AttendanceResponse(
+                data=None,
+                message="Error retrieving attendance data",
+                status_code=500
+            ).to_dict()
+        total_working_days = get_current_month_working_days(holidays)
 
         if total_working_days == 0:
             return AttendanceResponse(
@@ -1625,9 +1789,11 @@ def get_user_attendance_analytics(
 
 
 @attendance_router.get("/admin/analytics", tags=["Attendance Analytics"])
+@replica_reads
 def get_admin_attendance_analytics(
     month: str = Query(..., description="Month in MM-YYYY format (e.g., '12-2024')"),
     user_id: UUID = Query(..., description="UUID of the user to analyze"),
+    project_id: Optional[UUID] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1637,6 +1803,7 @@ def get_admin_attendance_analytics(
     Args:
         month: Month in MM-YYYY format (e.g., "12-2024")
         user_id: UUID of the user to analyze
+        project_id: Also count this project's own holidays as days off
 
     Returns:
         - Attendance percentage for specified month
@@ -1699,7 +1866,16 @@ def get_admin_attendance_analytics(
             ).to_dict()
 
         # Get total working days in specified month
-        total_working_days = get_working_days_in_month(target_year, target_month)
+        try:
+            holidays = load_month_holidays(db, target_year, target_month, project_id)
+        except Exception as e:
+            logger.error(f"Error querying holidays for user {user_id}: {str(e)}")
+            return AttendanceResponse(
+                data=None,
+                message="Error retrieving attendance data",
+                status_code=500
+            ).to_dict()
+        total_working_days = get_working_days_in_month(target_year, target_month, holidays)
 
         if total_working_days == 0:
             return AttendanceResponse(
@@ -1781,3 +1957,339 @@ def get_admin_attendance_analytics(
         ).to_dict()
 
 
+@attendance_router.get("/admin/analytics/batch", tags=["Attendance Analytics"])
+@replica_reads
+def get_admin_attendance_analytics_batch(
+    from_month: str = Query(..., description="First month in MM-YYYY format (e.g., '01-2025')"),
+    to_month: Optional[str] = None,
+    project_id: Optional[UUID] = None,
+    role: Optional[UserRole] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get attendance analytics for every active user and month in a range (Admin/Super Admin only).
+
+    Present days for all users and months come from one grouped query, and
+    working days from the working-day calendar, instead of one call to
+    /admin/analytics per user and month.
+
+    Args:
+        from_month: First month in MM-YYYY format
+        to_month: Last month in MM-YYYY format (defaults to from_month), at most
+            MAX_ANALYTICS_BATCH_MONTHS months after from_month
+        project_id: Only users mapped to this project; its own holidays count as days off
+        role: Only users with this role
+
+    Returns:
+        - The months covered
+        - Per user: present days, working days, percentage and feedback for each month
+    """
+    try:
+        if not current_user or not hasattr(current_user, 'uuid') or not hasattr(current_user, 'role'):
+            return AttendanceResponse(
+                data=None,
+                message="Invalid user session",
+                status_code=401
+            ).to_dict()
+
+        if current_user.role not in {UserRole.ADMIN, UserRole.SUPER_ADMIN}:
+            return AttendanceResponse(
+                data=None,
+                message="Access denied. Admin or Super Admin privileges required.",
+                status_code=403
+            ).to_dict()
+
+        try:
+            start_month, start_year = parse_month_year(from_month.strip())
+            end_month, end_year = parse_month_year((to_month or from_month).strip())
+        except (ValueError, AttributeError) as e:
+            return AttendanceResponse(
+                data=None,
+                message=str(e) or "Month parameter is required",
+                status_code=400
+            ).to_dict()
+
+        months = get_months_in_range(start_month, start_year, end_month, end_year)
+        if not months:
+            return AttendanceResponse(
+                data=None,
+                message="to_month must not be before from_month",
+                status_code=400
+            ).to_dict()
+        if len(months) > MAX_ANALYTICS_BATCH_MONTHS:
+            return AttendanceResponse(
+                data=None,
+                message=f"At most {MAX_ANALYTICS_BATCH_MONTHS} months can be requested at once",
+                status_code=400
+            ).to_dict()
+
+        range_start = get_month_date_range(*months[0])[0]
+        range_end = get_month_date_range(*months[-1])[1]
+
+        try:
+            users_query = db.query(User.uuid, User.name, User.role).filter(
+                User.is_deleted.is_(False),
+                User.is_active.is_(True)
+            )
+            if role:
+                users_query = users_query.filter(User.role == role.value)
+            if project_id:
+                users_query = users_query.filter(
+                    User.uuid.in_(
+                        select(ProjectUserMap.user_id).where(
+                            ProjectUserMap.project_id == project_id,
+                            ProjectUserMap.is_deleted.is_(False)
+                        )
+                    )
+                )
+            users = users_query.order_by(User.name).all()
+
+            # Present days per user and month, in one round trip
+            present_rows = []
+            if users:
+                attendance_month = func.date_trunc('month', SelfAttendance.attendance_date)
+                present_rows = db.query(
+                    SelfAttendance.user_id,
+                    attendance_month,
+                    func.count(SelfAttendance.id)
+                ).filter(
+                    SelfAttendance.user_id.in_([user.uuid for user in users]),
+                    SelfAttendance.attendance_date >= range_start,
+                    SelfAttendance.attendance_date <= range_end,
+                    SelfAttendance.is_deleted.is_(False),
+                    SelfAttendance.status.in_(['present', 'approved'])  # Valid attendance statuses
+                ).group_by(SelfAttendance.user_id, attendance_month).all()
+
+            working_calendar = WorkingCalendar(load_holidays(db, range_start, range_end, project_id))
+        except Exception as e:
+            logger.error(f"Error querying batch attendance data: {str(e)}")
+            return AttendanceResponse(
+                data=None,
+                message="Error retrieving attendance data",
+                status_code=500
+            ).to_dict()
+
+        present_days = {
+            (user_id, month_start.year, month_start.month): count
+            for user_id, month_start, count in present_rows
+        }
+        working_days = {
+            (year, month): working_calendar.working_days_in_month(year, month)
+            for year, month in months
+        }
+
+        users_data = []
+        for user in users:
+            user_months = []
+            for year, month in months:
+                present = present_days.get((user.uuid, year, month), 0)
+                percentage = max(0, min(100, calculate_attendance_percentage(present, working_days[(year, month)])))
+                user_months.append({
+                    "month": f"{month:02d}-{year}",
+                    "present_days": present,
+                    "working_days": working_days[(year, month)],
+                    "percentage": int(percentage),
+                    "feedback": get_attendance_feedback(percentage)
+                })
+            users_data.append({
+                "user_id": str(user.uuid),
+                "name": user.name,
+                "role": user.role,
+                "months": user_months
+            })
+
+        return AttendanceResponse(
+            data={
+                "months": [f"{month:02d}-{year}" for year, month in months],
+                "users": users_data
+            },
+            message="Attendance Analytics Fetched Successfully.",
+            status_code=200
+        ).to_dict()
+
+    except Exception as e:
+        logger.error(f"Error in get_admin_attendance_analytics_batch: {str(e)}")
+        logger.error(traceback.format_exc())
+        return AttendanceResponse(
+            data=None,
+            message=f"Internal server error: {str(e)}",
+            status_code=500
+        ).to_dict()
+
+
+def format_holiday(holiday: Holiday) -> dict:
+    return {
+        "uuid": str(holiday.uuid),
+        "holiday_date": holiday.holiday_date.isoformat(),
+        "name": holiday.name,
+        "project_id": str(holiday.project_id) if holiday.project_id else None,
+    }
+
+
+@attendance_router.post("/holidays", tags=["Attendance Holidays"])
+def create_holiday(
+    payload: HolidayCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add a day off (Admin/Super Admin only). Without project_id it applies to
+    every project; holidays are not counted as working days in analytics.
+    """
+    try:
+        if not current_user or not hasattr(current_user, 'uuid'):
+            return AttendanceResponse(
+                data=None,
+                message="Invalid user session",
+                status_code=401
+            ).to_dict()
+
+        if current_user.role not in {UserRole.ADMIN, UserRole.SUPER_ADMIN}:
+            return AttendanceResponse(
+                data=None,
+                message="Access denied. Admin or Super Admin privileges required.",
+                status_code=403
+            ).to_dict()
+
+        if payload.project_id:
+            project = db.query(Project).filter(
+                Project.uuid == payload.project_id,
+                Project.is_deleted.is_(False)
+            ).first()
+            if not project:
+                return AttendanceResponse(
+                    data=None,
+                    message="Project not found",
+                    status_code=404
+                ).to_dict()
+
+        existing = db.query(Holiday).filter(
+            Holiday.holiday_date == payload.holiday_date,
+            Holiday.project_id.is_(None) if payload.project_id is None else Holiday.project_id == payload.project_id,
+            Holiday.is_deleted.is_(False)
+        ).first()
+        if existing:
+            return AttendanceResponse(
+                data=format_holiday(existing),
+                message="Holiday already exists for this date",
+                status_code=400
+            ).to_dict()
+
+        holiday = Holiday(
+            holiday_date=payload.holiday_date,
+            name=payload.name,
+            project_id=payload.project_id,
+            created_by=current_user.uuid
+        )
+        db.add(holiday)
+        db.commit()
+        db.refresh(holiday)
+
+        return AttendanceResponse(
+            data=format_holiday(holiday),
+            message="Holiday created successfully",
+            status_code=201
+        ).to_dict()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in create_holiday: {str(e)}")
+        return AttendanceResponse(
+            data=None,
+            message=f"Internal server error: {str(e)}",
+            status_code=500
+        ).to_dict()
+
+
+@attendance_router.get("/holidays", tags=["Attendance Holidays"])
+def list_holidays(
+    year: int = Query(..., ge=1, le=9999, description="Calendar year"),
+    project_id: Optional[UUID] = Query(None, description="Also list this project's own holidays"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Holidays of a year: global ones, plus project_id's own when given."""
+    try:
+        if not current_user or not hasattr(current_user, 'uuid'):
+            return AttendanceResponse(
+                data=None,
+                message="Invalid user session",
+                status_code=401
+            ).to_dict()
+
+        query = db.query(Holiday).filter(
+            Holiday.holiday_date >= date(year, 1, 1),
+            Holiday.holiday_date <= date(year, 12, 31),
+            Holiday.is_deleted.is_(False)
+        )
+        if project_id:
+            query = query.filter(
+                (Holiday.project_id.is_(None)) | (Holiday.project_id == project_id)
+            )
+        else:
+            query = query.filter(Holiday.project_id.is_(None))
+        holidays = query.order_by(Holiday.holiday_date).all()
+
+        return AttendanceResponse(
+            data=[format_holiday(holiday) for holiday in holidays],
+            message="Holidays fetched successfully",
+            status_code=200
+        ).to_dict()
+    except Exception as e:
+        logger.error(f"Error in list_holidays: {str(e)}")
+        return AttendanceResponse(
+            data=None,
+            message=f"Internal server error: {str(e)}",
+            status_code=500
+        ).to_dict()
+
+
+@attendance_router.delete("/holidays/{holiday_id}", tags=["Attendance Holidays"])
+def delete_holiday(
+    holiday_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove a holiday (Admin/Super Admin only)."""
+    try:
+        if not current_user or not hasattr(current_user, 'uuid'):
+            return AttendanceResponse(
+                data=None,
+                message="Invalid user session",
+                status_code=401
+            ).to_dict()
+
+        if current_user.role not in {UserRole.ADMIN, UserRole.SUPER_ADMIN}:
+            return AttendanceResponse(
+                data=None,
+                message="Access denied. Admin or Super Admin privileges required.",
+                status_code=403
+            ).to_dict()
+
+        holiday = db.query(Holiday).filter(
+            Holiday.uuid == holiday_id,
+            Holiday.is_deleted.is_(False)
+        ).first()
+        if not holiday:
+            return AttendanceResponse(
+                data=None,
+                message="Holiday not found",
+                status_code=404
+            ).to_dict()
+
+        holiday.is_deleted = True
+        db.commit()
+
+        return AttendanceResponse(
+            data=None,
+            message="Holiday deleted successfully",
+            status_code=200
+        ).to_dict()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in delete_holiday: {str(e)}")
+        return AttendanceResponse(
+            data=None,
+            message=f"Internal server error: {str(e)}",
+            status_code=500
+        ).to_dict()
@@ -1,9 +1,11 @@
 from uuid import UUID
 from datetime import datetime
 from src.app.utils.logging_config import get_logger
+from src.app.utils.uploads import save_upload, upload_size_error
 
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     HTTPException,
     Security,
@@ -19,11 +21,13 @@ from fastapi.security import (
 )
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from uuid import uuid4
-from src.app.database.database import get_db
+from src.app.database.database import get_async_db, get_db
 from src.app.database.models import User, Log, Person, UserTokenMap , UserData
+from src.app.database.replica import PRIMARY_ONLY
 from src.app.schemas.auth_service_schamas import (
     UserCreate,
     UserLogin,
@@ -103,10 +107,12 @@ def get_current_user(
         user = (
             db.query(User)
             .filter(
-                User.uuid == user_uuid,
+                User.uuid == UUID(user_uuid),
                 User.is_deleted.is_(False),
                 User.is_active.is_(True),
             )
+            # A deactivated user must be refused even on replica-read endpoints
+            .execution_options(**PRIMARY_ONLY)
             .first()
         )
 
@@ -127,6 +133,49 @@ def get_current_user(
         ).model_dump()
 
 
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
+):
+    """Async counterpart of get_current_user for handlers using get_async_db."""
+    token = credentials.credentials
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_uuid = payload.get("sub")
+
+        if not user_uuid:
+            return AuthServiceResponse(
+                data=None,
+                status_code=401,
+                message="Invalid authentication token"
+            ).model_dump()
+
+        result = await db.execute(
+            select(User).filter(
+                User.uuid == UUID(user_uuid),
+                User.is_deleted.is_(False),
+                User.is_active.is_(True),
+            ).execution_options(**PRIMARY_ONLY)
+        )
+        user = result.scalars().first()
+
+        if not user:
+            return AuthServiceResponse(
+                data=None,
+                status_code=404,
+                message="User Not Found"
+            ).model_dump()
+
+        return user
+
+    except (JWTError, ValueError):
+        return AuthServiceResponse(
+            data=None,
+            status_code=401,
+            message="Invalid authentication"
+        ).model_dump()
+
+
 def superadmin_required(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.SUPER_ADMIN:
         return AuthServiceResponse(
@@ -147,20 +196,19 @@ def upload_user_photo(
     Uploads a photo for the current user and updates `photo_path`.
     Returns the path/URL so the frontend can load it.
     """
-    try:
-        # 1) Define your upload directory (following your pattern in payment_service.py)
-        upload_dir = os.path.join(constants.UPLOAD_DIR, "users")  # e.g. "uploads/payments/users"
-        os.makedirs(upload_dir, exist_ok=True)
-
-        # 2) Create a unique filename or use the original filename
-        #    e.g. "abc1234_filename.jpg"
-        file_ext = os.path.splitext(file.filename)[1]
-        unique_filename = f"{str(uuid4())}{file_ext}"
-        file_path = os.path.join(upload_dir, unique_filename)
+    size_error = upload_size_error([file])
+    if size_error:
+        return AuthServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
 
-        # 3) Save the file to disk
-        with open(file_path, "wb") as buffer:
-            buffer.write(file.file.read())
+    try:
+        # 1) Save the file under a unique name in "uploads/payments/users"
+        upload_dir = os.path.join(constants.UPLOAD_DIR, "users")
+        stored = save_upload(file, upload_dir)
+        unique_filename = stored.filename
 
         # 4) Update user.photo_path with the URL that will be accessible through nginx
         current_user.photo_path = f"{constants.HOST_URL}/uploads/payments/users/{unique_filename}"
@@ -337,6 +385,7 @@ def check_or_add_token(
 )
 def login(
     login_data: UserLogin,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> dict:
     db_user = (
@@ -381,7 +430,11 @@ def login(
             device_id=login_data.device_id,
             db=db
         )
-        subscribe_news(
+        # Subscribed after the response is sent; a slow or unavailable
+        # Firebase must not hold up login (the app subscribes again on
+        # its next login)
+        background_tasks.add_task(
+            subscribe_news,
             tokens=login_data.fcm_token,
             topic=db_user.uuid
         )
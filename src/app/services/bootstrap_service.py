@@ -0,0 +1,147 @@
+"""
+Home-screen bootstrap.
+
+``GET /bootstrap`` returns in one round trip what the app loads on launch:
+the user profile, recent and pending payments, khatabook, today's attendance
+status, this month's attendance analytics and the item list. The caller is
+authenticated once and every section reuses the request's session.
+
+Each section carries its own envelope (``data`` / ``message`` /
+``status_code``, exactly as the standalone endpoint returns it) and, when it
+can be cached, an ETag built from the change counters of the tables it
+reads. Clients send the ETags they hold in ``If-None-Match`` (comma
+separated); sections that have not changed come back as
+``{"etag": ..., "not_modified": true}`` without being queried. ``sections``
+limits the response to the named sections.
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.database.change_counters import (
+    ATTENDANCE_ANALYTICS_TABLES,
+    ITEM_LIST_TABLES,
+    KHATABOOK_LIST_TABLES,
+    PAYMENT_LIST_TABLES,
+    USER_PROFILE_TABLES,
+    pending_bumps,
+    read_change_counters,
+)
+from src.app.database.database import get_async_db
+from src.app.database.models import User
+from src.app.services.attendance_endpoints import (
+    get_self_attendance_status,
+    get_user_attendance_analytics,
+)
+from src.app.services.auth_service import get_current_user_async, get_user_info
+from src.app.services.khatabook_endpoints import collect_khatabook_entries
+from src.app.services.payment_service import collect_items, collect_payments
+from src.app.utils.conditional_get import compute_etag, etag_matches
+from src.app.utils.responses import fast_response
+
+bootstrap_router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"])
+
+
+async def _user(db: AsyncSession, current_user: User) -> dict:
+    return await db.run_sync(lambda session: get_user_info(user_uuid=current_user.uuid, db=session))
+
+
+async def _recent_payments(db: AsyncSession, current_user: User) -> dict:
+    return await collect_payments(db, current_user, recent=True)
+
+
+async def _pending_payments(db: AsyncSession, current_user: User) -> dict:
+    return await collect_payments(db, current_user, pending_request=True)
+
+
+async def _khatabook(db: AsyncSession, current_user: User) -> dict:
+    return await collect_khatabook_entries(db, current_user)
+
+
+async def _attendance_status(db: AsyncSession, current_user: User) -> dict:
+    return await get_self_attendance_status(db=db, current_user=current_user)
+
+
+async def _attendance_analytics(db: AsyncSession, current_user: User) -> dict:
+    return await db.run_sync(
+        lambda session: get_user_attendance_analytics(db=session, current_user=current_user)
+    )
+
+
+async def _items(db: AsyncSession, current_user: User) -> dict:
+    return await collect_items(db)
+
+
+# name -> (builder, tables the section reads or None if it can not be cached,
+#          whether the section also changes with the date)
+SECTIONS = {
+    "user": (_user, USER_PROFILE_TABLES, False),
+    "recent_payments": (_recent_payments, PAYMENT_LIST_TABLES, False),
+    "pending_payments": (_pending_payments, PAYMENT_LIST_TABLES, False),
+    "khatabook": (_khatabook, KHATABOOK_LIST_TABLES, False),
+    # Includes the hours worked so far, which changes with the clock
+    "attendance_status": (_attendance_status, None, False),
+    "attendance_analytics": (_attendance_analytics, ATTENDANCE_ANALYTICS_TABLES, True),
+    "items": (_items, ITEM_LIST_TABLES, False),
+}
+
+
+def section_etag(name: str, versions: dict, current_user: User) -> Optional[str]:
+    """ETag of a cacheable section for this user, or None."""
+    _, tables, dated = SECTIONS[name]
+    if tables is None or pending_bumps(tables):
+        return None
+    key = f"bootstrap:{name}:{date.today().isoformat() if dated else ''}"
+    return compute_etag(
+        {table: versions[table] for table in tables},
+        f"{current_user.uuid}:{current_user.role}",
+        key,
+    )
+
+
+@bootstrap_router.get("", status_code=200)
+async def bootstrap(
+    request: Request,
+    sections: Optional[List[str]] = Query(None, description="Sections to return; omit for all"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Everything the home screen needs, one section per former request.
+    See the module docstring for ETags and skipping.
+    """
+    if isinstance(current_user, dict):
+        return current_user
+
+    requested = sections or list(SECTIONS)
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown:
+        return fast_response(
+            data=None,
+            message=f"Unknown sections: {unknown}. Allowed values: {list(SECTIONS)}",
+            status_code=400
+        )
+
+    tables = {table for name in requested for table in (SECTIONS[name][1] or ())}
+    versions = await db.run_sync(lambda session: read_change_counters(session, tables))
+    if_none_match = request.headers.get("if-none-match")
+
+    # One after another on this session: a single bootstrap call should not
+    # hold more connections than the endpoints it replaces did
+    result = {}
+    for name in requested:
+        builder = SECTIONS[name][0]
+        etag = section_etag(name, versions, current_user)
+        if etag and etag_matches(if_none_match, etag):
+            result[name] = {"etag": etag, "not_modified": True}
+            continue
+
+        section = dict(await builder(db, current_user))
+        section["not_modified"] = False
+        # Errors are never cached by the client
+        section["etag"] = etag if section.get("status_code") == 200 else None
+        result[name] = section
+
+    return fast_response(data=result, message="Bootstrap data fetched successfully.")
@@ -1,47 +1,41 @@
-import os
-import shutil
 import json
 import pandas as pd
 from io import BytesIO
 from src.app.schemas.auth_service_schamas import UserRole
 from typing import List, Optional
-from uuid import UUID, uuid4
+from uuid import UUID
 from fastapi import APIRouter, Depends, UploadFile, File, Form, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.app.database.database import get_db
+from src.app.database.database import get_async_db, get_db, run_concurrently
+from src.app.database.replica import replica_reads
 from src.app.schemas.auth_service_schamas import AuthServiceResponse
 from src.app.schemas.khatabook_schemas import (
-    MarkSuspiciousRequest, KhatabookServiceResponse
+    MarkSuspiciousRequest, KhatabookServiceResponse, KhatabookBatchRequest
 )
 from src.app.services.khatabook_service import (
     create_khatabook_entry_service,
+    create_khatabook_entries_batch_service,
     get_all_khatabook_entries_service,
     update_khatabook_entry_service,
     hard_delete_khatabook_entry_service,
     mark_khatabook_entry_suspicious,
     soft_delete_khatabook_entry_service
 )
-from src.app.database.models import User, Khatabook, KhatabookBalance
-from src.app.services.auth_service import get_current_user
-from src.app.schemas import constants
+from src.app.database.models import User, Khatabook, KhatabookBalance, Payment
+from src.app.services.auth_service import get_current_user, get_current_user_async
+from src.app.utils.responses import fast_response
+from src.app.utils.attachment_store import store_upload
+from src.app.utils.uploads import upload_size_error
+from src.app.utils.conditional_get import etag_headers, list_etag
+from src.app.database.change_counters import KHATABOOK_LIST_TABLES
 
 khatabook_router = APIRouter(prefix="/khatabook", tags=["Khatabook"])
 
-UPLOAD_DIR = constants.KHATABOOK_FOLDER
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 
 def save_uploaded_file(upload_file: UploadFile) -> str:
-    # Create a unique filename to avoid collisions
-    file_ext = os.path.splitext(upload_file.filename)[1]
-    unique_filename = f"{str(uuid4())}{file_ext}"
-    file_location = os.path.join(UPLOAD_DIR, unique_filename)
-
-    # Save the file
-    with open(file_location, "wb") as f:
-        shutil.copyfileobj(upload_file.file, f)
-
-    return unique_filename
+    return store_upload(upload_file).path
 
 
 @khatabook_router.post("")
@@ -51,6 +45,14 @@ async def create_khatabook_entry(
     db=Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    size_error = upload_size_error(files or [])
+    if size_error:
+        return AuthServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         parsed_data = json.loads(data)
         file_paths = [save_uploaded_file(f) for f in files] if files else []
@@ -68,6 +70,43 @@ async def create_khatabook_entry(
         ).model_dump()
 
 
+@khatabook_router.post("/batch")
+def create_khatabook_entries_batch(
+    request: KhatabookBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload khatabook entries recorded offline in one request.
+
+    Every entry needs a client-generated idempotency_key; retrying a batch
+    never creates an entry twice. Returns one result per entry, in order,
+    with status created, duplicate or rejected. Attach files afterwards with
+    PUT /khatabook/{uuid}.
+    """
+    if isinstance(current_user, dict):
+        return current_user
+
+    try:
+        results = create_khatabook_entries_batch_service(
+            db=db,
+            entries=[entry.model_dump() for entry in request.entries],
+            user_id=current_user.uuid
+        )
+        created = sum(1 for result in results if result["status"] == "created")
+        return KhatabookServiceResponse(
+            data={"results": results},
+            status_code=201 if created else 200,
+            message=f"{created} of {len(results)} khatabook entries created"
+        ).model_dump()
+    except Exception as e:
+        return KhatabookServiceResponse(
+            data=None,
+            status_code=500,
+            message=f"Error: {str(e)}"
+        ).model_dump()
+
+
 @khatabook_router.put("/{khatabook_uuid}")
 def update_khatabook_entry(
     khatabook_uuid: UUID,
@@ -75,6 +114,14 @@ def update_khatabook_entry(
     files: Optional[List[UploadFile]] = File(None),
     db: Session = Depends(get_db)
 ):
+    size_error = upload_size_error(files or [])
+    if size_error:
+        return AuthServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         parsed_data = json.loads(data)
         file_paths = [save_uploaded_file(f) for f in files] if files else []
@@ -98,19 +145,21 @@ def update_khatabook_entry(
         ).model_dump()
 
 
-@khatabook_router.get("")
-def get_all_khatabook_entries(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # Check if current_user is a dictionary (error response)
-    if isinstance(current_user, dict):
-        # Return the error response directly
-        return current_user
-
+async def collect_khatabook_entries(db: AsyncSession, current_user: User) -> dict:
+    """Build the GET /khatabook envelope for the user."""
     try:
-        # Get all entries for the user
-        entries = get_all_khatabook_entries_service(user_id=current_user.uuid, db=db)
+        # Entries and the user's available balance (from transferred
+        # self-payments) are independent, so fetch them concurrently
+        entries, user_available_balance = await run_concurrently(
+            db,
+            lambda session: get_all_khatabook_entries_service(user_id=current_user.uuid, db=session),
+            lambda session: session.query(func.sum(Payment.amount)).filter(
+                Payment.created_by == current_user.uuid,
+                Payment.self_payment == True,
+                Payment.status == "transferred",
+                Payment.is_deleted == False
+            ).scalar() or 0,
+        )
 
         # Calculate total spent (only debit entries - manual expenses)
         total_spent = sum(
@@ -118,16 +167,6 @@ def get_all_khatabook_entries(
             if entry.get("entry_type") == "Debit"
         ) if entries else 0.0
 
-        # Calculate user_available_balance from transferred self-payments
-        from src.app.database.models import Payment
-        transferred_self_payments = db.query(Payment).filter(
-            Payment.created_by == current_user.uuid,
-            Payment.self_payment == True,
-            Payment.status == "transferred",
-            Payment.is_deleted == False
-        ).all()
-
-        user_available_balance = sum(payment.amount for payment in transferred_self_payments)
         remaining_balance = user_available_balance - total_spent
 
         response_data = {
@@ -135,11 +174,11 @@ def get_all_khatabook_entries(
             "total_amount": total_spent,  # Total manual expenses (debit entries)
             "entries": entries
         }
-        return AuthServiceResponse(
-            data=response_data,
-            status_code=200,
-            message="Khatabook entries fetched successfully"
-        ).model_dump()
+        return {
+            "data": response_data,
+            "message": "Khatabook entries fetched successfully",
+            "status_code": 200
+        }
     except Exception as e:
         return AuthServiceResponse(
             data=None,
@@ -148,6 +187,24 @@ def get_all_khatabook_entries(
         ).model_dump()
 
 
+@khatabook_router.get("")
+@replica_reads
+async def get_all_khatabook_entries(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: Optional[str] = Depends(list_etag(KHATABOOK_LIST_TABLES))
+):
+    # Check if current_user is a dictionary (error response)
+    if isinstance(current_user, dict):
+        # Return the error response directly
+        return current_user
+
+    envelope = await collect_khatabook_entries(db, current_user)
+    if envelope["status_code"] != 200:
+        return envelope
+    return fast_response(**envelope, headers=etag_headers(etag))
+
+
 @khatabook_router.patch("/{khatabook_uuid}/mark-suspicious")
 def mark_suspicious(
     khatabook_uuid: UUID,
@@ -205,6 +262,7 @@ def mark_suspicious(
 
 
 @khatabook_router.get("/export")
+@replica_reads
 def export_khatabook_data(
     user_id: Optional[UUID] = None,
     item_id: Optional[UUID] = None,
@@ -340,8 +398,8 @@ def export_khatabook_data(
             if payment_mode:
                 query = query.filter(Khatabook.payment_mode == payment_mode)
 
-            # Order by most recent first
-            query = query.order_by(Khatabook.created_at.desc())
+            # Order by most recent first; batch uploads share created_at, so the id breaks ties
+            query = query.order_by(Khatabook.created_at.desc(), Khatabook.id.desc())
 
             # Execute query with eager loading of relationships
             khatabook_entries = (
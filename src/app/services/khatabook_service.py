@@ -1,16 +1,17 @@
 # services/khatabook_service.py
 from typing import Dict, List, Optional
 from uuid import UUID
-from fastapi import UploadFile
 from sqlalchemy.orm import Session
 from src.app.database.models import Khatabook, KhatabookFile, KhatabookItem, Item, Project, Payment, PaymentStatusHistory, PaymentItem
 import os
-import shutil
-from src.app.database.models import KhatabookBalance
-from sqlalchemy import and_
+import uuid
+from src.app.database.models import KhatabookBalance, Person, SyncTombstone, User
+from sqlalchemy import and_, func, insert
 from sqlalchemy.orm import joinedload
 from src.app.schemas import constants
 from src.app.schemas.constants import KHATABOOK_ENTRY_TYPE_DEBIT
+from src.app.utils.attachment_store import is_store_path
+from src.app.utils.image_variants import variant_urls
 from src.app.utils.logging_config import get_database_logger
 
 # Initialize logger
@@ -186,8 +187,193 @@ def create_khatabook_entry_service(
         raise
 
 
+def get_available_khatabook_balance(db: Session, user_id: UUID) -> float:
+    """Transferred self-payments minus the user's manual (debit) khatabook expenses."""
+    received = db.query(func.sum(Payment.amount)).filter(
+        Payment.created_by == user_id,
+        Payment.self_payment == True,
+        Payment.status == "transferred",
+        Payment.is_deleted == False
+    ).scalar() or 0.0
+    spent = db.query(func.sum(Khatabook.amount)).filter(
+        Khatabook.created_by == user_id,
+        Khatabook.is_deleted.is_(False),
+        Khatabook.entry_type == KHATABOOK_ENTRY_TYPE_DEBIT
+    ).scalar() or 0.0
+    return received - spent
+
+
+def create_khatabook_entries_batch_service(
+    db: Session,
+    entries: List[Dict],
+    user_id: UUID
+) -> List[Dict]:
+    """
+    Create many khatabook entries recorded offline, in one transaction.
+
+    Each entry carries a client ``idempotency_key``; an entry whose key the
+    user already used (in an earlier upload or earlier in this batch) is not
+    created again and is reported as a duplicate of the original. References
+    are validated in bulk: entries with an unknown person or project are
+    rejected, unknown items are dropped (as the single-entry endpoint does).
+    Running balances are computed in memory in request order, and the rows
+    (entries, items, and the khatabook payments created for entries with both
+    a project and a person) are written with multi-row inserts.
+
+    Returns one result per input entry, in order.
+    """
+    try:
+        # Serialise this user's khatabook writes so balances and keys stay consistent
+        db.query(User.id).filter(User.uuid == user_id).with_for_update().first()
+
+        keys = [entry["idempotency_key"] for entry in entries]
+        uploaded = {
+            row.idempotency_key: {"uuid": row.uuid, "balance_after_entry": row.balance_after_entry}
+            for row in db.query(
+                Khatabook.idempotency_key, Khatabook.uuid, Khatabook.balance_after_entry
+            ).filter(
+                Khatabook.created_by == user_id,
+                Khatabook.idempotency_key.in_(keys)
+            )
+        }
+
+        person_ids = {entry["person_id"] for entry in entries}
+        project_ids = {entry["project_id"] for entry in entries if entry.get("project_id")}
+        item_ids = {item_id for entry in entries for item_id in entry.get("item_ids") or []}
+        known_persons = {
+            row[0] for row in db.query(Person.uuid).filter(Person.uuid.in_(person_ids))
+        }
+        known_projects = {
+            row[0] for row in db.query(Project.uuid).filter(Project.uuid.in_(project_ids))
+        } if project_ids else set()
+        known_items = {
+            row[0] for row in db.query(Item.uuid).filter(Item.uuid.in_(item_ids))
+        } if item_ids else set()
+
+        balance = get_available_khatabook_balance(db, user_id)
+
+        results = []
+        entry_rows, entry_item_rows = [], []
+        payment_rows, payment_status_rows, payment_item_rows = [], [], []
+
+        for entry in entries:
+            key = entry["idempotency_key"]
+            if key in uploaded:
+                original = uploaded[key]
+                results.append({
+                    "idempotency_key": key,
+                    "status": "duplicate",
+                    "uuid": str(original["uuid"]),
+                    "balance_after_entry": original["balance_after_entry"],
+                    "message": "Entry was already uploaded"
+                })
+                continue
+
+            if entry["person_id"] not in known_persons:
+                results.append({
+                    "idempotency_key": key,
+                    "status": "rejected",
+                    "uuid": None,
+                    "balance_after_entry": None,
+                    "message": f"Person {entry['person_id']} not found"
+                })
+                continue
+            if entry.get("project_id") and entry["project_id"] not in known_projects:
+                results.append({
+                    "idempotency_key": key,
+                    "status": "rejected",
+                    "uuid": None,
+                    "balance_after_entry": None,
+                    "message": f"Project {entry['project_id']} not found"
+                })
+                continue
+
+            amount = float(entry["amount"])
+            balance -= amount
+            kb_uuid = uuid.uuid4()
+            entry_items = [item_id for item_id in entry.get("item_ids") or [] if item_id in known_items]
+
+            entry_rows.append({
+                "uuid": kb_uuid,
+                "amount": amount,
+                "remarks": entry.get("remarks"),
+                "person_id": entry["person_id"],
+                "expense_date": entry.get("expense_date"),
+                "created_by": user_id,
+                "balance_after_entry": balance,
+                "project_id": entry.get("project_id"),
+                "payment_mode": entry.get("payment_mode"),
+                "entry_type": KHATABOOK_ENTRY_TYPE_DEBIT,
+                "idempotency_key": key,
+            })
+            entry_item_rows.extend(
+                {"khatabook_id": kb_uuid, "item_id": item_id} for item_id in entry_items
+            )
+
+            # Same payment create_payment_from_khatabook_entry makes for single entries
+            if entry.get("project_id"):
+                payment_uuid = uuid.uuid4()
+                remarks = entry.get("remarks")
+                payment_rows.append({
+                    "uuid": payment_uuid,
+                    "amount": amount,
+                    "description": f"Auto-generated from khatabook entry - {remarks}" if remarks else "Auto-generated from khatabook entry",
+                    "project_id": entry["project_id"],
+                    "created_by": user_id,
+                    "status": "khatabook",
+                    "person": entry["person_id"],
+                    "self_payment": False,
+                    "latitude": 0.0,
+                    "longitude": 0.0,
+                })
+                payment_status_rows.append({
+                    "payment_id": payment_uuid,
+                    "status": "khatabook",
+                    "created_by": user_id,
+                })
+                payment_item_rows.extend(
+                    {"payment_id": payment_uuid, "item_id": item_id} for item_id in entry_items
+                )
+
+            result = {
+                "idempotency_key": key,
+                "status": "created",
+                "uuid": str(kb_uuid),
+                "balance_after_entry": balance,
+                "message": "Khatabook entry created successfully"
+            }
+            if len(entry_items) != len(entry.get("item_ids") or []):
+                result["ignored_item_ids"] = [
+                    str(item_id) for item_id in entry["item_ids"] if item_id not in known_items
+                ]
+            uploaded[key] = {"uuid": kb_uuid, "balance_after_entry": balance}
+            results.append(result)
+
+        for model, rows in (
+            (Khatabook, entry_rows),
+            (KhatabookItem, entry_item_rows),
+            (Payment, payment_rows),
+            (PaymentStatusHistory, payment_status_rows),
+            (PaymentItem, payment_item_rows),
+        ):
+            if rows:
+                db.execute(insert(model), rows)
+
+        db.commit()
+        db_logger.info(
+            f"Batch khatabook upload for user {user_id}: {len(entry_rows)} created, "
+            f"{len(entries) - len(entry_rows)} skipped"
+        )
+        return results
+
+    except Exception as e:
+        db.rollback()
+        db_logger.error(f"Error in batch khatabook upload for user {user_id}: {str(e)}")
+        raise
+
+
 def update_khatabook_entry_service(
-    db: Session, kb_uuid: UUID, data: Dict, files: List[UploadFile]
+    db: Session, kb_uuid: UUID, data: Dict, file_paths: List[str]
 ) -> Optional[Khatabook]:
     kb_entry = db.query(Khatabook).filter(
         Khatabook.uuid == kb_uuid,
@@ -219,15 +405,14 @@ def update_khatabook_entry_service(
                 )
                 db.add(new_kb_item)
 
-    if files:
+    if file_paths:
         # Soft delete existing files instead of hard delete
         db.query(KhatabookFile).filter(
             KhatabookFile.khatabook_id == kb_entry.uuid,
             KhatabookFile.is_deleted.is_(False)
         ).update({KhatabookFile.is_deleted: True})
         db.flush()
-        for f in files:
-            file_path = save_uploaded_file(f, "khatabook_files")
+        for file_path in file_paths:
             new_file = KhatabookFile(
                 khatabook_id=kb_entry.uuid,
                 file_path=file_path
@@ -283,6 +468,10 @@ def hard_delete_khatabook_entry_service(db: Session, kb_uuid: UUID) -> bool:
     # Delete the khatabook entry
     result = db.query(Khatabook).filter(Khatabook.uuid == kb_uuid).delete()
 
+    # Let delta sync clients drop their copy
+    if result:
+        db.add(SyncTombstone(entity=constants.SYNC_ENTITY_KHATABOOK, entity_uuid=kb_uuid))
+
     db.commit()
     return result > 0
 
@@ -366,16 +555,95 @@ def soft_delete_khatabook_entry_service(db: Session, kb_uuid: UUID) -> bool:
         raise
 
 
+def khatabook_entries_query(db: Session):
+    """Khatabook query with the relationships format_khatabook_entry reads."""
+    return db.query(Khatabook).options(
+        joinedload(Khatabook.files),
+        joinedload(Khatabook.person),
+        joinedload(Khatabook.items).joinedload(KhatabookItem.item),
+        joinedload(Khatabook.project),
+        joinedload(Khatabook.created_by_user)  # Add created_by_user relationship
+    )
+
+
+def khatabook_served_path(file_path: str) -> str:
+    if is_store_path(file_path):
+        return file_path
+    # Files saved before the attachment store only kept their name
+    return f"{constants.KHATABOOK_FOLDER}/{os.path.basename(file_path)}"
+
+
+def khatabook_file_url(file_path: str) -> str:
+    return f"{constants.HOST_URL}/{khatabook_served_path(file_path)}"
+
+
+def khatabook_file_preview(file_path: str) -> dict:
+    return {
+        "url": khatabook_file_url(file_path),
+        **variant_urls(khatabook_served_path(file_path)),
+    }
+
+
+def format_khatabook_entry(entry: Khatabook) -> dict:
+    file_urls, file_previews = [], []
+    if entry.files:
+        for f in entry.files:
+            # Only include non-deleted files
+            if not f.is_deleted:
+                file_urls.append(khatabook_file_url(f.file_path))
+                file_previews.append(khatabook_file_preview(f.file_path))
+
+    items_data = []
+    if entry.items:
+        for khatabook_item in entry.items:
+            # Only include non-deleted items
+            if not khatabook_item.is_deleted and khatabook_item.item:
+                items_data.append({
+                    "uuid": str(khatabook_item.item.uuid),
+                    "name": khatabook_item.item.name,
+                    "category": khatabook_item.item.category,
+                })
+
+    project_info = None
+    if entry.project:
+        project_info = {
+            "uuid": str(entry.project.uuid),
+            "name": entry.project.name
+        }
+
+    # Add created_by_user information
+    user_info = None
+    if entry.created_by_user:
+        user_info = {
+            "uuid": str(entry.created_by_user.uuid),
+            "name": entry.created_by_user.name
+        }
+
+    return {
+        "uuid": str(entry.uuid),
+        "amount": entry.amount,
+        "remarks": entry.remarks,
+        "balance_after_entry": entry.balance_after_entry,  # <-- include the snapshot
+        "person": {
+            "uuid": str(entry.person.uuid),
+            "name": entry.person.name
+        } if entry.person else None,
+        "project_info": project_info,
+        "expense_date": entry.expense_date.isoformat() if entry.expense_date else None,
+        "created_at": entry.created_at.isoformat(),
+        "files": file_urls,
+        "file_previews": file_previews,
+        "items": items_data,
+        "payment_mode": entry.payment_mode,
+        "entry_type": entry.entry_type,  # Include entry_type in response
+        "is_suspicious": entry.is_suspicious,
+        "created_by_user": user_info  # Include created_by_user info
+    }
+
+
 def get_all_khatabook_entries_service(user_id: UUID, db: Session) -> List[dict]:
     entries = (
-        db.query(Khatabook)
-        .options(
-            joinedload(Khatabook.files),
-            joinedload(Khatabook.person),
-            joinedload(Khatabook.items).joinedload(KhatabookItem.item),
-            joinedload(Khatabook.project),
-            joinedload(Khatabook.created_by_user)  # Add created_by_user relationship
-        )
+        khatabook_entries_query(db)
         .filter(
             Khatabook.is_deleted.is_(False),
             Khatabook.created_by == user_id
@@ -384,76 +652,7 @@ def get_all_khatabook_entries_service(user_id: UUID, db: Session) -> List[dict]:
         .all()
     )
 
-    response_data = []
-    for entry in entries:
-        file_urls = []
-        if entry.files:
-            for f in entry.files:
-                # Only include non-deleted files
-                if not f.is_deleted:
-                    filename = os.path.basename(f.file_path)
-                    file_url = f"{constants.HOST_URL}/uploads/khatabook_files/{filename}"
-                    file_urls.append(file_url)
-
-        items_data = []
-        if entry.items:
-            for khatabook_item in entry.items:
-                # Only include non-deleted items
-                if not khatabook_item.is_deleted and khatabook_item.item:
-                    items_data.append({
-                        "uuid": str(khatabook_item.item.uuid),
-                        "name": khatabook_item.item.name,
-                        "category": khatabook_item.item.category,
-                    })
-
-        project_info = None
-        if entry.project:
-            project_info = {
-                "uuid": str(entry.project.uuid),
-                "name": entry.project.name
-            }
-
-        # Add created_by_user information
-        user_info = None
-        if entry.created_by_user:
-            user_info = {
-                "uuid": str(entry.created_by_user.uuid),
-                "name": entry.created_by_user.name
-            }
-
-        response_data.append({
-            "uuid": str(entry.uuid),
-            "amount": entry.amount,
-            "remarks": entry.remarks,
-            "balance_after_entry": entry.balance_after_entry,  # <-- include the snapshot
-            "person": {
-                "uuid": str(entry.person.uuid),
-                "name": entry.person.name
-            } if entry.person else None,
-            "project_info": project_info,
-            "expense_date": entry.expense_date.isoformat() if entry.expense_date else None,
-            "created_at": entry.created_at.isoformat(),
-            "files": file_urls,
-            "items": items_data,
-            "payment_mode": entry.payment_mode,
-            "entry_type": entry.entry_type,  # Include entry_type in response
-            "is_suspicious": entry.is_suspicious,
-            "created_by_user": user_info  # Include created_by_user info
-        })
-
-    return response_data
-
-
-def save_uploaded_file(upload_file: UploadFile, folder: str) -> str:
-    """
-    Utility function to save an uploaded file to disk and return its path.
-    """
-    upload_dir = os.path.join("src", "app", "uploads", folder)
-    os.makedirs(upload_dir, exist_ok=True)
-    file_location = os.path.join(upload_dir, upload_file.filename)
-    with open(file_location, "wb") as f:
-        shutil.copyfileobj(upload_file.file, f)
-    return file_location
+    return [format_khatabook_entry(entry) for entry in entries]
 
 
 def get_user_balance(user_uuid: UUID, db: Session) -> float:
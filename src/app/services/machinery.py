@@ -1,5 +1,4 @@
 import traceback
-import os
 import json
 from typing import Optional, List
 from uuid import UUID, uuid4
@@ -12,8 +11,8 @@ from fastapi import (
     UploadFile,
     Form
 )
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
 from src.app.database.database import get_db
 from src.app.database.models import (
     User,
@@ -31,7 +30,9 @@ from src.app.schemas.machinery_schemas import (
     MachineryLogResponse
 )
 from src.app.services.auth_service import get_current_user
+from src.app.utils.date_filters import date_range_filter, inclusive_range, latest_month_range, month_range
 from src.app.utils.logging_config import get_logger
+from src.app.utils.uploads import save_upload, upload_size_error
 
 logger = get_logger(__name__)
 
@@ -78,6 +79,14 @@ def punch_in_machine(
     Mark machine start time. Accepts multipart form: 'req' (JSON string), 'photo' (file, optional).
     Only allows one active usage per machine/project/sub-contractor.
     """
+    size_error = upload_size_error(photos or [])
+    if size_error:
+        return APIResponse(
+            data=None,
+            message=size_error,
+            status_code=413
+        ).to_dict()
+
     try:
         # Only certain roles allowed
         if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN, UserRole.SITE_ENGINEER]:
@@ -132,14 +141,8 @@ def punch_in_machine(
         # Handle photo upload if provided
         photo_paths = []
         if photos:
-            upload_dir = "uploads/machinery_photos"
-            os.makedirs(upload_dir, exist_ok=True)
             for photo in photos:
-                ext = os.path.splitext(photo.filename)[1]
-                fname = f"Machinery_{str(uuid4())}{ext}"
-                photo_path = os.path.join(upload_dir, fname)
-                with open(photo_path, "wb") as buffer:
-                    buffer.write(photo.file.read())
+                photo_path = save_upload(photo, "uploads/machinery_photos", prefix="Machinery_").path
                 # Save each photo in MachineryPhotos table
                 photo_obj = MachineryPhotos(
                     uuid=uuid4(),
@@ -213,6 +216,14 @@ def punch_out_machine(
     """
     Mark machine end time by updating end_time for an active machinery log.
     """
+    size_error = upload_size_error(photos or [])
+    if size_error:
+        return APIResponse(
+            data=None,
+            message=size_error,
+            status_code=413
+        ).to_dict()
+
     try:
         # Only certain roles allowed
         if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN, UserRole.SITE_ENGINEER]:
@@ -262,14 +273,8 @@ def punch_out_machine(
         # Handle photo upload if provided
         photo_paths = []
         if photos:
-            upload_dir = "uploads/machinery_photos"
-            os.makedirs(upload_dir, exist_ok=True)
             for photo in photos:
-                ext = os.path.splitext(photo.filename)[1]
-                fname = f"MachineryEnd_{str(uuid4())}{ext}"
-                photo_path = os.path.join(upload_dir, fname)
-                with open(photo_path, "wb") as buffer:
-                    buffer.write(photo.file.read())
+                photo_path = save_upload(photo, "uploads/machinery_photos", prefix="MachineryEnd_").path
                 photo_obj = MachineryPhotos(
                     uuid=uuid4(),
                     machinery_id=machinery.uuid,
@@ -401,6 +406,7 @@ def get_machine_history(
     item_id: Optional[UUID] = Query(None, description="Filter by item ID"),
     created_by: Optional[UUID] = Query(None, description="Filter by user who created the log"),
     month: Optional[int] = Query(None, description="Filter by month (1-12)"),
+    year: Optional[int] = Query(None, description="Year of the month filter (defaults to the latest such month)"),
     from_date: Optional[date] = Query(None, description="Filter from this date (YYYY-MM-DD)"),
     to_date: Optional[date] = Query(None, description="Filter to this date (YYYY-MM-DD)"),
     recent: Optional[bool] = Query(False, description="If true, only return logs from the last 30 days"),
@@ -423,22 +429,7 @@ def get_machine_history(
                 Machinery.created_by == current_user.uuid
             )
 
-        # Pagination
-        offset = (page - 1) * limit
-        machinery_logs = (
-            query.options(
-                joinedload(Machinery.project),
-                joinedload(Machinery.sub_contractor),
-                joinedload(Machinery.item)
-            )
-            .order_by(desc(Machinery.created_at))
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
-        
-
-        # Apply filters    
+        # Apply filters
         if project_id:
             query = query.filter(Machinery.project_id == project_id)
         if sub_contractor_id:
@@ -456,7 +447,15 @@ def get_machine_history(
                     message="Month must be between 1 and 12.",
                     status_code=400
                 ).to_dict()
-            query = query.filter(func.extract('month', Machinery.start_time) == month)
+            try:
+                month_dates = month_range(year, month) if year is not None else latest_month_range(month)
+            except ValueError:
+                return APIResponse(
+                    data=None,
+                    message="Invalid year.",
+                    status_code=400
+                ).to_dict()
+            query = query.filter(*date_range_filter(Machinery.start_time, month_dates))
         
         if from_date:
             if not isinstance(from_date, date):
@@ -465,7 +464,6 @@ def get_machine_history(
                     message="Invalid from_date format. Use YYYY-MM-DD.",
                     status_code=400
                 ).to_dict()
-            query = query.filter(Machinery.start_time >= datetime.combine(from_date, datetime.min.time()))
         
         if to_date:
             if not isinstance(to_date, date):
@@ -474,7 +472,7 @@ def get_machine_history(
                     message="Invalid to_date format. Use YYYY-MM-DD.",
                     status_code=400
                 ).to_dict()
-            query = query.filter(Machinery.start_time <= datetime.combine(to_date, datetime.max.time()))
+        query = query.filter(*date_range_filter(Machinery.start_time, inclusive_range(from_date, to_date)))
 
         if recent:
             query = query.order_by(desc(Machinery.created_at)).limit(5)
@@ -0,0 +1,110 @@
+"""
+Uploaded files and photo variants.
+
+``GET /uploads/{name}`` serves attachments when ``UPLOADS_SERVING`` is
+``sendfile`` or ``x-accel`` (with ``static`` the ``StaticFiles`` mount in
+``main.py`` answers instead); see ``src/app/utils/file_serving.py`` for the
+modes, ETags and cache headers. With ``UPLOADS_REQUIRE_AUTH`` both routes
+need the usual bearer token.
+
+``GET /variants/{name}`` serves the thumbnail or medium variant that list
+APIs link to (see ``src/app/utils/image_variants.py``). Variants are normally
+written in the background right after the upload; if one is not there yet,
+or the photo was uploaded before variants existed, it is generated from the
+original on the spot.
+"""
+
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Security
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.database.database import get_async_db, settings
+from src.app.database.models import User
+from src.app.services.auth_service import get_current_user_async
+from src.app.utils.file_serving import file_response, resolve_upload
+from src.app.utils.image_variants import (
+    VARIANT_FORMAT,
+    VARIANTS_DIR,
+    generate_variants,
+    parse_variant_name,
+)
+from src.app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+media_router = APIRouter(tags=["Media"])
+
+# Downloads are public unless UPLOADS_REQUIRE_AUTH, so a missing token is not an error here
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse({"status_code": 404, "message": "Not Found"}, status_code=404)
+
+
+async def _authorize(db: AsyncSession, credentials: Optional[HTTPAuthorizationCredentials]):
+    """None when the download may proceed, else the error response."""
+    if not settings.UPLOADS_REQUIRE_AUTH:
+        return None
+    if credentials is None:
+        return JSONResponse({"status_code": 401, "message": "Not authenticated"}, status_code=401)
+    current_user = await get_current_user_async(db=db, credentials=credentials)
+    if not isinstance(current_user, User):
+        return JSONResponse(current_user, status_code=current_user["status_code"])
+    return None
+
+
+@media_router.api_route("/uploads/{name:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_upload(
+    name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_bearer),
+):
+    error = await _authorize(db, credentials)
+    if error is not None:
+        return error
+    path = resolve_upload(name)
+    if path is None:
+        return _not_found()
+    return file_response(request, path, name, private=settings.UPLOADS_REQUIRE_AUTH)
+
+
+@media_router.api_route("/variants/{name:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_image_variant(
+    name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_bearer),
+):
+    error = await _authorize(db, credentials)
+    if error is not None:
+        return error
+    parsed = parse_variant_name(name)
+    if parsed is None:
+        return _not_found()
+
+    original, variant = parsed
+    path = os.path.join(VARIANTS_DIR, name)
+    if not os.path.isfile(path):
+        if not os.path.isfile(original):
+            return _not_found()
+        try:
+            await run_in_threadpool(generate_variants, original, [variant])
+        except Exception as e:
+            logger.warning(f"Could not create {variant} variant of {original}: {str(e)}")
+            return JSONResponse(
+                {"status_code": 422, "message": "Image could not be processed"}, status_code=422
+            )
+
+    return file_response(
+        request,
+        path,
+        f"variants/{name}",
+        media_type=f"image/{VARIANT_FORMAT.lower()}",
+        private=settings.UPLOADS_REQUIRE_AUTH,
+    )
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from src.app.database.database import get_db
+from src.app.database.models import User
+from src.app.notification.notification_schemas import NotificationServiceResponse
+from src.app.notification.outbox import badge_counts, clear_badge
+from src.app.services.auth_service import get_current_user
+
+notification_router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+@notification_router.get("/badge", status_code=200)
+def get_notification_badge(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Number of notifications sent to the user since they last cleared the badge."""
+    try:
+        topic = str(current_user.uuid)
+        return NotificationServiceResponse(
+            data={"count": badge_counts(db, [topic])[topic]},
+            message="Notification badge fetched successfully",
+            status_code=200
+        ).model_dump()
+    except Exception as e:
+        return NotificationServiceResponse(
+            data=None,
+            message=f"Error fetching notification badge: {str(e)}",
+            status_code=500
+        ).model_dump()
+
+
+@notification_router.delete("/badge", status_code=200)
+def clear_notification_badge(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Reset the badge, e.g. when the user opens their notifications."""
+    try:
+        clear_badge(db, str(current_user.uuid))
+        db.commit()
+        return NotificationServiceResponse(
+            data={"count": 0},
+            message="Notification badge cleared successfully",
+            status_code=200
+        ).model_dump()
+    except Exception as e:
+        db.rollback()
+        return NotificationServiceResponse(
+            data=None,
+            message=f"Error clearing notification badge: {str(e)}",
+            status_code=500
+        ).model_dump()
@@ -0,0 +1,245 @@
+"""
+Live payment status events for ``GET /payments/events`` (Server-Sent Events).
+
+Status transitions call ``publish_payment_events`` inside their transaction.
+It issues ``pg_notify`` on the ``payment_events`` channel, and Postgres
+delivers notifications only when (and if) the transaction commits, so a
+subscriber never hears about a change that was rolled back.
+
+Each worker keeps one ``PaymentEventHub`` with a single asyncpg connection
+LISTENing on the channel, however many clients are streaming. Every event is
+matched against each subscriber's ``PaymentEventScope`` (the same visibility
+rules as ``apply_role_restrictions`` in the payment list) and put on that
+subscriber's bounded queue. A subscriber that falls behind, or any subscriber
+while the listener was reconnecting, gets a ``resync`` event instead of the
+missed ones and should refetch the payment list.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+import asyncpg
+from fastapi import Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.app.database.database import settings
+from src.app.database.models import Person, ProjectUserMap, User
+from src.app.schemas.auth_service_schamas import UserRole
+from src.app.schemas.payment_service_schemas import PaymentStatus
+from src.app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PAYMENT_EVENTS_CHANNEL = "payment_events"
+SUBSCRIBER_QUEUE_SIZE = 100
+RESYNC_EVENT = {"type": "resync"}
+
+FULL_VISIBILITY_ROLES = (
+    UserRole.ADMIN.value,
+    UserRole.ACCOUNTANT.value,
+    UserRole.SUPER_ADMIN.value,
+)
+OWN_PAYMENT_ROLES = (
+    UserRole.SITE_ENGINEER.value,
+    UserRole.SUB_CONTRACTOR.value,
+)
+
+
+def payment_event(payment, status: str, actor: User) -> Dict:
+    """The event for ``payment`` having moved to ``status``."""
+    return {
+        "type": "payment_status",
+        "payment_uuid": str(payment.uuid),
+        "status": status,
+        "project_id": str(payment.project_id) if payment.project_id else None,
+        "created_by": str(payment.created_by) if payment.created_by else None,
+        "person": str(payment.person) if payment.person else None,
+        "actor": {
+            "uuid": str(actor.uuid),
+            "name": actor.name,
+            "role": actor.role,
+        },
+        "at": datetime.now().isoformat(),
+    }
+
+
+def publish_payment_events(db: Session, events: Iterable[Dict]):
+    """Queue ``events`` for delivery when ``db``'s transaction commits."""
+    connection = db.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    payloads = [json.dumps(event) for event in events]
+    if not payloads:
+        return
+    # One round trip however many payments changed
+    connection.execute(
+        select(func.pg_notify(PAYMENT_EVENTS_CHANNEL, func.unnest(payloads)))
+    )
+
+
+def publish_payment_event(db: Session, payment, status: str, actor: User):
+    publish_payment_events(db, [payment_event(payment, status, actor)])
+
+
+class PaymentEventScope:
+    """What one subscriber may see; mirrors ``apply_role_restrictions``."""
+
+    def __init__(self, user_uuid: str, role: str, project_ids: Iterable[str] = (), person_uuid: Optional[str] = None):
+        self.user_uuid = user_uuid
+        self.role = role
+        self.project_ids = set(project_ids)
+        self.person_uuid = person_uuid
+
+    def can_see(self, event: Dict) -> bool:
+        if event.get("type") != "payment_status":
+            return True
+        if self.role in FULL_VISIBILITY_ROLES:
+            return True
+
+        own = event.get("created_by") == self.user_uuid
+        khatabook = event.get("status") == PaymentStatus.KHATABOOK.value
+        named = khatabook and self.person_uuid is not None and event.get("person") == self.person_uuid
+        if self.role in OWN_PAYMENT_ROLES:
+            return own or named
+        if self.role == UserRole.PROJECT_MANAGER.value:
+            return event.get("project_id") in self.project_ids or named
+        return own and not khatabook
+
+
+async def load_event_scope(db: AsyncSession, user: User) -> PaymentEventScope:
+    project_ids = (
+        await db.execute(
+            select(ProjectUserMap.project_id).where(ProjectUserMap.user_id == user.uuid)
+        )
+    ).scalars().all()
+    person_uuid = (
+        await db.execute(
+            select(Person.uuid)
+            .where(Person.user_id == user.uuid, Person.is_deleted.is_(False))
+            .limit(1)
+        )
+    ).scalar()
+    return PaymentEventScope(
+        user_uuid=str(user.uuid),
+        role=user.role,
+        project_ids=[str(project_id) for project_id in project_ids],
+        person_uuid=str(person_uuid) if person_uuid else None,
+    )
+
+
+class Subscriber:
+    def __init__(self, scope: PaymentEventScope, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.scope = scope
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def offer(self, event: Dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog and have it refetch instead
+            self.resync()
+
+    def resync(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC_EVENT)
+
+
+class PaymentEventHub:
+    """One LISTEN connection per worker fanning events out to subscribers."""
+
+    def __init__(self, dsn: str, channel: str = PAYMENT_EVENTS_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, scope: PaymentEventScope) -> Subscriber:
+        # Started on first use, so workers nobody streams from never connect
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        subscriber = Subscriber(scope)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def dispatch(self, event: Dict):
+        for subscriber in list(self._subscribers):
+            if subscriber.scope.can_see(event):
+                subscriber.offer(event)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed payment event: {payload[:200]}")
+            return
+        self.dispatch(event)
+
+    async def _listen(self):
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                delay = 1.0
+                await lost.wait()
+                logger.warning("Payment event listener lost its connection")
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close(timeout=5)
+                raise
+            except Exception as e:
+                logger.error(f"Payment event listener failed: {str(e)}")
+            # Anything published while disconnected is gone
+            for subscriber in list(self._subscribers):
+                subscriber.resync()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def format_sse(event: Dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(request: Request, scope: PaymentEventScope, hub: "PaymentEventHub" = None):
+    hub = hub or payment_event_hub
+    subscriber = hub.subscribe(scope)
+    try:
+        # Browsers reconnect after this many milliseconds if the stream drops
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=settings.PAYMENT_EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+payment_event_hub = PaymentEventHub(
+    dsn=settings.ASYNC_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+)
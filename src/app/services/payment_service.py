@@ -1,4 +1,3 @@
-import os
 import traceback
 import time
 from typing import Optional, List
@@ -13,12 +12,18 @@ from fastapi import (
     Query,
     UploadFile,
     Form,
-    Body
+    Body,
+    Request,
+    Security
 )
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi import status as h_status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, case, desc, func
-from src.app.database.database import get_db
+from sqlalchemy import or_, and_, case, desc, func, insert, select
+from src.app.database.database import get_async_db, get_db, run_concurrently
+from src.app.database.replica import replica_reads
 from src.app.database.models import (
     Payment,
     Project,
@@ -38,7 +43,9 @@ from src.app.database.models import (
     ItemCategories,
     Khatabook,
     ItemGroups,
-    ItemGroupMap
+    ItemGroupMap,
+    ProjectBalance,
+    SyncTombstone
 )
 import logging
 from src.app.schemas.auth_service_schamas import UserRole
@@ -47,26 +54,36 @@ from src.app.schemas import constants
 from src.app.schemas.constants import KHATABOOK_ENTRY_TYPE_CREDIT, KHATABOOK_PAYMENT_TYPE
 from src.app.schemas.payment_service_schemas import (
     CreatePerson,
-    PaymentsResponse,
     PaymentStatus,
     PaymentServiceResponse,
     CreatePaymentRequest,
     PaymentUpdateSchema,
-    StatusDatePair,
     ItemListTag,
     UpdatePerson,
     UpdateItemSchema,
     ItemDetail,
     ItemCategoryCreate,
-    ItemCategoryResponse
+    ItemCategoryResponse,
+    BulkApprovePaymentsRequest
 )
-from src.app.notification.notification_service import send_push_notification
-from src.app.notification.notification_schemas import NotificationMessage
-from src.app.notification.notification_service import send_push_notification
 from src.app.notification.notification_schemas import NotificationMessage
+from src.app.notification.outbox import enqueue_notifications
 from sqlalchemy.orm import aliased
-from src.app.services.auth_service import get_current_user
+from src.app.services.auth_service import bearer_scheme, get_current_user, get_current_user_async
+from src.app.services.payment_events import (
+    event_stream,
+    load_event_scope,
+    payment_event,
+    publish_payment_event,
+    publish_payment_events
+)
 from src.app.services.project_service import create_project_balance_entry
+from src.app.utils.responses import fast_response
+from src.app.utils.attachment_store import store_upload
+from src.app.utils.image_variants import variant_urls
+from src.app.utils.uploads import upload_size_error
+from src.app.utils.conditional_get import etag_headers, list_etag
+from src.app.database.change_counters import ITEM_LIST_TABLES, PAYMENT_LIST_TABLES
 import json
 from collections import defaultdict
 
@@ -102,14 +119,16 @@ def notify_create_payment(amount: int, user: User, db: Session):
             title="Payment Request",
             body=f"Payment of {amount} amount requested by {user.name}"
         )
-        for person in people:
-            send_push_notification(
-                topic=str(person.uuid),
-                title=notification.title,
-                body=notification.body
-            )
+        enqueue_notifications(
+            db,
+            topics=[str(person.uuid) for person in people],
+            title=notification.title,
+            body=notification.body,
+            kind=constants.NOTIFICATION_KIND_PAYMENT_REQUEST,
+            amount=amount
+        )
         logger.info(
-            f"{len(people)} Users were notified for this payment request"
+            f"{len(people)} Users were queued for notification of this payment request"
         )
         return True
     except Exception as e:
@@ -133,6 +152,14 @@ def create_payment(
     Otherwise, uses the person field from the request if supplied.
     Links items, uploads files, creates PaymentStatusHistory, and adjusts project balance.
     """
+    size_error = upload_size_error(files or [])
+    if size_error:
+        return PaymentServiceResponse(
+            status_code=413,
+            data=None,
+            message=size_error
+        ).model_dump()
+
     try:
         request_data = json.loads(request)
         payment_request = CreatePaymentRequest(**request_data)
@@ -192,34 +219,25 @@ def create_payment(
         )
 
         # Handle file uploads
-        if files:
-            upload_dir = constants.UPLOAD_DIR
-            os.makedirs(upload_dir, exist_ok=True)
-            for file in files:
-                # Create a unique filename to avoid collisions
-                file_ext = os.path.splitext(file.filename)[1]
-                unique_filename = f"{str(uuid4())}{file_ext}"
-                file_path = os.path.join(upload_dir, unique_filename)
-
-                # Save the file
-                with open(file_path, "wb") as buffer:
-                    buffer.write(file.file.read())
-
-                # Store the relative path in the database
-                db.add(PaymentFile(
-                    payment_id=new_payment.uuid,
-                    file_path=file_path
-                ))
+        for file in files or []:
+            stored = store_upload(file)
+            # Store the relative path in the database
+            db.add(PaymentFile(
+                payment_id=new_payment.uuid,
+                file_path=stored.path
+            ))
 
-        db.commit()
+        # Queued in the same transaction, delivered by the notification dispatcher
         notification = notify_create_payment(
             amount=payment_request.amount,
             user=current_user,
             db=db
         )
-        if not notification:
+        if notification is not True:
             logger.error(
-                "Something went wrong while sending create payment notification")
+                "Something went wrong while queuing create payment notification")
+        publish_payment_event(db, new_payment, new_payment.status, current_user)
+        db.commit()
         return PaymentServiceResponse(
             data={"payment_uuid": current_payment_uuid},
             message="Payment created successfully.",
@@ -828,11 +846,19 @@ def assemble_payments_response(grouped_data, db: Session, current_user: User):
         priority_name = row.priority_name
 
         # ----------------------------------------------------------- files
+        # *_previews carry the thumbnail/medium URLs; the original is fetched on open
         file_urls, approval_files = [], []
+        file_previews, approval_file_previews = [], []
         if payment.payment_files:
             for f in payment.payment_files:
                 file_url = f"{constants.HOST_URL}/{f.file_path}"
-                (approval_files if f.is_approval_upload else file_urls).append(file_url)
+                preview = {"url": file_url, **variant_urls(f.file_path)}
+                if f.is_approval_upload:
+                    approval_files.append(file_url)
+                    approval_file_previews.append(preview)
+                else:
+                    file_urls.append(file_url)
+                    file_previews.append(preview)
 
         # ----------------------------------------------------------- items
         # Create a list of dictionaries with item name and UUID
@@ -855,50 +881,50 @@ def assemble_payments_response(grouped_data, db: Session, current_user: User):
         )
 
         # ----------------------------------------------------------- build response
+        # Plain dict, built once; FastJSONResponse serialises it directly
         payments_data.append({
-            **PaymentsResponse(
-                uuid=payment.uuid,
-                amount=payment.amount,
-                description=payment.description,
-                project={
-                    "uuid": str(payment.project_id),
-                    "name": project_name
-                } if payment.project_id else None,
-                person={
-                    "uuid": str(parent_data.uuid),
-                    "name": parent_data.name
-                } if parent_data else None,
-                payment_details={
-                    "person_uuid": str(payment.person) if payment.person else None,
-                    "name": person_name,
-                    "account_number": str(row.account_number) if row.account_number else None,
-                    "ifsc_code": row.ifsc_code if row.ifsc_code else None,
-                    "upi_number": row.upi_number if row.upi_number else None
-                },
-                created_by={
-                    "uuid": str(payment.created_by),
-                    "name": user_name
-                } if payment.created_by else None,
-                files=file_urls,
-                # items=[ItemDetail(uuid=item["uuid"], name=item["name"]) for item in items_data],
-                items=item_names,
-                remarks=payment.remarks,
-                status_history=[StatusDatePair(**h) for h in data["statuses"]],
-                current_status=payment.status,
-                created_at=payment.created_at.strftime("%Y-%m-%d"),
-                update_remarks=payment.update_remarks,
-                latitude=payment.latitude,
-                longitude=payment.longitude,
-                transferred_date=(
-                    payment.transferred_date.strftime("%Y-%m-%d")
-                    if payment.transferred_date else None
-                ),
-                payment_history=data["edits"]
-            ).model_dump(),
+            "uuid": payment.uuid,
+            "amount": float(payment.amount),
+            "description": payment.description,
+            "project": {
+                "uuid": str(payment.project_id),
+                "name": project_name
+            } if payment.project_id else None,
+            "person": {
+                "uuid": str(parent_data.uuid),
+                "name": parent_data.name
+            } if parent_data else None,
+            "payment_details": {
+                "person_uuid": str(payment.person) if payment.person else None,
+                "name": person_name,
+                "account_number": str(row.account_number) if row.account_number else None,
+                "ifsc_code": row.ifsc_code if row.ifsc_code else None,
+                "upi_number": row.upi_number if row.upi_number else None
+            },
+            "created_by": {
+                "uuid": str(payment.created_by),
+                "name": user_name
+            } if payment.created_by else None,
+            "files": file_urls,
+            "file_previews": file_previews,
+            "items": item_names,
+            "remarks": payment.remarks,
+            "status_history": data["statuses"],
+            "current_status": payment.status,
+            "created_at": payment.created_at.strftime("%Y-%m-%d"),
+            "update_remarks": payment.update_remarks,
+            "latitude": float(payment.latitude) if payment.latitude is not None else None,
+            "longitude": float(payment.longitude) if payment.longitude is not None else None,
+            "transferred_date": (
+                payment.transferred_date.strftime("%Y-%m-%d")
+                if payment.transferred_date else None
+            ),
+            "payment_history": data["edits"],
             "priority_name": priority_name,
             "edit": can_edit_payment(status_list, current_user.role, payment.status),
             "decline_remark": payment.decline_remark,
             "approval_files": approval_files,
+            "approval_file_previews": approval_file_previews,
             # ---------- NEW KEYS ----------
             "transferred_from_bank": bank_name,
             "payment_type": KHATABOOK_PAYMENT_TYPE if payment.self_payment else None
@@ -906,206 +932,113 @@ def assemble_payments_response(grouped_data, db: Session, current_user: User):
 
     return payments_data
 
-@payment_router.get("", tags=["Payments"], status_code=200)
-def get_all_payments(
-    db: Session = Depends(get_db),
-    amount: Optional[float] = Query(None),
-    project_id: Optional[UUID] = Query(None),
-    status: Optional[List[str]] = Query(None),
-    start_date: Optional[datetime] = Query(None),
-    end_date: Optional[datetime] = Query(None),
-    recent: Optional[bool] = Query(False),
-    person_id: Optional[UUID] = Query(None),
-    item_id: Optional[UUID] = Query(None),
-    current_user: User = Depends(get_current_user),
-    from_uuid: Optional[UUID] = Query(None, description="UUID of the user who created the payment"),
-    to_uuid: Optional[UUID] = Query(None, description="UUID of the person receiving the payment"),
-    pending_request: Optional[bool] = Query(False, description="If true, show only role‑specific pending payments."),
-    page: Optional[int] = Query(None, ge=1, description="Page number (10 rows per page, omit/null = all)"),
+# Statuses counted in the list totals when no status filter is given
+TOTAL_REQUEST_STATUSES = [
+    PaymentStatus.REQUESTED.value,
+    PaymentStatus.APPROVED.value,
+    PaymentStatus.VERIFIED.value,
+    PaymentStatus.TRANSFERRED.value
+]
+TOTAL_PENDING_STATUSES = [
+    PaymentStatus.REQUESTED.value,
+    PaymentStatus.APPROVED.value,
+    PaymentStatus.VERIFIED.value
+]
+
+
+def apply_payment_list_filters(
+    query,
+    project_id: Optional[UUID] = None,
+    status: Optional[List[str]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    from_uuid: Optional[UUID] = None,
+    person_id: Optional[UUID] = None,
+    to_uuid: Optional[UUID] = None,
+    item_id: Optional[UUID] = None,
 ):
     """
-    Three modes:
-    1) recent=True            → last 5 payments (excl. transferred / declined) newest‑first
-    2) pending_request=True   → role queue:   approved → verified → requested
-    3) default                → full list, newest‑first
+    Applies the user-supplied filters shared by the payment list modes and
+    the list totals (project, status, date range, creator, person, item).
+    """
+    if project_id is not None:
+        query = query.filter(Payment.project_id == project_id)
+    if status is not None:
+        query = query.filter(Payment.status.in_(status))
+    if start_date and end_date:
+        end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        query = query.filter(Payment.created_at.between(start_date, end_date))
+    else:
+        if start_date:
+            query = query.filter(Payment.created_at >= start_date)
+        if end_date:
+            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+            query = query.filter(Payment.created_at <= end_date)
+    if from_uuid:
+        query = query.filter(Payment.created_by == from_uuid)
+    if person_id or to_uuid:
+        query = query.join(Person, Payment.person == Person.uuid, isouter=True)
+        if person_id:
+            query = query.filter(Payment.person == person_id)
+        if to_uuid:
+            query = query.filter(Person.uuid == to_uuid)
+    if item_id:
+        query = query.join(
+            PaymentItem,
+            PaymentItem.payment_id == Payment.uuid, isouter=True
+        ).filter(
+            PaymentItem.is_deleted.is_(False),
+            PaymentItem.item_id == item_id
+        )
+    return query
+
 
-    In every mode we:
-      • build an *ordered* list of UUIDs (with pagination)
-      • fetch full rows & assemble the response
-      • return records in that exact order
+def calculate_payment_total(db: Session, current_user: User, statuses: List[str], **filters) -> float:
     """
+    Sum of payment amounts for the payment list totals.
 
-    # ------------------------------------------------------------------ helpers
-    def paginate(q):
-        """return (uuid_list_in_order, total_count) after optional pagination"""
-        total = q.count()
-        if page:
-            q = q.offset((page - 1) * 10).limit(10)
-        return [r[0] for r in q.all()], total
-
-    def order_records(selected_uuids, assembled_records):
-        """Preserve the SQL ordering after JSON assembly"""
-        by_id = {rec["uuid"]: rec for rec in assembled_records}
-        return [by_id[u] for u in selected_uuids if u in by_id]
-
-    def calculate_total_request_amount(db):
-        """Calculate total amount of payments with appropriate status filtering"""
-        # Check if any specific filters are applied (project, item, person, user, status)
-        has_specific_filters = any([
-            project_id is not None,
-            item_id is not None,
-            person_id is not None,
-            from_uuid is not None,
-            to_uuid is not None,
-            status is not None  # Include status filter detection
-        ])
+    Global totals exclude khatabook payments. When the list is narrowed by
+    project, item, person or user, khatabook payments are included; an
+    explicit status filter replaces the default statuses altogether.
+    """
+    query = db.query(func.sum(Payment.amount)).filter(Payment.is_deleted.is_(False))
 
-        # Determine which statuses to include based on filtering context
-        if status is not None:
-            # When status filter is applied, use only the requested statuses
-            # This handles cases like ?status=khatabook correctly
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False)
-                # Status filter will be applied later in the function
-            )
-        elif has_specific_filters:
-            # When filtering by other entities (project, item, person, user), include khatabook payments
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False),
-                Payment.status.in_([
-                    PaymentStatus.REQUESTED.value,
-                    PaymentStatus.APPROVED.value,
-                    PaymentStatus.VERIFIED.value,
-                    PaymentStatus.TRANSFERRED.value,
-                    PaymentStatus.KHATABOOK.value  # Include khatabook when filtering by entities
-                ])
-            )
-        else:
-            # Global totals exclude khatabook payments
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False),
-                Payment.status.in_([
-                    PaymentStatus.REQUESTED.value,
-                    PaymentStatus.APPROVED.value,
-                    PaymentStatus.VERIFIED.value,
-                    PaymentStatus.TRANSFERRED.value
-                ])
-            )
+    if filters.get("status") is None:
+        has_specific_filters = any(
+            filters.get(key) is not None
+            for key in ("project_id", "item_id", "person_id", "from_uuid", "to_uuid")
+        )
+        if has_specific_filters:
+            statuses = statuses + [PaymentStatus.KHATABOOK.value]
+        query = query.filter(Payment.status.in_(statuses))
 
-        # Apply the same role-based restrictions as the main query
-        query = apply_role_restrictions(query, current_user, db)
-        if project_id is not None:
-            query = query.filter(Payment.project_id == project_id)
-        if status is not None:
-            query = query.filter(Payment.status.in_(status))
-            # query = query.filter(Payment.status != PaymentStatus.DECLINED.value)
-        if start_date and end_date:
-            end_date_with_time = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            query = query.filter(Payment.created_at.between(start_date, end_date_with_time))
-        else:
-            if start_date:
-                query = query.filter(Payment.created_at >= start_date)
-            if end_date:
-                end_date_with_time = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                query = query.filter(Payment.created_at <= end_date_with_time)
-        if from_uuid:
-            query = query.filter(Payment.created_by == from_uuid)
-        if person_id or to_uuid:
-            query = query.join(Person, Payment.person ==
-                               Person.uuid, isouter=True)
-            if person_id:
-                query = query.filter(Payment.person == person_id)
-            if to_uuid:
-                query = query.filter(Person.uuid == to_uuid)
-        if item_id:
-            query = query.join(
-                PaymentItem,
-                PaymentItem.payment_id == Payment.uuid, isouter=True
-            ).filter(
-                PaymentItem.is_deleted.is_(False),
-                PaymentItem.item_id == item_id
-            )
+    # Apply the same role-based restrictions as the main query
+    query = apply_role_restrictions(query, current_user, db)
+    query = apply_payment_list_filters(query, **filters)
 
-        return query.scalar() or 0.0
-
-    def calculate_total_pending_amount(db):
-        """Calculate total amount of pending payments with appropriate status filtering"""
-        # Check if any specific filters are applied (project, item, person, user, status)
-        has_specific_filters = any([
-            project_id is not None,
-            item_id is not None,
-            person_id is not None,
-            from_uuid is not None,
-            to_uuid is not None,
-            status is not None  # Include status filter detection
-        ])
+    return query.scalar() or 0.0
 
-        # Determine which statuses to include based on filtering context
-        if status is not None:
-            # When status filter is applied, use only the requested statuses for pending calculation
-            # Note: if status=khatabook, this will include khatabook amounts in "pending" total
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False)
-                # Status filter will be applied later in the function
-            )
-        elif has_specific_filters:
-            # When filtering by other entities, include khatabook payments in pending calculation
-            # Note: khatabook payments are never truly "pending" but should be included in filtered totals
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False),
-                Payment.status.in_([
-                    PaymentStatus.REQUESTED.value,
-                    PaymentStatus.APPROVED.value,
-                    PaymentStatus.VERIFIED.value,
-                    PaymentStatus.KHATABOOK.value  # Include khatabook when filtering by entities
-                ])
-            )
-        else:
-            # Global pending totals exclude khatabook payments
-            query = db.query(func.sum(Payment.amount)).filter(
-                Payment.is_deleted.is_(False),
-                Payment.status.in_([
-                    PaymentStatus.REQUESTED.value,
-                    PaymentStatus.APPROVED.value,
-                    PaymentStatus.VERIFIED.value
-                ])
-            )
 
-        # Apply the same role-based restrictions as the main query
-        query = apply_role_restrictions(query, current_user, db)
-        if project_id is not None:
-            query = query.filter(Payment.project_id == project_id)
-        if status is not None:
-            query = query.filter(Payment.status.in_(status))
-        if start_date and end_date:
-            end_date_with_time = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            query = query.filter(Payment.created_at.between(start_date, end_date_with_time))
-        else:
-            if start_date:
-                query = query.filter(Payment.created_at >= start_date)
-            if end_date:
-                end_date_with_time = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                query = query.filter(Payment.created_at <= end_date_with_time)
-        if from_uuid:
-            query = query.filter(Payment.created_by == from_uuid)
-        if person_id or to_uuid:
-            query = query.join(Person, Payment.person == Person.uuid, isouter=True)
-            if person_id:
-                query = query.filter(Payment.person == person_id)
-            if to_uuid:
-                query = query.filter(Person.uuid == to_uuid)
-        if item_id:
-            query = query.join(
-                PaymentItem,
-                PaymentItem.payment_id == Payment.uuid, isouter=True
-            ).filter(
-                PaymentItem.is_deleted.is_(False),
-                PaymentItem.item_id == item_id
-            )
+def fetch_payment_records(
+    db: Session,
+    current_user: User,
+    recent: bool,
+    pending_request: bool,
+    page: Optional[int],
+    amount: Optional[float] = None,
+    **filters
+):
+    """
+    Returns (records, total_count) for one of the three payment list modes,
+    with records None when the page is empty:
 
-        return query.scalar() or 0.0
+    1) recent=True            → last 5 payments (excl. transferred / declined) newest‑first
+    2) pending_request=True   → role queue:   approved → verified → requested
+    3) default                → full list, newest‑first
 
-    # ------------------------------------------------------------------ 1) RECENT MODE
+    An *ordered* list of UUIDs is built first (with pagination), then the
+    full rows are fetched and assembled in that exact order.
+    """
     if recent:
         base = (
             db.query(Payment.uuid)
@@ -1116,89 +1049,7 @@ def get_all_payments(
             )
             .order_by(Payment.created_at.desc())
         )
-
-        # Apply role-based restrictions
-        base = apply_role_restrictions(base, current_user, db)
-
-        # accountants ≤10 000
-        if current_user.role == UserRole.ACCOUNTANT.value:
-            base = base.filter(Payment.amount <= 10_000)
-
-        # Apply user-supplied filters
-        if amount is not None:
-            base = base.filter(Payment.amount == amount)
-        if project_id is not None:
-            base = base.filter(Payment.project_id == project_id)
-        if status is not None:
-            base = base.filter(Payment.status.in_(status))
-        if start_date and end_date:
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            base = base.filter(Payment.created_at.between(start_date, end_date))
-        else:
-            if start_date:
-                base = base.filter(Payment.created_at >= start_date)
-            if end_date:
-                end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                base = base.filter(Payment.created_at <= end_date)
-        if from_uuid:
-            base = base.filter(Payment.created_by == from_uuid)
-        if person_id or to_uuid:
-            base = base.join(Person, Payment.person == Person.uuid, isouter=True)
-            if person_id:
-                base = base.filter(Payment.person == person_id)
-            if to_uuid:
-                base = base.filter(Person.uuid == to_uuid)
-        if item_id:
-            base = base.join(PaymentItem,
-                             PaymentItem.payment_id == Payment.uuid, isouter=True)\
-                       .filter(PaymentItem.is_deleted.is_(False),
-                               PaymentItem.item_id == item_id)
-
-        # Apply ordering and limit AFTER all filters
-        base = base.order_by(Payment.created_at.desc()).limit(5)
-
-        uuids, total = paginate(base)
-
-        # Calculate total amounts using the helper functions
-        total_request_amount = calculate_total_request_amount(db)
-        total_pending_amount = calculate_total_pending_amount(db)
-
-        if not uuids:
-            return PaymentServiceResponse(
-                data={
-                    "records": [],
-                    "total_count": 0,
-                    "total_request_amount": total_request_amount,
-                    "total_pending_amount": total_pending_amount
-                },
-                message="No recent payments found.",
-                status_code=200
-            ).model_dump()
-
-        main_q = build_main_payments_query(db, pending_request=False)\
-            .filter(Payment.uuid.in_(uuids))
-        results = main_q.all()
-        grouped = assemble_payments_response(
-            group_query_results(results), db, current_user)
-        records_out = order_records(uuids, grouped)
-
-        payload = {
-            "records": records_out,
-            "total_count": total,
-            "total_request_amount": total_request_amount,
-            "total_pending_amount": total_pending_amount
-        }
-        if page:
-            payload.update({"page": page, "limit": 10})
-
-        return PaymentServiceResponse(
-            data=payload,
-            message="Recent payments fetched successfully.",
-            status_code=200
-        ).model_dump()
-
-    # ------------------------------------------------------------------ 2) PENDING‑REQUEST MODE
-    if pending_request:
+    elif pending_request:
         role_status_map = {
             UserRole.ACCOUNTANT.value:  ["approved", "verified", "requested"],
             UserRole.SUPER_ADMIN.value: ["approved", "verified", "requested"],
@@ -1217,150 +1068,96 @@ def get_all_payments(
                   Payment.status.in_(wanted_statuses)
             )
         )
+    else:
+        base = (
+            db.query(Payment.uuid)
+              .filter(Payment.is_deleted.is_(False))
+              .order_by(Payment.created_at.desc())
+        )
 
-        # Apply role-based restrictions
-        base = apply_role_restrictions(base, current_user, db)
-
-        # accountants ≤10 000 in queue view
-        if current_user.role == UserRole.ACCOUNTANT.value:
-            base = base.filter(Payment.amount <= 10_000)
-
-        # user‑supplied filters (“normal” section reused):
-        if amount is not None:
-            base = base.filter(Payment.amount == amount)
-        if project_id is not None:
-            base = base.filter(Payment.project_id == project_id)
-        if status is not None:
-            base = base.filter(Payment.status.in_(status))
-        if start_date and end_date:
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            base = base.filter(Payment.created_at.between(start_date, end_date))
-        else:
-            if start_date:
-                base = base.filter(Payment.created_at >= start_date)
-            if end_date:
-                end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                base = base.filter(Payment.created_at <= end_date)
-        if from_uuid:
-            base = base.filter(Payment.created_by == from_uuid)
-        if person_id or to_uuid:
-            base = base.join(Person, Payment.person == Person.uuid, isouter=True)
-            if person_id:
-                base = base.filter(Payment.person == person_id)
-            if to_uuid:
-                base = base.filter(Person.uuid == to_uuid)
-        if item_id:
-            base = base.join(PaymentItem,
-                             PaymentItem.payment_id == Payment.uuid, isouter=True)\
-                       .filter(PaymentItem.is_deleted.is_(False),
-                               PaymentItem.item_id == item_id)
+    # Apply role-based restrictions
+    base = apply_role_restrictions(base, current_user, db)
+
+    # accountants ≤10 000 in recent and queue views
+    if (recent or pending_request) and current_user.role == UserRole.ACCOUNTANT.value:
+        base = base.filter(Payment.amount <= 10_000)
 
+    # Apply user-supplied filters
+    if amount is not None:
+        base = base.filter(Payment.amount == amount)
+    base = apply_payment_list_filters(base, **filters)
+
+    if recent:
+        # Apply ordering and limit AFTER all filters
+        base = base.order_by(Payment.created_at.desc()).limit(5)
+    elif pending_request:
         # ORDER: status_rank asc, then created_at desc
         base = base.order_by(rank_expr, Payment.created_at.desc())
 
-        uuids, total = paginate(base)
+    # ordered uuids after optional pagination
+    total = base.count()
+    if page:
+        base = base.offset((page - 1) * 10).limit(10)
+    uuids = [r[0] for r in base.all()]
 
-        # Calculate total amounts using the helper functions
-        total_request_amount = calculate_total_request_amount(db)
-        total_pending_amount = calculate_total_pending_amount(db)
+    if not uuids:
+        return None, 0
 
-        if not uuids:
-            return PaymentServiceResponse(
-                data={
-                    "records": [],
-                    "total_count": 0,
-                    "total_request_amount": total_request_amount,
-                    "total_pending_amount": total_pending_amount
-                },
-                message="No pending payments.",
-                status_code=200
-            ).model_dump()
+    main_q = build_main_payments_query(db, pending_request=pending_request and not recent)\
+        .filter(Payment.uuid.in_(uuids))
+    assembled = assemble_payments_response(
+        group_query_results(main_q.all()), db, current_user)
 
-        main_q = build_main_payments_query(db, pending_request=True)\
-            .filter(Payment.uuid.in_(uuids))
-        results = main_q.all()
-        grouped = assemble_payments_response(
-            group_query_results(results), db, current_user)
-        records_out = order_records(uuids, grouped)
-
-        payload = {
-            "records": records_out,
-            "total_count": total,
-            "total_request_amount": total_request_amount,
-            "total_pending_amount": total_pending_amount
-        }
-        if page:
-            payload.update({"page": page, "limit": 10})
+    # Preserve the SQL ordering after JSON assembly
+    by_id = {rec["uuid"]: rec for rec in assembled}
+    return [by_id[u] for u in uuids if u in by_id], total
 
-        return PaymentServiceResponse(
-            data=payload,
-            message="Pending payments fetched successfully.",
-            status_code=200
-        ).model_dump()
 
-    # ------------------------------------------------------------------ 3) NORMAL LIST
-    base = (
-        db.query(Payment.uuid)
-          .filter(Payment.is_deleted.is_(False))
-          .order_by(Payment.created_at.desc())
+async def collect_payments(
+    db: AsyncSession,
+    current_user: User,
+    recent: bool = False,
+    pending_request: bool = False,
+    page: Optional[int] = None,
+    amount: Optional[float] = None,
+    **filters
+) -> dict:
+    """
+    Build the GET /payments envelope. The page of records and the two totals
+    are independent queries, so they run concurrently, each on its own
+    connection.
+    """
+    (records_out, total), total_request_amount, total_pending_amount = await run_concurrently(
+        db,
+        lambda session: fetch_payment_records(
+            session, current_user, recent, pending_request, page, amount=amount, **filters
+        ),
+        lambda session: calculate_payment_total(
+            session, current_user, TOTAL_REQUEST_STATUSES, **filters
+        ),
+        lambda session: calculate_payment_total(
+            session, current_user, TOTAL_PENDING_STATUSES, **filters
+        ),
     )
 
-    # Apply role-based restrictions
-    base = apply_role_restrictions(base, current_user, db)
-
-    # --- same user‑supplied filters as above ---
-    if amount is not None:
-        base = base.filter(Payment.amount == amount)
-    if project_id is not None:
-        base = base.filter(Payment.project_id == project_id)
-    if status is not None:
-        base = base.filter(Payment.status.in_(status))
-    if start_date and end_date:
-        end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-        base = base.filter(Payment.created_at.between(start_date, end_date))
+    if recent:
+        empty_message, message = "No recent payments found.", "Recent payments fetched successfully."
+    elif pending_request:
+        empty_message, message = "No pending payments.", "Pending payments fetched successfully."
     else:
-        if start_date:
-            base = base.filter(Payment.created_at >= start_date)
-        if end_date:
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            base = base.filter(Payment.created_at <= end_date)
-    if from_uuid:
-        base = base.filter(Payment.created_by == from_uuid)
-    if person_id or to_uuid:
-        base = base.join(Person, Payment.person == Person.uuid, isouter=True)
-        if person_id:
-            base = base.filter(Payment.person == person_id)
-        if to_uuid:
-            base = base.filter(Person.uuid == to_uuid)
-    if item_id:
-        base = base.join(PaymentItem,
-                         PaymentItem.payment_id == Payment.uuid, isouter=True)\
-            .filter(PaymentItem.is_deleted.is_(False),
-                    PaymentItem.item_id == item_id)
-
-    # Calculate total amounts using the helper functions
-    total_request_amount = calculate_total_request_amount(db)
-    total_pending_amount = calculate_total_pending_amount(db)
+        empty_message, message = "No payments found.", "All payments fetched successfully."
 
-    uuids, total = paginate(base)
-
-    if not uuids:
-        return PaymentServiceResponse(
-            data={
+    if records_out is None:
+        return {
+            "data": {
                 "records": [],
                 "total_count": 0,
                 "total_request_amount": total_request_amount,
                 "total_pending_amount": total_pending_amount
             },
-            message="No payments found.",
-            status_code=200
-        ).model_dump()
-
-    main_q = build_main_payments_query(db, pending_request=False)\
-        .filter(Payment.uuid.in_(uuids))
-    grouped = assemble_payments_response(
-        group_query_results(main_q.all()), db, current_user)
-    records_out = order_records(uuids, grouped)
+            "message": empty_message,
+            "status_code": 200
+        }
 
     payload = {
         "records": records_out,
@@ -1371,11 +1168,78 @@ def get_all_payments(
     if page:
         payload.update({"page": page, "limit": 10})
 
-    return PaymentServiceResponse(
-        data=payload,
-        message="All payments fetched successfully.",
-        status_code=200
-    ).model_dump()
+    return {"data": payload, "message": message, "status_code": 200}
+
+
+@payment_router.get("", tags=["Payments"], status_code=200)
+@replica_reads
+async def get_all_payments(
+    db: AsyncSession = Depends(get_async_db),
+    amount: Optional[float] = Query(None),
+    project_id: Optional[UUID] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    recent: Optional[bool] = Query(False),
+    person_id: Optional[UUID] = Query(None),
+    item_id: Optional[UUID] = Query(None),
+    current_user: User = Depends(get_current_user_async),
+    from_uuid: Optional[UUID] = Query(None, description="UUID of the user who created the payment"),
+    to_uuid: Optional[UUID] = Query(None, description="UUID of the person receiving the payment"),
+    pending_request: Optional[bool] = Query(False, description="If true, show only role‑specific pending payments."),
+    page: Optional[int] = Query(None, ge=1, description="Page number (10 rows per page, omit/null = all)"),
+    etag: Optional[str] = Depends(list_etag(PAYMENT_LIST_TABLES)),
+):
+    """
+    Three modes:
+    1) recent=True            → last 5 payments (excl. transferred / declined) newest‑first
+    2) pending_request=True   → role queue:   approved → verified → requested
+    3) default                → full list, newest‑first
+
+    See collect_payments for the response contents.
+    """
+    envelope = await collect_payments(
+        db,
+        current_user,
+        recent=recent,
+        pending_request=pending_request,
+        page=page,
+        amount=amount,
+        project_id=project_id,
+        status=status,
+        start_date=start_date,
+        end_date=end_date,
+        from_uuid=from_uuid,
+        person_id=person_id,
+        to_uuid=to_uuid,
+        item_id=item_id,
+    )
+    return fast_response(**envelope, headers=etag_headers(etag))
+
+
+@payment_router.get("/events", tags=["Payments"], status_code=200)
+async def stream_payment_events(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db, scope="function"),
+    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
+):
+    """
+    Server-Sent Events stream of payment status changes the user can see
+    (payment uuid, new status, actor, project). A ``resync`` event means some
+    changes were missed and the payment list should be refetched.
+
+    The database session is only used to authenticate and is closed before
+    streaming starts.
+    """
+    current_user = await get_current_user_async(db=db, credentials=credentials)
+    if not isinstance(current_user, User):
+        return current_user
+    scope = await load_event_scope(db, current_user)
+    return StreamingResponse(
+        event_stream(request, scope),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # endregion
 # ========================== Payments API Finished =======================================================================
@@ -1418,6 +1282,7 @@ def delete_payment(
             PaymentEditHistory.payment_id == payment.uuid
         ).update({PaymentEditHistory.is_deleted: True})
 
+        publish_payment_event(db, payment, "deleted", current_user)
         db.commit()
 
         return PaymentServiceResponse(
@@ -1435,6 +1300,15 @@ def delete_payment(
         ).model_dump()
 
 
+PAYMENT_STATUS_ORDER = {
+    "requested": 1,
+    "verified": 2,
+    "approved": 3,
+    "transferred": 4,
+    "khatabook": 5  # Khatabook status is final and non-changeable
+}
+
+
 def notify_payment_status_update(
         amount: int,
         status: str,
@@ -1478,13 +1352,15 @@ def notify_payment_status_update(
         body=f"Payment of {amount} {status} by {user.name}"
     )
 
-    for person in people:
-        send_push_notification(
-            topic=str(person.uuid),
-            title=notification.title,
-            body=notification.body
-        )
-    logger.info(f"{len(people)} Users were notified for this payment request")
+    enqueue_notifications(
+        db,
+        topics=[str(person.uuid) for person in people],
+        title=notification.title,
+        body=notification.body,
+        kind=constants.NOTIFICATION_KIND_PAYMENT_STATUS,
+        amount=amount
+    )
+    logger.info(f"{len(people)} Users were queued for notification of this payment status update")
     return True
 
 
@@ -1558,6 +1434,7 @@ def cancel_payment_status(
             )
         )
 
+        publish_payment_event(db, payment, previous_status, current_user)
         db.commit()
         return PaymentServiceResponse(
             data=None,
@@ -1608,6 +1485,14 @@ def approve_payment(
                 status_code=403
             ).model_dump()
 
+        size_error = upload_size_error(files or [])
+        if size_error:
+            return PaymentServiceResponse(
+                data=None,
+                message=size_error,
+                status_code=413
+            ).model_dump()
+
         # 2) Find the payment
         payment = db.query(Payment).filter(Payment.uuid == payment_id).first()
         if not payment:
@@ -1644,16 +1529,8 @@ def approve_payment(
         db.add(payment_status)
 
         # 5) Only update payment table’s 'status' if `status` is ahead of the current payment.status
-        status_order_map = {
-            "requested": 1,
-            "verified": 2,
-            "approved": 3,
-            "transferred": 4,
-            "khatabook": 5  # Khatabook status is final and non-changeable
-        }
-
         def get_order(s: str) -> int:
-            return status_order_map.get(s, 0)
+            return PAYMENT_STATUS_ORDER.get(s, 0)
 
         current_order = get_order(payment.status)
         new_order = get_order(status)
@@ -1711,7 +1588,7 @@ def approve_payment(
                 last_entry = db.query(Khatabook).filter(
                     Khatabook.created_by == payment.created_by,
                     Khatabook.is_deleted.is_(False)
-                ).order_by(Khatabook.created_at.desc()).first()
+                ).order_by(Khatabook.created_at.desc(), Khatabook.id.desc()).first()
 
                 # Calculate balance_after_entry as last entry's balance +
                 # payment amount
@@ -1810,27 +1687,16 @@ def approve_payment(
                     db.add(log_entry)
 
         # 6) Handle optional file uploads
-        if files:
-            upload_dir = constants.UPLOAD_DIR_ADMIN
-            os.makedirs(upload_dir, exist_ok=True)
-            for file in files:
-                # Create a unique filename to avoid collisions
-                file_ext = os.path.splitext(file.filename)[1]
-                unique_filename = f"{str(uuid4())}{file_ext}"
-                file_path = os.path.join(upload_dir, unique_filename)
-
-                # Save the file
-                with open(file_path, "wb") as buffer:
-                    buffer.write(file.file.read())
-
-                # Mark these files as approval uploads
-                db.add(
-                    PaymentFile(
-                        payment_id=payment.uuid,
-                        file_path=file_path,
-                        is_approval_upload=True
-                    )
+        for file in files or []:
+            stored = store_upload(file)
+            # Mark these files as approval uploads
+            db.add(
+                PaymentFile(
+                    payment_id=payment.uuid,
+                    file_path=stored.path,
+                    is_approval_upload=True
                 )
+            )
 
         # 7) Add a log entry
         log_entry = Log(
@@ -1842,10 +1708,7 @@ def approve_payment(
         )
         db.add(log_entry)
 
-        # 8) Commit changes
-        db.commit()
-
-        # 9) Send notifications
+        # 8) Queue notifications in the same transaction
         notify_payment_status_update(
             amount=payment.amount,
             status=status,
@@ -1853,6 +1716,10 @@ def approve_payment(
             payment_user=payment.created_by,
             db=db
         )
+        publish_payment_event(db, payment, payment.status, current_user)
+
+        # 9) Commit changes
+        db.commit()
 
         return PaymentServiceResponse(
             data=None,
@@ -1869,6 +1736,307 @@ def approve_payment(
         ).model_dump()
 
 
+def apply_bulk_transfer(db: Session, payments: list, bank_uuid: UUID, current_user: User):
+    """
+    Transfer side effects of ``approve_payment`` for many payments at once:
+    bank deduction, project actual balances, item balances and, for self
+    payments, the khatabook balance and credit entry. Each is one statement
+    (or one multi-row insert) over all payments. The bank row must already
+    be locked by the caller.
+    """
+    now = datetime.now()
+    payment_ids = [payment.uuid for payment in payments]
+
+    db.query(Payment).filter(Payment.uuid.in_(payment_ids)).update(
+        {Payment.transferred_date: now, Payment.deducted_from_bank_uuid: bank_uuid},
+        synchronize_session=False
+    )
+    db.query(BalanceDetail).filter(BalanceDetail.uuid == bank_uuid).update(
+        {BalanceDetail.balance: BalanceDetail.balance - sum(p.amount for p in payments)},
+        synchronize_session=False
+    )
+
+    # Project actual balances, one balance entry per payment
+    project_totals = defaultdict(float)
+    for payment in payments:
+        project_totals[payment.project_id] += payment.amount
+    known_projects = {
+        row[0] for row in db.query(Project.uuid).filter(Project.uuid.in_(list(project_totals)))
+    }
+    if known_projects:
+        db.query(Project).filter(Project.uuid.in_(known_projects)).update(
+            {Project.actual_balance: Project.actual_balance + case(
+                {project_id: project_totals[project_id] for project_id in known_projects},
+                value=Project.uuid
+            )},
+            synchronize_session=False
+        )
+        db.execute(insert(ProjectBalance), [
+            {
+                "project_id": payment.project_id,
+                "adjustment": payment.amount,
+                "description": f"Payment deduction for payment {payment.uuid}",
+                "balance_type": "actual",
+            }
+            for payment in payments if payment.project_id in known_projects
+        ])
+
+    # Item balances: each item of a payment is charged the full payment amount
+    by_uuid = {payment.uuid: payment for payment in payments}
+    payment_items = db.query(PaymentItem.payment_id, PaymentItem.item_id).filter(
+        PaymentItem.payment_id.in_(payment_ids),
+        PaymentItem.is_deleted.is_(False)
+    ).all()
+    if payment_items:
+        item_maps = {
+            (row.project_id, row.item_id): row.uuid
+            for row in db.query(
+                ProjectItemMap.uuid, ProjectItemMap.project_id, ProjectItemMap.item_id
+            ).filter(
+                ProjectItemMap.project_id.in_(list(project_totals)),
+                ProjectItemMap.item_id.in_({row.item_id for row in payment_items})
+            )
+        }
+        deductions = defaultdict(float)
+        log_rows = []
+        for payment_id, item_id in payment_items:
+            payment = by_uuid[payment_id]
+            map_uuid = item_maps.get((payment.project_id, item_id))
+            if map_uuid is None:
+                continue
+            deductions[map_uuid] += payment.amount
+            log_rows.append({
+                "entity": "ProjectItemMap",
+                "action": "DeductBalance",
+                "entity_id": map_uuid,
+                "performed_by": current_user.uuid,
+            })
+        if deductions:
+            db.query(ProjectItemMap).filter(ProjectItemMap.uuid.in_(list(deductions))).update(
+                {ProjectItemMap.item_balance: func.coalesce(ProjectItemMap.item_balance, 0) - case(
+                    dict(deductions), value=ProjectItemMap.uuid
+                )},
+                synchronize_session=False
+            )
+            db.execute(insert(Log), log_rows)
+
+    # Self payments credit the requester's khatabook
+    self_payments = [payment for payment in payments if payment.self_payment]
+    if not self_payments:
+        return
+    user_totals = defaultdict(float)
+    for payment in self_payments:
+        user_totals[payment.created_by] += payment.amount
+    users = sorted(user_totals, key=str)
+
+    existing = {
+        row[0] for row in db.query(KhatabookBalance.user_uuid).filter(
+            KhatabookBalance.user_uuid.in_(users)
+        ).order_by(KhatabookBalance.user_uuid).with_for_update()
+    }
+    if existing:
+        db.query(KhatabookBalance).filter(KhatabookBalance.user_uuid.in_(existing)).update(
+            {KhatabookBalance.balance: KhatabookBalance.balance + case(
+                {user_uuid: user_totals[user_uuid] for user_uuid in existing},
+                value=KhatabookBalance.user_uuid
+            )},
+            synchronize_session=False
+        )
+    missing = [user_uuid for user_uuid in users if user_uuid not in existing]
+    if missing:
+        db.execute(insert(KhatabookBalance), [
+            {"user_uuid": user_uuid, "balance": user_totals[user_uuid]} for user_uuid in missing
+        ])
+
+    # Continue each user's running balance from their latest entry. Entries
+    # inserted together share created_at, so the id breaks the tie
+    ranked = db.query(
+        Khatabook.created_by,
+        Khatabook.balance_after_entry,
+        func.row_number().over(
+            partition_by=Khatabook.created_by,
+            order_by=(Khatabook.created_at.desc(), Khatabook.id.desc())
+        ).label("position")
+    ).filter(
+        Khatabook.created_by.in_(users),
+        Khatabook.is_deleted.is_(False)
+    ).subquery()
+    running = {
+        row.created_by: row.balance_after_entry or 0.0
+        for row in db.query(ranked.c.created_by, ranked.c.balance_after_entry).filter(ranked.c.position == 1)
+    }
+
+    entry_rows = []
+    for payment in self_payments:
+        running[payment.created_by] = running.get(payment.created_by, 0.0) + payment.amount
+        entry_rows.append({
+            "amount": payment.amount,
+            "remarks": f"Self payment approved - {payment.description}" if payment.description else "Self payment approved",
+            "person_id": payment.person,
+            "expense_date": now,
+            "created_by": payment.created_by,
+            "balance_after_entry": running[payment.created_by],
+            "project_id": payment.project_id,
+            "payment_mode": "Bank Transfer",
+            "entry_type": KHATABOOK_ENTRY_TYPE_CREDIT,
+        })
+    db.execute(insert(Khatabook), entry_rows)
+
+
+@payment_router.put("/approve/bulk")
+def approve_payments_bulk(
+    payload: BulkApprovePaymentsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Approve (or, for accountants, transfer) many payments in one transaction.
+
+    The bank row and then the payments, in uuid order, are locked up front so
+    concurrent bulk approvals can not deadlock. Status history, status
+    changes, balances and khatabook entries are written with set-based
+    statements, and notifications are queued in the same transaction. Unlike
+    the single endpoint, a payment that is already transferred is skipped
+    rather than deducted again, so a retried bulk transfer is harmless.
+
+    Returns one result per requested payment.
+    """
+    try:
+        if current_user.role not in [
+            UserRole.SUPER_ADMIN.value,
+            UserRole.ADMIN.value,
+            UserRole.PROJECT_MANAGER.value,
+            UserRole.SITE_ENGINEER.value,
+            UserRole.ACCOUNTANT.value
+        ]:
+            return PaymentServiceResponse(
+                data=None,
+                message=constants.CANT_APPROVE_PAYMENT,
+                status_code=403
+            ).model_dump()
+
+        status = constants.RoleStatusMapping.get(current_user.role)
+        if not status:
+            return PaymentServiceResponse(
+                data=None,
+                message="Invalid role for updating payment status.",
+                status_code=400
+            ).model_dump()
+
+        transferring = status == PaymentStatus.TRANSFERRED.value
+        if transferring:
+            if not payload.bank_uuid:
+                return PaymentServiceResponse(
+                    data=None,
+                    message="Must provide bank_uuid when transferring payment.",
+                    status_code=400
+                ).model_dump()
+            bank = db.query(BalanceDetail.id).filter(
+                BalanceDetail.uuid == payload.bank_uuid
+            ).with_for_update().first()
+            if not bank:
+                return PaymentServiceResponse(
+                    data=None,
+                    message="No bank found for given bank_uuid.",
+                    status_code=404
+                ).model_dump()
+
+        requested_ids = list(dict.fromkeys(payload.payment_ids))
+        found = {
+            payment.uuid: payment
+            for payment in db.query(
+                Payment.uuid,
+                Payment.amount,
+                Payment.status,
+                Payment.project_id,
+                Payment.created_by,
+                Payment.person,
+                Payment.self_payment,
+                Payment.description
+            ).filter(
+                Payment.uuid.in_(requested_ids),
+                Payment.is_deleted.is_(False)
+            ).order_by(Payment.uuid).with_for_update()
+        }
+
+        # Same rule as approve_payment: only move a payment's status forward
+        new_order = PAYMENT_STATUS_ORDER.get(status, 0)
+        results, applied, behind = [], [], []
+        for payment_id in requested_ids:
+            payment = found.get(payment_id)
+            payment_status = payment.status if payment else None
+            if not payment:
+                outcome, message = "not_found", constants.PAYMENT_NOT_FOUND
+            elif payment.status == PaymentStatus.KHATABOOK.value:
+                outcome, message = "rejected", "Khatabook payments cannot be approved or modified."
+            elif transferring and payment.status == PaymentStatus.TRANSFERRED.value:
+                outcome, message = "skipped", "Payment is already transferred."
+            else:
+                outcome, message = "updated", "Payment status updated successfully"
+                applied.append(payment)
+                if new_order > PAYMENT_STATUS_ORDER.get(payment.status, 0):
+                    behind.append(payment.uuid)
+                    payment_status = status
+            results.append({
+                "payment_id": str(payment_id),
+                "status": outcome,
+                "payment_status": payment_status,
+                "message": message
+            })
+
+        if applied:
+            applied_ids = [payment.uuid for payment in applied]
+            db.execute(insert(PaymentStatusHistory), [
+                {"payment_id": payment_id, "status": status, "created_by": current_user.uuid}
+                for payment_id in applied_ids
+            ])
+            if behind:
+                db.query(Payment).filter(Payment.uuid.in_(behind)).update(
+                    {Payment.status: status}, synchronize_session=False
+                )
+            if transferring:
+                apply_bulk_transfer(db, applied, payload.bank_uuid, current_user)
+            db.execute(insert(Log), [
+                {
+                    "entity": "Payment",
+                    "action": status,
+                    "entity_id": payment_id,
+                    "performed_by": current_user.uuid,
+                }
+                for payment_id in applied_ids
+            ])
+            for payment in applied:
+                notify_payment_status_update(
+                    amount=payment.amount,
+                    status=status,
+                    user=current_user,
+                    payment_user=payment.created_by,
+                    db=db
+                )
+            moved = set(behind)
+            publish_payment_events(db, [
+                payment_event(payment, status if payment.uuid in moved else payment.status, current_user)
+                for payment in applied
+            ])
+            db.commit()
+        else:
+            db.rollback()
+
+        return PaymentServiceResponse(
+            data={"results": results},
+            message=f"{len(applied)} of {len(requested_ids)} payments updated",
+            status_code=200
+        ).model_dump()
+
+    except Exception as e:
+        db.rollback()
+        return PaymentServiceResponse(
+            data=None,
+            message=f"An Error Occurred: {str(e)}",
+            status_code=500
+        ).model_dump()
+
+
 @payment_router.put("/decline")
 def decline_payment(
     payment_id: UUID,
@@ -1948,10 +2116,8 @@ def decline_payment(
             performed_by=current_user.uuid,
         )
         db.add(log_entry)
-        db.flush()
-        db.commit()
 
-        # 7) Send notification
+        # 7) Queue notification in the same transaction
         notify_payment_status_update(
             amount=payment.amount,
             status=PaymentStatus.DECLINED.value,
@@ -1959,6 +2125,8 @@ def decline_payment(
             payment_user=payment.created_by,
             db=db
         )
+        publish_payment_event(db, payment, PaymentStatus.DECLINED.value, current_user)
+        db.commit()
 
         return PaymentServiceResponse(
             data=None,
@@ -2670,15 +2838,15 @@ def create_item(
 
 
 
-@payment_router.get("/items", tags=["Items"], status_code=200)
-def list_items(
+async def collect_items(
+    db: AsyncSession,
     list_tag: Optional[str] = None,
-    category: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
-):
+    category: Optional[str] = None,
+    search: Optional[str] = None
+) -> dict:
+    """Build the GET /payments/items envelope."""
     try:
-        query = db.query(Item).order_by(desc(Item.id))
+        query = select(Item).order_by(desc(Item.id))
 
         # Filter by list_tag
         if list_tag == "khatabook":
@@ -2700,28 +2868,40 @@ def list_items(
         if search:
             query = query.filter(Item.name.ilike(f"%{search.strip()}%"))
 
-        items = query.all()
-        items_data = []
+        # Groups and payment counts for all listed items in one query each
+        item_ids = query.with_only_columns(Item.uuid).order_by(None)
+        groups_query = (
+            select(ItemGroupMap.item_id, ItemGroups.uuid, ItemGroups.item_groups)
+            .join(ItemGroups, ItemGroupMap.item_group_id == ItemGroups.uuid)
+            .filter(
+                ItemGroupMap.item_id.in_(item_ids),
+                ItemGroupMap.is_deleted == False,
+                ItemGroups.is_deleted == False
+            )
+        )
+        counts_query = (
+            select(PaymentItem.item_id, func.count(PaymentItem.id))
+            .filter(PaymentItem.item_id.in_(item_ids))
+            .group_by(PaymentItem.item_id)
+        )
 
-        for item in items:
-            # Get associated item groups
-            mappings = db.query(ItemGroupMap, ItemGroups).join(ItemGroups, ItemGroupMap.item_group_id == ItemGroups.uuid)\
-                .filter(
-                    ItemGroupMap.item_id == item.uuid,
-                    ItemGroupMap.is_deleted == False,
-                    ItemGroups.is_deleted == False
-                ).all()
-
-            associated_groups = [
-                {
-                    "group_id": str(group.uuid),
-                    "group_name": group.item_groups
-                } for _, group in mappings
-            ] if mappings else None
+        items, group_rows, count_rows = await run_concurrently(
+            db,
+            lambda session: session.execute(query).scalars().all(),
+            lambda session: session.execute(groups_query).all(),
+            lambda session: session.execute(counts_query).all(),
+        )
 
-            # get payment count
-            payment_count = db.query(func.count(PaymentItem.id)).filter(PaymentItem.item_id == item.uuid).scalar() or 0
+        groups_by_item = defaultdict(list)
+        for item_id, group_uuid, group_name in group_rows:
+            groups_by_item[item_id].append({
+                "group_id": str(group_uuid),
+                "group_name": group_name
+            })
+        payment_counts = dict(count_rows)
 
+        items_data = []
+        for item in items:
             items_data.append({
                 "uuid": str(item.uuid),
                 "name": item.name,
@@ -2729,15 +2909,15 @@ def list_items(
                 "list_tag": item.list_tag,
                 "has_additional_info": item.has_additional_info,
                 "created_at": item.created_at,
-                "associated_groups": associated_groups,
-                "payment_count": payment_count
+                "associated_groups": groups_by_item.get(item.uuid) or None,
+                "payment_count": payment_counts.get(item.uuid, 0)
             })
 
-        return PaymentServiceResponse(
-            data=items_data,
-            message="Filtered items fetched successfully.",
-            status_code=200
-        ).model_dump()
+        return {
+            "data": items_data,
+            "message": "Filtered items fetched successfully.",
+            "status_code": 200
+        }
 
     except Exception as e:
         return PaymentServiceResponse(
@@ -2747,6 +2927,20 @@ def list_items(
         ).model_dump()
 
 
+@payment_router.get("/items", tags=["Items"], status_code=200)
+@replica_reads
+async def list_items(
+    list_tag: Optional[str] = None,
+    category: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    etag: Optional[str] = Depends(list_etag(ITEM_LIST_TABLES, per_user=False))
+):
+    envelope = await collect_items(db, list_tag=list_tag, category=category, search=search)
+    if envelope["status_code"] != 200:
+        return envelope
+    return fast_response(**envelope, headers=etag_headers(etag))
+
 
 @payment_router.put("/items/{item_uuid}", tags=["Items"], status_code=200)
 def update_item(
@@ -2831,6 +3025,8 @@ def delete_item(item_uuid: UUID, db: Session = Depends(get_db)):
             ).model_dump()
 
         db.delete(item)
+        # Let delta sync clients drop their copy
+        db.add(SyncTombstone(entity=constants.SYNC_ENTITY_ITEM, entity_uuid=item_uuid))
         db.commit()
 
         return PaymentServiceResponse(
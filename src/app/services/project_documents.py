@@ -0,0 +1,137 @@
+"""
+Every document attached to a project, as one ZIP.
+
+``GET /projects/{project_id}/documents.zip`` (see project_service.py) bundles
+the project's PO documents, invoice files, payment receipts (including the
+approval uploads) and khatabook photos for auditors. The archive is laid out
+by type and month::
+
+    purchase_orders/2025-03/2025-03-04_PO_4411.pdf
+    invoices/2025-03/2025-03-18_INV_0042.pdf
+    payments/2025-03/2025-03-20_payment_1a2b3c4d_15000.jpg
+    khatabook/2025-04/2025-04-02_khatabook_5e6f7a8b_1200.jpg
+    manifest.csv
+
+``manifest.csv`` lists every referenced file with its record and whether it
+was found on disk. The database is only read up front, as a list of paths;
+the ZIP itself is streamed by ``stream_zip``.
+"""
+
+import csv
+import io
+import os
+import re
+from datetime import datetime
+from typing import Iterator, List, NamedTuple
+
+from sqlalchemy.orm import Session
+from src.app.database.models import (
+    Invoice,
+    Khatabook,
+    KhatabookFile,
+    Payment,
+    PaymentFile,
+    ProjectPO,
+)
+from src.app.services.khatabook_service import khatabook_served_path
+from src.app.utils.zip_stream import ZipSource
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class ProjectDocument(NamedTuple):
+    kind: str
+    date: datetime
+    label: str
+    path: str
+    reference: str
+
+
+def _safe(text) -> str:
+    return _UNSAFE.sub("_", str(text)).strip("_") or "file"
+
+
+def _amount(amount) -> str:
+    return f"{amount:g}" if amount is not None else "0"
+
+
+def collect_project_documents(db: Session, project_id) -> List[ProjectDocument]:
+    """The project's non-deleted attachments, oldest first within each type."""
+    documents = []
+
+    pos = db.query(ProjectPO.uuid, ProjectPO.po_number, ProjectPO.created_at, ProjectPO.file_path).filter(
+        ProjectPO.project_id == project_id,
+        ProjectPO.is_deleted.is_(False),
+        ProjectPO.file_path.isnot(None),
+    ).order_by(ProjectPO.created_at)
+    for uuid, po_number, created_at, file_path in pos:
+        documents.append(ProjectDocument(
+            "purchase_orders", created_at, f"PO_{po_number or str(uuid)[:8]}", file_path, f"po {uuid}"
+        ))
+
+    invoices = db.query(Invoice.uuid, Invoice.invoice_number, Invoice.created_at, Invoice.file_path).filter(
+        Invoice.project_id == project_id,
+        Invoice.is_deleted.is_(False),
+        Invoice.file_path.isnot(None),
+    ).order_by(Invoice.created_at)
+    for uuid, invoice_number, created_at, file_path in invoices:
+        documents.append(ProjectDocument(
+            "invoices", created_at, f"INV_{invoice_number or str(uuid)[:8]}", file_path, f"invoice {uuid}"
+        ))
+
+    payment_files = db.query(
+        Payment.uuid, Payment.amount, Payment.created_at, PaymentFile.is_approval_upload, PaymentFile.file_path
+    ).join(PaymentFile, PaymentFile.payment_id == Payment.uuid).filter(
+        Payment.project_id == project_id,
+        Payment.is_deleted.is_(False),
+        PaymentFile.is_deleted.is_(False),
+    ).order_by(Payment.created_at, PaymentFile.id)
+    for uuid, amount, created_at, is_approval_upload, file_path in payment_files:
+        label = f"payment_{str(uuid)[:8]}_{_amount(amount)}"
+        if is_approval_upload:
+            label += "_approval"
+        documents.append(ProjectDocument("payments", created_at, label, file_path, f"payment {uuid}"))
+
+    khatabook_files = db.query(
+        Khatabook.uuid, Khatabook.amount, Khatabook.expense_date, Khatabook.created_at, KhatabookFile.file_path
+    ).join(KhatabookFile, KhatabookFile.khatabook_id == Khatabook.uuid).filter(
+        Khatabook.project_id == project_id,
+        Khatabook.is_deleted.is_(False),
+        KhatabookFile.is_deleted.is_(False),
+    ).order_by(Khatabook.created_at, Khatabook.id, KhatabookFile.id)
+    for uuid, amount, expense_date, created_at, file_path in khatabook_files:
+        documents.append(ProjectDocument(
+            "khatabook",
+            expense_date or created_at,
+            f"khatabook_{str(uuid)[:8]}_{_amount(amount)}",
+            khatabook_served_path(file_path),
+            f"khatabook {uuid}",
+        ))
+
+    return documents
+
+
+def document_sources(documents: List[ProjectDocument]) -> Iterator[ZipSource]:
+    """ZIP entries for ``documents``, followed by ``manifest.csv``."""
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(["type", "date", "record", "file", "status"])
+    used = set()
+
+    for document in documents:
+        ext = os.path.splitext(document.path)[1].lower()
+        base = f"{document.kind}/{document.date:%Y-%m}/{document.date:%Y-%m-%d}_{_safe(document.label)}"
+        arcname = f"{base}{ext}"
+        copy = 2
+        while arcname in used:
+            arcname = f"{base}_{copy}{ext}"
+            copy += 1
+
+        if not os.path.isfile(document.path):
+            writer.writerow([document.kind, f"{document.date:%Y-%m-%d}", document.reference, document.path, "missing"])
+            continue
+        used.add(arcname)
+        writer.writerow([document.kind, f"{document.date:%Y-%m-%d}", document.reference, arcname, "included"])
+        yield ZipSource(arcname=arcname, modified=document.date, path=document.path)
+
+    yield ZipSource(arcname="manifest.csv", modified=datetime.now(), data=manifest.getvalue().encode())
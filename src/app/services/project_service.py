@@ -1,14 +1,18 @@
-import os
+import re
 from src.app.utils.logging_config import get_logger
 import json
 from uuid import UUID, uuid4
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query, Security
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from decimal import Decimal
 
-from src.app.database.database import get_db
+from src.app.database.database import get_async_db, get_db, settings
+from src.app.database.replica import replica_reads
 from src.app.database.models import (
     Log,
     Project,
@@ -43,7 +47,13 @@ from src.app.schemas.project_service_schemas import (
     CompanyInfoUpdate
 )
 from src.app.services.location_service import LocationService
-from src.app.services.auth_service import get_current_user
+from src.app.services.project_documents import collect_project_documents, document_sources
+from src.app.services.auth_service import bearer_scheme, get_current_user, get_current_user_async
+from src.app.utils.responses import fast_response
+from src.app.utils.uploads import save_upload, upload_size_error
+from src.app.utils.conditional_get import etag_headers, list_etag
+from src.app.utils.zip_stream import stream_zip
+from src.app.database.change_counters import PROJECT_LIST_TABLES
 from datetime import datetime, timedelta
 
 # Initialize logger
@@ -543,18 +553,9 @@ def create_project(
 #             message="An error occurred while fetching project details."
 #         ).model_dump()
 
-@project_router.get(
-    "",
-    status_code=status.HTTP_200_OK,
-    tags=["Projects"],
-    description="Fetch all projects visible to the current user along with PO and item expense details."
-)
-def list_all_projects(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+def build_projects_list(db: Session, current_user: User) -> List[dict]:
     """
-    Fetch all projects visible to the current user.
+    Builds the project list visible to the current user.
 
     • Super-Admin / Admin / Accountant → every non-deleted project
     • Everyone else → only projects they're mapped to (ProjectUserMap)
@@ -565,133 +566,156 @@ def list_all_projects(
     - List of all POs with metadata
     - Total PO amount per project
     """
-    try:
-        if current_user.role in [UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value, UserRole.ACCOUNTANT.value]:
-            projects = db.query(Project).filter(Project.is_deleted.is_(False)).order_by(Project.id.desc()).all()
-        else:
-            projects = (
-                db.query(Project)
-                .join(ProjectUserMap, Project.uuid == ProjectUserMap.project_id)
-                .filter(
-                    Project.is_deleted.is_(False),
-                    ProjectUserMap.user_id == current_user.uuid,
-                )
-                .order_by(Project.id.desc())
-                .all()
+    if current_user.role in [UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value, UserRole.ACCOUNTANT.value]:
+        projects = db.query(Project).filter(Project.is_deleted.is_(False)).order_by(Project.id.desc()).all()
+    else:
+        projects = (
+            db.query(Project)
+            .join(ProjectUserMap, Project.uuid == ProjectUserMap.project_id)
+            .filter(
+                Project.is_deleted.is_(False),
+                ProjectUserMap.user_id == current_user.uuid,
             )
+            .order_by(Project.id.desc())
+            .all()
+        )
 
-        projects_response_data = []
+    projects_response_data = []
 
-        for project in projects:
-            estimated_balance = project.estimated_balance or 0.0
-            actual_balance = project.actual_balance or 0.0
+    for project in projects:
+        estimated_balance = project.estimated_balance or 0.0
+        actual_balance = project.actual_balance or 0.0
 
-            # Item logic - use subquery to handle potential duplicates
-            subquery = (
-                db.query(
-                    ProjectItemMap.project_id,
-                    ProjectItemMap.item_id,
-                    func.max(ProjectItemMap.id).label('max_id')
-                )
-                .filter(ProjectItemMap.project_id == project.uuid)
-                .group_by(ProjectItemMap.project_id, ProjectItemMap.item_id)
-                .subquery()
+        # Item logic - use subquery to handle potential duplicates
+        subquery = (
+            db.query(
+                ProjectItemMap.project_id,
+                ProjectItemMap.item_id,
+                func.max(ProjectItemMap.id).label('max_id')
             )
+            .filter(ProjectItemMap.project_id == project.uuid)
+            .group_by(ProjectItemMap.project_id, ProjectItemMap.item_id)
+            .subquery()
+        )
 
-            project_items = (
-                db.query(ProjectItemMap, Item)
-                .join(subquery, ProjectItemMap.id == subquery.c.max_id)
-                .join(Item, ProjectItemMap.item_id == Item.uuid)
-                .all()
-            )
+        project_items = (
+            db.query(ProjectItemMap, Item)
+            .join(subquery, ProjectItemMap.id == subquery.c.max_id)
+            .join(Item, ProjectItemMap.item_id == Item.uuid)
+            .all()
+        )
 
-            items_count = len(project_items)
-            exceeding_items = []
-
-            for project_item, item in project_items:
-                estimation = project_item.item_balance or 0.0
-                # Get current expense (sum of transferred payments for this item)
-                # Use a more direct approach to get the sum of payment amounts
-                current_expense = (
-                    db.query(func.sum(Payment.amount))
-                    .join(PaymentItem, Payment.uuid == PaymentItem.payment_id)
-                    .filter(
-                        PaymentItem.item_id == item.uuid,
-                        Payment.project_id == project.uuid,
-                        Payment.status == 'transferred',
-                        Payment.is_deleted.is_(False),
-                        PaymentItem.is_deleted.is_(False)
-                    )
-                    .scalar() or 0.0
-                )
-                if current_expense > estimation:
-                    exceeding_items.append({
-                        "item_name": item.name,
-                        "estimation": estimation,
-                        "current_expense": current_expense
-                    })
-
-            # PO list and total value
-            pos_list = []
-            total_po_amount = 0.0
-            total_po_paid = 0.0
-
-            for po in project.project_pos:
-                if po.is_deleted:
-                    continue
-
-                paid_amount = (
-                    db.query(func.sum(Invoice.total_paid_amount))
-                    .join(ProjectPO, Invoice.project_po_id == ProjectPO.uuid)
-                    .filter(
-                        Invoice.project_po_id == po.uuid, 
-                        Invoice.is_deleted.is_(False), 
-                        # Invoice.status == 'paid',
-                        Invoice.payment_status.in_(["partially_paid", "fully_paid"])
-                    )
-                    .scalar() or 0.0
+        items_count = len(project_items)
+        exceeding_items = []
+
+        for project_item, item in project_items:
+            estimation = project_item.item_balance or 0.0
+            # Get current expense (sum of transferred payments for this item)
+            # Use a more direct approach to get the sum of payment amounts
+            current_expense = (
+                db.query(func.sum(Payment.amount))
+                .join(PaymentItem, Payment.uuid == PaymentItem.payment_id)
+                .filter(
+                    PaymentItem.item_id == item.uuid,
+                    Payment.project_id == project.uuid,
+                    Payment.status == 'transferred',
+                    Payment.is_deleted.is_(False),
+                    PaymentItem.is_deleted.is_(False)
                 )
-                total_po_paid += paid_amount
-
-                creator_name = db.query(User.name).filter(User.uuid == po.created_by).scalar()
-                pos_list.append({
-                    "uuid": str(po.uuid),
-                    "po_number": po.po_number,
-                    "client_name": po.client_name,
-                    "amount": po.amount,
-                    "description": po.description,
-                    "po_date": po.po_date.strftime("%Y-%m-%d") if po.po_date else None,
-                    "file_path": constants.HOST_URL + "/" + po.file_path if po.file_path else None,
-                    "created_by": creator_name or "Unknown",
-                    "created_at": po.created_at.strftime("%Y-%m-%d %H:%M:%S") if po.created_at else None
+                .scalar() or 0.0
+            )
+            if current_expense > estimation:
+                exceeding_items.append({
+                    "item_name": item.name,
+                    "estimation": estimation,
+                    "current_expense": current_expense
                 })
-                total_po_amount += po.amount or 0.0
 
-            projects_response_data.append({
-                "uuid": str(project.uuid),
-                "name": project.name,
-                "description": project.description,
-                "location": project.location,
-                "start_date": project.start_date,
-                "end_date": project.end_date,
-                "estimated_balance": estimated_balance,
-                "actual_balance": actual_balance,
-                "created_at": project.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "items_count": items_count,
-                "exceeding_items": {
-                    "count": len(exceeding_items),
-                    "items": exceeding_items
-                },
-                "total_po_amount": total_po_amount,
-                "total_po_paid": total_po_paid,
-                "pos": pos_list
+        # PO list and total value
+        pos_list = []
+        total_po_amount = 0.0
+        total_po_paid = 0.0
+
+        for po in project.project_pos:
+            if po.is_deleted:
+                continue
+
+            paid_amount = (
+                db.query(func.sum(Invoice.total_paid_amount))
+                .join(ProjectPO, Invoice.project_po_id == ProjectPO.uuid)
+                .filter(
+                    Invoice.project_po_id == po.uuid, 
+                    Invoice.is_deleted.is_(False), 
+                    # Invoice.status == 'paid',
+                    Invoice.payment_status.in_(["partially_paid", "fully_paid"])
+                )
+                .scalar() or 0.0
+            )
+            total_po_paid += paid_amount
+
+            creator_name = db.query(User.name).filter(User.uuid == po.created_by).scalar()
+            pos_list.append({
+                "uuid": str(po.uuid),
+                "po_number": po.po_number,
+                "client_name": po.client_name,
+                "amount": po.amount,
+                "description": po.description,
+                "po_date": po.po_date.strftime("%Y-%m-%d") if po.po_date else None,
+                "file_path": constants.HOST_URL + "/" + po.file_path if po.file_path else None,
+                "created_by": creator_name or "Unknown",
+                "created_at": po.created_at.strftime("%Y-%m-%d %H:%M:%S") if po.created_at else None
             })
+            total_po_amount += po.amount or 0.0
+
+        projects_response_data.append({
+            "uuid": str(project.uuid),
+            "name": project.name,
+            "description": project.description,
+            "location": project.location,
+            "start_date": project.start_date,
+            "end_date": project.end_date,
+            "estimated_balance": estimated_balance,
+            "actual_balance": actual_balance,
+            "created_at": project.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "items_count": items_count,
+            "exceeding_items": {
+                "count": len(exceeding_items),
+                "items": exceeding_items
+            },
+            "total_po_amount": total_po_amount,
+            "total_po_paid": total_po_paid,
+            "pos": pos_list
+        })
 
-        return ProjectServiceResponse(
+    return projects_response_data
+
+
+@project_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    tags=["Projects"],
+    description="Fetch all projects visible to the current user along with PO and item expense details."
+)
+@replica_reads
+async def list_all_projects(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: Optional[str] = Depends(list_etag(PROJECT_LIST_TABLES)),
+):
+    """
+    Fetch all projects visible to the current user.
+    See build_projects_list for the response contents.
+    """
+    try:
+        projects_response_data = await db.run_sync(
+            lambda session: build_projects_list(session, current_user)
+        )
+
+        return fast_response(
             data=projects_response_data,
             message="Projects fetched successfully.",
-            status_code=200
-        ).model_dump()
+            headers=etag_headers(etag)
+        )
 
     except Exception as e:
         logger.error(f"Error in list_all_projects API: {str(e)}")
@@ -1209,6 +1233,14 @@ def add_project_po(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    size_error = upload_size_error([po_document])
+    if size_error:
+        return ProjectServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         po_request_data = json.loads(po_data)
         amount = po_request_data.get("amount")
@@ -1273,13 +1305,7 @@ def add_project_po(
         # Save file if provided
         file_path = None
         if po_document:
-            ext = os.path.splitext(po_document.filename)[1]
-            filename = f"PO_{str(uuid4())}{ext}"
-            upload_dir = "uploads/po_docs"
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                buffer.write(po_document.file.read())
+            file_path = save_upload(po_document, "uploads/po_docs", prefix="PO_").path
 
         # Create main PO
         new_po = ProjectPO(
@@ -1350,6 +1376,65 @@ def add_project_po(
         ).model_dump()
 
 
+@project_router.get(
+    "/{project_id}/documents.zip",
+    tags=["Projects"],
+    description="Download every PO, invoice, payment and khatabook file of a project as one ZIP"
+)
+def download_project_documents(
+    project_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
+):
+    """
+    Streams a ZIP of the project's documents, organised by type and month,
+    with a manifest.csv; see project_documents.py. Admins and accountants only.
+
+    Authentication runs on the function-scoped session so no request-scoped
+    session holds a connection while the ZIP streams.
+    """
+    current_user = get_current_user(db=db, credentials=credentials)
+    if not isinstance(current_user, User):
+        return current_user
+    try:
+        if current_user.role not in [
+            UserRole.SUPER_ADMIN.value, UserRole.ADMIN.value, UserRole.ACCOUNTANT.value
+        ]:
+            return ProjectServiceResponse(
+                data=None,
+                status_code=403,
+                message="Not authorized to download project documents"
+            ).model_dump()
+
+        project = db.query(Project).filter(
+            Project.uuid == project_id,
+            Project.is_deleted.is_(False)
+        ).first()
+        if not project:
+            return ProjectServiceResponse(
+                data=None,
+                status_code=404,
+                message="Project not found"
+            ).model_dump()
+
+        # Only the paths are read here; the session is closed before streaming
+        documents = collect_project_documents(db, project_id)
+        filename = re.sub(r"[^A-Za-z0-9._-]+", "_", project.name).strip("_") or "project"
+    except Exception as e:
+        logger.error(f"Error in download_project_documents API: {str(e)}")
+        return ProjectServiceResponse(
+            data=None,
+            status_code=500,
+            message="An error occurred while collecting project documents"
+        ).model_dump()
+
+    return StreamingResponse(
+        stream_zip(document_sources(documents), read_ahead=settings.DOCUMENTS_ZIP_READ_AHEAD),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}_documents.zip"'},
+    )
+
+
 @project_router.get(
     "/{project_id}/pos",
     tags=["Project POs"],
@@ -1811,6 +1896,14 @@ def create_company_info(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
+    size_error = upload_size_error([logo_photo_file])
+    if size_error:
+        return ProjectServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         # Role check
         user_role = getattr(current_user, "role", None) or current_user.get("role")
@@ -1834,13 +1927,7 @@ def create_company_info(
         # Save logo file if present
         file_path = None
         if logo_photo_file:
-            ext = os.path.splitext(logo_photo_file.filename)[1]
-            filename = f"logo_{str(uuid4())}{ext}"
-            upload_dir = "uploads/company_logos"
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                buffer.write(logo_photo_file.file.read())
+            file_path = save_upload(logo_photo_file, "uploads/company_logos", prefix="logo_").path
 
         # Create CompanyInfo
         company = CompanyInfo(
@@ -1988,6 +2075,14 @@ def update_company_info(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
+    size_error = upload_size_error([logo_photo_file])
+    if size_error:
+        return ProjectServiceResponse(
+            data=None,
+            status_code=413,
+            message=size_error
+        ).model_dump()
+
     try:
         # Role check
         user_role = getattr(current_user, "role", None) or current_user.get("role")
@@ -2019,14 +2114,8 @@ def update_company_info(
 
         # Save new logo if provided
         if logo_photo_file:
-            upload_dir = "uploads/company_logos"
-            os.makedirs(upload_dir, exist_ok=True)
-            ext = os.path.splitext(logo_photo_file.filename)[1]
-            filename = f"logo_{str(uuid4())}{ext}"
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                buffer.write(logo_photo_file.file.read())
-            company.logo_photo_url = file_path  # just store relative path
+            stored = save_upload(logo_photo_file, "uploads/company_logos", prefix="logo_")
+            company.logo_photo_url = stored.path  # just store relative path
 
         # Update fields if present
         if payload.years_of_experience is not None:
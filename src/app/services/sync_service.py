@@ -0,0 +1,189 @@
+"""
+Delta sync for the mobile app.
+
+``GET /sync?since=<watermark>`` returns, per entity, the records created or
+updated after the watermark and the uuids deleted after it (soft deletes via
+``is_deleted``, plus tombstones for the hard-deleted khatabook entries and
+items), together with a new watermark to send next time. Without ``since`` it
+returns a full snapshot.
+
+The new watermark lags the database clock by ``WATERMARK_OVERLAP`` so rows
+written by transactions still in flight when the sync ran (their
+``updated_at`` is their start time) are picked up by the next sync. Clients
+upsert by uuid, so the overlap only costs a few repeated records.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.app.database.database import get_async_db, run_concurrently
+from src.app.database.models import Item, Khatabook, Payment, Person, SyncTombstone, User
+from src.app.schemas import constants
+from src.app.schemas.payment_service_schemas import PaymentServiceResponse
+from src.app.services.auth_service import get_current_user_async
+from src.app.services.khatabook_service import format_khatabook_entry, khatabook_entries_query
+from src.app.services.payment_service import (
+    apply_role_restrictions,
+    assemble_payments_response,
+    build_main_payments_query,
+    group_query_results,
+)
+from src.app.utils.responses import fast_response
+
+sync_router = APIRouter(prefix="/sync", tags=["Sync"])
+
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+def tombstones_since(db: Session, entity: str, since: Optional[datetime]) -> List[str]:
+    """Uuids of hard-deleted rows of an entity; a full snapshot needs none."""
+    if since is None:
+        return []
+    rows = db.query(SyncTombstone.entity_uuid).filter(
+        SyncTombstone.entity == entity,
+        SyncTombstone.deleted_at > since
+    ).all()
+    return [str(row[0]) for row in rows]
+
+
+def split_changes(rows, since: Optional[datetime]):
+    """Split changed rows into live rows and uuids of soft-deleted ones."""
+    live = [row for row in rows if not row.is_deleted]
+    deleted = [str(row.uuid) for row in rows if row.is_deleted] if since is not None else []
+    return live, deleted
+
+
+def payment_changes(db: Session, current_user: User, since: Optional[datetime]) -> Dict:
+    """Payments visible to the user (apply_role_restrictions) changed since the watermark."""
+    query = db.query(Payment.uuid, Payment.is_deleted)
+    if since is None:
+        query = query.filter(Payment.is_deleted.is_(False))
+    else:
+        query = query.filter(Payment.updated_at > since)
+    rows = apply_role_restrictions(query, current_user, db).order_by(Payment.updated_at).all()
+
+    live, deleted = split_changes(rows, since)
+    records = []
+    if live:
+        main_q = build_main_payments_query(db, pending_request=False)\
+            .filter(Payment.uuid.in_([row.uuid for row in live]))
+        records = assemble_payments_response(group_query_results(main_q.all()), db, current_user)
+
+    # Payments are only ever soft-deleted, so there are no tombstones to read
+    return {"upserted": records, "deleted": deleted}
+
+
+def khatabook_changes(db: Session, current_user: User, since: Optional[datetime]) -> Dict:
+    """The user's khatabook entries changed since the watermark."""
+    query = khatabook_entries_query(db).filter(Khatabook.created_by == current_user.uuid)
+    if since is None:
+        query = query.filter(Khatabook.is_deleted.is_(False))
+    else:
+        query = query.filter(Khatabook.updated_at > since)
+
+    live, deleted = split_changes(query.order_by(Khatabook.updated_at).all(), since)
+    return {
+        "upserted": [format_khatabook_entry(entry) for entry in live],
+        "deleted": deleted + tombstones_since(db, constants.SYNC_ENTITY_KHATABOOK, since),
+    }
+
+
+def item_changes(db: Session, since: Optional[datetime]) -> Dict:
+    """Items changed since the watermark; items are hard-deleted, so only tombstones."""
+    query = db.query(Item)
+    if since is not None:
+        query = query.filter(Item.updated_at > since)
+
+    return {
+        "upserted": [
+            {
+                "uuid": str(item.uuid),
+                "name": item.name,
+                "category": item.category,
+                "list_tag": item.list_tag,
+                "has_additional_info": item.has_additional_info,
+                "created_at": item.created_at,
+            }
+            for item in query.order_by(Item.updated_at).all()
+        ],
+        "deleted": tombstones_since(db, constants.SYNC_ENTITY_ITEM, since),
+    }
+
+
+def person_changes(db: Session, current_user: User, since: Optional[datetime]) -> Dict:
+    """Persons (accounts) changed since the watermark, excluding the user's own."""
+    query = db.query(Person).filter(
+        (Person.user_id.is_(None)) | (Person.user_id != current_user.uuid)
+    )
+    if since is None:
+        query = query.filter(Person.is_deleted.is_(False))
+    else:
+        query = query.filter(Person.updated_at > since)
+
+    live, deleted = split_changes(query.order_by(Person.updated_at).all(), since)
+    return {
+        "upserted": [
+            {
+                "uuid": str(person.uuid),
+                "name": person.name,
+                "account_number": person.account_number,
+                "ifsc_code": person.ifsc_code,
+                "phone_number": person.phone_number,
+                "upi_number": person.upi_number,
+                "parent_id": str(person.parent_id) if person.parent_id else None,
+                "role": person.role,
+            }
+            for person in live
+        ],
+        # Soft deletes only, like payments
+        "deleted": deleted,
+    }
+
+
+@sync_router.get("", status_code=200)
+async def sync_changes(
+    since: Optional[datetime] = Query(None, description="Watermark returned by the previous sync; omit for a full snapshot"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    Records created, updated or deleted since the watermark, per entity,
+    scoped like the list endpoints, and the watermark for the next call.
+    """
+    if isinstance(current_user, dict):
+        return current_user
+
+    try:
+        # Taken before reading, so nothing written meanwhile can be skipped
+        now = (await db.execute(select(func.localtimestamp()))).scalar()
+        watermark = now - WATERMARK_OVERLAP
+
+        payments, khatabook, items, persons = await run_concurrently(
+            db,
+            lambda session: payment_changes(session, current_user, since),
+            lambda session: khatabook_changes(session, current_user, since),
+            lambda session: item_changes(session, since),
+            lambda session: person_changes(session, current_user, since),
+        )
+
+        return fast_response(
+            data={
+                "payments": payments,
+                "khatabook": khatabook,
+                "items": items,
+                "persons": persons,
+                "watermark": watermark.isoformat(),
+            },
+            message="Changes fetched successfully."
+        )
+
+    except Exception as e:
+        return PaymentServiceResponse(
+            data=None,
+            message=f"Error fetching changes: {str(e)}",
+            status_code=500
+        ).model_dump()
@@ -3,6 +3,7 @@ from phonenumbers import parse, is_possible_number, format_number, PhoneNumberFo
 from src.app.sms_service.schemas import ForgotPasswordOTPRequest, ForgotPasswordOTPVerify, ForgotPasswordOTPVerifyOnly, ForgotPasswordResetOnly
 from src.app.services.auth_service import get_db, AuthServiceResponse
 from src.app.database.models import User
+from src.app.utils.resilience import DependencyUnavailable
 from fastapi import HTTPException, Depends, APIRouter
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
@@ -20,6 +21,14 @@ def _e164(indian_number: int) -> str:
         raise HTTPException(status_code=400, detail="Invalid phone number")
     return format_number(p, PhoneNumberFormat.E164)
 
+
+def _sms_unavailable() -> dict:
+    return AuthServiceResponse(
+        data=None,
+        status_code=503,
+        message="SMS service is temporarily unavailable, please try again shortly"
+    ).model_dump()
+
 @sms_service_router.post("/forgot_password/request_otp", tags=["SMS Service"])
 def forgot_password_request_otp(payload: ForgotPasswordOTPRequest,
                                 db: Session = Depends(get_db)):
@@ -34,7 +43,10 @@ def forgot_password_request_otp(payload: ForgotPasswordOTPRequest,
             message="No user found with this phone number."
         ).model_dump()
 
-    send_otp(_e164(payload.phone))          # fire-and-forget
+    try:
+        send_otp(_e164(payload.phone))
+    except DependencyUnavailable:
+        return _sms_unavailable()
     return AuthServiceResponse(
         data=None,
         message="OTP sent successfully",
@@ -73,7 +85,11 @@ def forgot_password_request_otp(payload: ForgotPasswordOTPRequest,
 
 @sms_service_router.post("/forgot_password/verify_otp", tags=["SMS Service"])
 def verify_otp(payload: ForgotPasswordOTPVerifyOnly, db: Session = Depends(get_db)):
-    if not check_otp(_e164(payload.phone), payload.otp):
+    try:
+        verified = check_otp(_e164(payload.phone), payload.otp)
+    except DependencyUnavailable:
+        return _sms_unavailable()
+    if not verified:
         return AuthServiceResponse(
             data=None,
             status_code=400,
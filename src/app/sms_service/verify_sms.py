@@ -1,7 +1,9 @@
 import os
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 from typing import Literal
 from dotenv import load_dotenv
+from src.app.utils.resilience import twilio_dependency
 
 load_dotenv()
 
@@ -10,15 +12,21 @@ _auth_token = os.getenv("TWILIO_AUTH_TOKEN")
 _verify_sid = os.getenv("TWILIO_VERIFY_SERVICE_SID")
 
 
-_client = Client(_account_sid, _auth_token)
+_client = Client(
+    _account_sid,
+    _auth_token,
+    http_client=TwilioHttpClient(timeout=twilio_dependency.timeout)
+)
 
 
 def send_otp(phone_e164: str) -> str:
     """
     Kick off an SMS verification.  
     Returns Twilio’s Verification SID for logging/diagnostics.
+    Raises DependencyUnavailable when Twilio is down or slow.
     """
-    v = _client.verify.v2.services(_verify_sid).verifications.create(
+    v = twilio_dependency.call(
+        _client.verify.v2.services(_verify_sid).verifications.create,
         # WhatsApp / call are just other channels
         to=phone_e164, channel="sms"
     )
@@ -29,8 +37,10 @@ def check_otp(phone_e164: str, code: str) -> Literal[True, False]:
     """
     True  → correct code and still valid  
     False → wrong / expired / too many attempts
+    Raises DependencyUnavailable when Twilio is down or slow.
     """
-    result = _client.verify.v2.services(_verify_sid).verification_checks.create(
+    result = twilio_dependency.call(
+        _client.verify.v2.services(_verify_sid).verification_checks.create,
         to=phone_e164, code=code
     )
     return result.status == "approved"
@@ -2,14 +2,18 @@
 Test configuration and fixtures for attendance and wage management module
 """
 
+import aiosqlite
 import pytest
 import os
 from datetime import datetime, date, timedelta
 from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
-from src.app.database.database import Base, get_db
+from src.app.database import database
+from src.app.database.database import AsyncBackedSession, Base, get_async_db, get_db
 from src.app.database.models import (
     User, Project, Person, ProjectUserMap,
     SelfAttendance, ProjectAttendance, ProjectDailyWage, ProjectAttendanceWage
@@ -29,6 +33,58 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+class SharedTestConnection:
+    """
+    The sqlite3 connection of ``db_session``, handed to aiosqlite so async
+    sessions see the fixture data. Commit, rollback and close are left to
+    the test transaction, which is rolled back when the test ends.
+    """
+
+    def __init__(self, dbapi_connection):
+        object.__setattr__(self, "_connection", dbapi_connection)
+        object.__setattr__(self, "_functions", set())
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+    def create_function(self, name, *args, **kwargs):
+        # Every async connection registers the same functions; SQLite refuses
+        # to while a run_concurrently session has a statement open
+        if name not in self._functions:
+            self._connection.create_function(name, *args, **kwargs)
+            self._functions.add(name)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def async_session_factory(db_session):
+    """Async sessions (aiosqlite) running inside ``db_session``'s transaction"""
+    shared_connection = SharedTestConnection(db_session.connection().connection.dbapi_connection)
+
+    async def connect():
+        return await aiosqlite.Connection(lambda: shared_connection, 64)
+
+    # TestClient runs every request on a new event loop, so connections are not pooled
+    async_engine = create_async_engine("sqlite+aiosqlite://", async_creator=connect, poolclass=NullPool)
+    return async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        sync_session_class=AsyncBackedSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
 @pytest.fixture(scope="session")
 def test_db():
     """Create test database and tables"""
@@ -52,15 +108,24 @@ def db_session(test_db):
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create test client with database dependency override"""
+def client(db_session, monkeypatch):
+    """Create test client with database dependency overrides"""
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
-    
+
+    TestingAsyncSessionLocal = async_session_factory(db_session)
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
+    # run_concurrently opens its extra sessions from AsyncSessionLocal
+    monkeypatch.setattr(database, "AsyncSessionLocal", TestingAsyncSessionLocal)
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -182,6 +247,7 @@ def test_self_attendance(db_session, test_user):
         punch_in_longitude=77.2090,
         punch_in_location_address="Test Location",
         assigned_projects='[{"uuid": "test-project-uuid", "name": "Test Project"}]',
+        status="present",
         is_deleted=False
     )
     db_session.add(attendance)
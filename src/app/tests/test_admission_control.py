@@ -0,0 +1,101 @@
+"""
+Test cases for admission control middleware
+"""
+
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.app.middleware.admission_control import (
+    ANALYTICS,
+    READ,
+    WRITE,
+    AdmissionController,
+    AdmissionControlMiddleware,
+    ConcurrencyLimiter,
+    classify_request,
+)
+
+
+class TestClassifyRequest:
+    """Test route classification"""
+
+    def test_route_classes(self):
+        """Test analytics, read and write classification"""
+        assert classify_request("GET", "/attendance/admin/analytics") == ANALYTICS
+        assert classify_request("GET", "/admin/projects/x/item-analytics") == ANALYTICS
+        assert classify_request("GET", "/khatabook/export") == ANALYTICS
+        assert classify_request("GET", "/payments") == READ
+        assert classify_request("POST", "/payments") == WRITE
+        assert classify_request("PUT", "/payments/approve") == WRITE
+
+    def test_exempt_requests(self):
+        """Test health checks, static files, file streams and preflights are not limited"""
+        assert classify_request("GET", "/healthcheck") is None
+        assert classify_request("GET", "/uploads/payments/a.jpg") is None
+        assert classify_request("GET", "/projects/3f1c/documents.zip") is None
+        assert classify_request("OPTIONS", "/payments") is None
+
+
+class TestConcurrencyLimiter:
+    """Test the limiter and its bounded queue"""
+
+    def test_rejects_when_queue_full(self):
+        """Test requests beyond limit + queue are rejected immediately"""
+        async def scenario():
+            limiter = ConcurrencyLimiter("read", limit=1, max_queue=1, queue_timeout=1.0)
+            assert await limiter.acquire() is True
+            queued = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            assert limiter.queue_depth == 1
+            assert await limiter.acquire() is False
+
+            limiter.release()
+            assert await queued is True
+            limiter.release()
+            return limiter.metrics()
+
+        metrics = asyncio.run(scenario())
+        assert metrics["active"] == 0
+        assert metrics["queue_depth"] == 0
+        assert metrics["admitted_total"] == 2
+        assert metrics["rejected_total"] == 1
+
+    def test_queue_timeout(self):
+        """Test queued requests give up after the queue timeout"""
+        async def scenario():
+            limiter = ConcurrencyLimiter("write", limit=1, max_queue=5, queue_timeout=0.01)
+            await limiter.acquire()
+            admitted = await limiter.acquire()
+            return admitted, limiter.metrics()
+
+        admitted, metrics = asyncio.run(scenario())
+        assert admitted is False
+        assert metrics["timed_out_total"] == 1
+        assert metrics["queue_depth"] == 0
+        assert metrics["active"] == 1
+
+
+class TestAdmissionControlMiddleware:
+    """Test the middleware response when saturated"""
+
+    def test_returns_503_with_retry_after(self):
+        """Test saturated classes answer 503 with Retry-After"""
+        app = FastAPI()
+
+        @app.get("/payments")
+        def list_payments():
+            return {"status_code": 200}
+
+        controller = AdmissionController(
+            limits={READ: 0}, max_queue=0, queue_timeout=0.01, retry_after=7
+        )
+        app.add_middleware(AdmissionControlMiddleware, controller=controller)
+        client = TestClient(app)
+
+        response = client.get("/payments")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "7"
+        assert response.json()["status_code"] == 503
+
+        # Classes without a limiter pass straight through
+        assert client.post("/payments").status_code == 405
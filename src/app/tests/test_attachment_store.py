@@ -0,0 +1,111 @@
+"""
+Test cases for the content-addressed attachment store
+"""
+
+import hashlib
+import io
+import os
+import time
+from uuid import uuid4
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.app.database.models import Invoice, KhatabookFile, PaymentFile
+from src.app.utils.attachment_store import (
+    blob_path,
+    reference_counts,
+    remove_unreferenced,
+    store_upload,
+)
+
+
+@pytest.fixture
+def store_cwd(tmp_path, monkeypatch):
+    """Run in an empty directory, as store paths are relative"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def reference_db():
+    """SQLite session with only the tables that reference attachments"""
+    engine = create_engine("sqlite://")
+    for model in (PaymentFile, KhatabookFile, Invoice):
+        model.__table__.create(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def make_upload(content: bytes, filename="receipt.jpg"):
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+class TestStoreUpload:
+    """Test writing uploads into the store"""
+
+    def test_sharded_by_content_hash(self, store_cwd):
+        """Test blobs are named by SHA-256 under two prefix directories"""
+        stored = store_upload(make_upload(b"receipt"))
+        sha256 = hashlib.sha256(b"receipt").hexdigest()
+        assert stored.path == f"uploads/store/{sha256[:2]}/{sha256[2:4]}/{sha256}.jpg"
+        assert stored.path == blob_path(sha256, ".jpg")
+        assert os.path.isfile(stored.path)
+
+    def test_identical_uploads_are_stored_once(self, store_cwd):
+        """Test the same content uploaded twice shares one blob"""
+        first = store_upload(make_upload(b"receipt", "a.JPG"))
+        second = store_upload(make_upload(b"receipt", "b.jpg"))
+        other = store_upload(make_upload(b"another receipt"))
+
+        assert first.path == second.path
+        assert other.path != first.path
+        blobs = [name for _, _, names in os.walk("uploads/store") for name in names]
+        assert len(blobs) == 2
+
+
+class TestReferences:
+    """Test reference counting and clean up"""
+
+    def test_counts_rows_across_tables(self, store_cwd, reference_db):
+        """Test every row pointing at a blob counts, including soft-deleted ones"""
+        shared = store_upload(make_upload(b"receipt")).path
+        reference_db.add_all([
+            PaymentFile(payment_id=uuid4(), file_path=shared),
+            PaymentFile(payment_id=uuid4(), file_path=shared, is_deleted=True),
+            KhatabookFile(khatabook_id=uuid4(), file_path=shared),
+            PaymentFile(payment_id=uuid4(), file_path="uploads/payments/legacy.jpg"),
+        ])
+        reference_db.commit()
+
+        assert reference_counts(reference_db) == {shared: 3}
+        assert reference_counts(reference_db, ["uploads/payments/legacy.jpg"]) == {
+            "uploads/payments/legacy.jpg": 1
+        }
+
+    def test_remove_unreferenced_keeps_referenced_and_recent_blobs(self, store_cwd, reference_db):
+        """Test only old blobs without references are deleted"""
+        kept = store_upload(make_upload(b"kept")).path
+        orphan = store_upload(make_upload(b"orphan")).path
+        recent = store_upload(make_upload(b"recent")).path
+        reference_db.add(PaymentFile(payment_id=uuid4(), file_path=kept))
+        reference_db.commit()
+        old = time.time() - 7200
+        for path in (kept, orphan):
+            os.utime(path, (old, old))
+
+        assert remove_unreferenced(reference_db) == [orphan]
+        assert os.path.exists(kept) and os.path.exists(recent)
+        assert not os.path.exists(orphan)
+
+    def test_reuploaded_blob_gets_a_fresh_grace_period(self, store_cwd, reference_db):
+        """Test reusing an old unreferenced blob keeps it from collection until its row commits"""
+        path = store_upload(make_upload(b"receipt")).path
+        old = time.time() - 7200
+        os.utime(path, (old, old))
+
+        assert store_upload(make_upload(b"receipt")).path == path
+
+        assert remove_unreferenced(reference_db) == []
+        assert os.path.exists(path)
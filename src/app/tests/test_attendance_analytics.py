@@ -6,7 +6,11 @@ import pytest
 from datetime import datetime, date, timedelta
 from unittest.mock import patch, MagicMock
 from uuid import uuid4, UUID
-from src.app.services.attendance_endpoints import get_user_attendance_analytics, get_admin_attendance_analytics
+from src.app.services.attendance_endpoints import (
+    get_user_attendance_analytics,
+    get_admin_attendance_analytics,
+    get_admin_attendance_analytics_batch
+)
 from src.app.database.models import User, SelfAttendance
 from src.app.schemas.auth_service_schamas import UserRole
 from src.app.utils.attendance_utils import (
@@ -413,3 +417,79 @@ class TestAttendanceAnalyticsIntegration:
 
         # Should succeed for super admin
         assert result['status_code'] == 200
+
+
+class TestAdminAttendanceAnalyticsBatch:
+    """Test cases for the batch admin attendance analytics endpoint"""
+
+    @patch('src.app.services.attendance_endpoints.load_holidays')
+    def test_batch_analytics_success(self, mock_holidays):
+        """Test every user gets every month, including months without attendance"""
+        mock_holidays.return_value = [date(2025, 3, 14)]
+        mock_admin_user = MagicMock()
+        mock_admin_user.role = UserRole.ADMIN
+        mock_admin_user.uuid = uuid4()
+
+        present_user = MagicMock(uuid=uuid4(), role="SiteEngineer")
+        present_user.name = "Eng"
+        absent_user = MagicMock(uuid=uuid4(), role="SiteEngineer")
+        absent_user.name = "Other"
+
+        users_query = MagicMock()
+        users_query.filter.return_value = users_query
+        users_query.order_by.return_value.all.return_value = [present_user, absent_user]
+        present_query = MagicMock()
+        present_query.filter.return_value.group_by.return_value.all.return_value = [
+            (present_user.uuid, datetime(2025, 3, 1), 20),
+            (present_user.uuid, datetime(2025, 4, 1), 13),
+        ]
+        mock_db = MagicMock()
+        mock_db.query.side_effect = [users_query, present_query]
+
+        result = get_admin_attendance_analytics_batch(
+            from_month="03-2025",
+            to_month="04-2025",
+            db=mock_db,
+            current_user=mock_admin_user
+        )
+
+        assert result['status_code'] == 200
+        assert result['data']['months'] == ["03-2025", "04-2025"]
+        # March 2025: 26 working days minus one holiday, April 2025: 26
+        assert result['data']['users'][0]['months'] == [
+            {"month": "03-2025", "present_days": 20, "working_days": 25, "percentage": 80,
+             "feedback": "Good Attendance Record"},
+            {"month": "04-2025", "present_days": 13, "working_days": 26, "percentage": 50,
+             "feedback": "Average Attendance Record"},
+        ]
+        assert [month['present_days'] for month in result['data']['users'][1]['months']] == [0, 0]
+        assert mock_db.query.call_count == 2
+
+    def test_batch_analytics_invalid_range(self):
+        """Test reversed and too wide month ranges are rejected"""
+        mock_admin_user = MagicMock()
+        mock_admin_user.role = UserRole.SUPER_ADMIN
+        mock_admin_user.uuid = uuid4()
+
+        result = get_admin_attendance_analytics_batch(
+            from_month="05-2025", to_month="04-2025", db=MagicMock(), current_user=mock_admin_user
+        )
+        assert result['status_code'] == 400
+
+        result = get_admin_attendance_analytics_batch(
+            from_month="01-2024", to_month="01-2025", db=MagicMock(), current_user=mock_admin_user
+        )
+        assert result['status_code'] == 400
+        assert "At most 12 months" in result['message']
+
+    def test_batch_analytics_unauthorized(self):
+        """Test batch analytics with a non-admin user"""
+        mock_user = MagicMock()
+        mock_user.role = UserRole.SITE_ENGINEER
+        mock_user.uuid = uuid4()
+
+        result = get_admin_attendance_analytics_batch(
+            from_month="03-2025", db=MagicMock(), current_user=mock_user
+        )
+
+        assert result['status_code'] == 403
@@ -0,0 +1,131 @@
+"""
+Test cases for paginated self attendance history
+"""
+
+import base64
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.app.database.models import SelfAttendance
+from src.app.services import attendance_endpoints
+from src.app.services.attendance_endpoints import (
+    decode_history_cursor,
+    encode_history_cursor,
+    summarize_self_attendance,
+)
+
+HISTORY_URL = "/attendance/attendance/self/history"
+
+
+@pytest.fixture
+def history(db_session, test_user, test_admin_user):
+    """
+    Five records of the test user, newest first as the history returns them
+    (two on one day), and one of the admin
+    """
+    def record(user, day, status, hours=None):
+        punch_in = datetime.combine(day, datetime.min.time()) + timedelta(hours=9)
+        attendance = SelfAttendance(
+            user_id=user.uuid, attendance_date=day, status=status, punch_in_time=punch_in,
+            punch_out_time=punch_in + timedelta(hours=hours) if hours is not None else None,
+        )
+        db_session.add(attendance)
+        db_session.flush()
+        return attendance
+
+    records = [
+        record(test_user, date(2025, 3, 1), "present", 8.5),
+        record(test_user, date(2025, 3, 2), "present", 8.5),
+        record(test_user, date(2025, 3, 3), "present", 8.5),
+        record(test_user, date(2025, 3, 3), "present", 4.5),
+        record(test_user, date(2025, 3, 4), "off day"),
+    ]
+    record(test_admin_user, date(2025, 3, 4), "present", 8)
+    db_session.commit()
+    return [str(attendance.uuid) for attendance in reversed(records)]
+
+
+class TestHistoryCursor:
+    """Test keyset cursors for the self attendance history"""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the record it was made from"""
+        cursor = encode_history_cursor(date(2025, 3, 1), 42)
+        assert decode_history_cursor(cursor) == (date(2025, 3, 1), 42)
+
+    def test_invalid_cursor(self):
+        """Test tampered cursors are rejected"""
+        with pytest.raises(ValueError):
+            decode_history_cursor("not-a-cursor")
+        with pytest.raises(ValueError):
+            decode_history_cursor(base64.urlsafe_b64encode(b"2025-13-01|42").decode())
+
+
+class TestHistorySummary:
+    """Test the server-side history summary"""
+
+    def test_summary(self):
+        """Test status counts include every status and hours are summed"""
+        query = MagicMock()
+        query.with_entities.return_value.group_by.return_value.all.return_value = [
+            ("present", 6, Decimal("51.04")),
+            ("approved", 2, Decimal("16")),
+            ("absent", 1, None),
+        ]
+
+        summary = summarize_self_attendance(query)
+
+        assert summary == {
+            "total_records": 9,
+            "status_counts": {"absent": 1, "present": 6, "off day": 0, "approved": 2},
+            "total_hours": 67.0,
+        }
+
+
+class TestHistoryEndpoint:
+    """Test /attendance/self/history against the database"""
+
+    def get(self, client, headers, **params):
+        body = client.get(HISTORY_URL, params=params, headers=headers).json()
+        assert body["status_code"] == 200, body["message"]
+        return body
+
+    def test_pages_and_summary(self, client, auth_headers, history):
+        """Test keyset pages cover every record once, with hours and summary from SQL"""
+        pages = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "summary": True}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.get(client, auth_headers, **params)["data"]
+            pages.append(data)
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        assert [[row["uuid"] for row in page["attendances"]] for page in pages] == [
+            history[0:2], history[2:4], history[4:5]
+        ]
+        hours = [row["total_hours"] for page in pages for row in page["attendances"]]
+        assert hours == [None, "4.5", "8.5", "8.5", "8.5"]
+        assert pages[0]["summary"] == pages[-1]["summary"] == {
+            "total_records": 5,
+            "status_counts": {"present": 4, "absent": 0, "off day": 1},
+            "total_hours": 30.0,
+        }
+
+    def test_admin_company_history_is_bounded(self, client, admin_auth_headers, test_user,
+                                              history, monkeypatch):
+        """Test an admin listing every user without paging gets only the latest records"""
+        monkeypatch.setattr(attendance_endpoints, "SELF_HISTORY_MAX_PAGE_SIZE", 2)
+
+        body = self.get(client, admin_auth_headers)
+        assert len(body["data"]) == 2
+        assert "limit and cursor" in body["message"]
+
+        body = self.get(client, admin_auth_headers, user_uuid=str(test_user.uuid))
+        assert [row["uuid"] for row in body["data"]] == history
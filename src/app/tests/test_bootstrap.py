@@ -0,0 +1,92 @@
+"""
+Test cases for the home-screen bootstrap endpoint
+"""
+
+from datetime import date, timedelta
+
+from src.app.database.change_counters import (
+    ATTENDANCE_ANALYTICS_TABLES,
+    ITEM_LIST_TABLES,
+    bump_change_counters,
+)
+from src.app.services import bootstrap_service
+from src.app.services.bootstrap_service import section_etag
+
+
+def fetch(client, headers, sections, if_none_match=None):
+    if if_none_match:
+        headers = {**headers, "If-None-Match": if_none_match}
+    response = client.get("/bootstrap", params={"sections": sections}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestBootstrapSections:
+    """Test which sections are returned"""
+
+    def test_only_requested_sections(self, client, auth_headers):
+        """Test ?sections= limits the response and each section keeps its envelope"""
+        body = fetch(client, auth_headers, ["user", "items"])
+
+        assert body["status_code"] == 200
+        assert set(body["data"]) == {"user", "items"}
+        assert body["data"]["user"]["status_code"] == 200
+        items = body["data"]["items"]
+        assert items["status_code"] == 200
+        assert items["not_modified"] is False
+        assert items["etag"].startswith('W/"')
+
+    def test_unknown_section(self, client, auth_headers):
+        """Test unknown section names are rejected"""
+        body = fetch(client, auth_headers, ["user", "weather"])
+
+        assert body["status_code"] == 400
+        assert "weather" in body["message"]
+
+    def test_attendance_status_never_cached(self, client, auth_headers):
+        """Test the clock-dependent attendance status carries no ETag"""
+        body = fetch(client, auth_headers, ["attendance_status"])
+
+        section = body["data"]["attendance_status"]
+        assert section["status_code"] == 200
+        assert section["etag"] is None
+        assert fetch(client, auth_headers, ["attendance_status"], "*")["data"][
+            "attendance_status"
+        ]["not_modified"] is False
+
+
+class TestBootstrapEtags:
+    """Test per-section If-None-Match handling"""
+
+    def test_not_modified_until_tables_change(self, client, db_session, auth_headers):
+        """Test a section is skipped while its ETag matches and refetched after a bump"""
+        first = fetch(client, auth_headers, ["user", "items"])["data"]
+        held = f'{first["user"]["etag"]}, {first["items"]["etag"]}'
+
+        second = fetch(client, auth_headers, ["user", "items"], held)["data"]
+        assert second["user"] == {"etag": first["user"]["etag"], "not_modified": True}
+        assert second["items"] == {"etag": first["items"]["etag"], "not_modified": True}
+
+        bump_change_counters(db_session.connection(), ["item_groups"])
+
+        third = fetch(client, auth_headers, ["user", "items"], held)["data"]
+        assert third["user"]["not_modified"] is True
+        assert third["items"]["not_modified"] is False
+        assert third["items"]["status_code"] == 200
+        assert third["items"]["etag"] != first["items"]["etag"]
+
+    def test_analytics_etag_changes_with_the_date(self, test_user, monkeypatch):
+        """Test this month's analytics are refetched on a new day, other sections are not"""
+        versions = dict.fromkeys(ATTENDANCE_ANALYTICS_TABLES + ITEM_LIST_TABLES, 0)
+        analytics = section_etag("attendance_analytics", versions, test_user)
+        items = section_etag("items", versions, test_user)
+
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=1)
+
+        monkeypatch.setattr(bootstrap_service, "date", Tomorrow)
+
+        assert section_etag("attendance_analytics", versions, test_user) != analytics
+        assert section_etag("items", versions, test_user) == items
@@ -0,0 +1,148 @@
+"""
+Test cases for bulk payment approval and transfer
+"""
+
+import pytest
+
+from src.app.database.models import (
+    BalanceDetail,
+    Item,
+    Khatabook,
+    KhatabookBalance,
+    Payment,
+    PaymentItem,
+    PaymentStatusHistory,
+    Person,
+    Project,
+    ProjectBalance,
+    ProjectItemMap,
+    User,
+)
+from src.app.schemas.payment_service_schemas import BulkApprovePaymentsRequest
+from src.app.services.payment_service import approve_payments_bulk
+
+
+@pytest.fixture
+def setup(db_session):
+    """Users, a project with one mapped item, a payee and a bank"""
+    accountant = User(name="Accounts", phone=9000000001, password_hash="x", role="Accountant")
+    admin = User(name="Admin", phone=9000000002, password_hash="x", role="Admin")
+    engineer = User(name="Eng", phone=9000000003, password_hash="x", role="SiteEngineer")
+    project = Project(name="Tower", actual_balance=1000.0)
+    item = Item(name="Cement")
+    person = Person(name="Vendor", account_number="123", ifsc_code="IFSC0000001", phone_number="9000000004")
+    bank = BalanceDetail(name="Main", balance=10000.0)
+    db_session.add_all([accountant, admin, engineer, project, item, person, bank])
+    db_session.flush()
+    item_map = ProjectItemMap(project_id=project.uuid, item_id=item.uuid, item_balance=1000.0)
+    db_session.add(item_map)
+    db_session.commit()
+    return {
+        "accountant": accountant, "admin": admin, "engineer": engineer, "project": project,
+        "item": item, "person": person, "bank": bank, "item_map": item_map,
+    }
+
+
+def add_payment(db_session, setup, amount, status, self_payment=False, with_item=False):
+    payment = Payment(
+        amount=amount, project_id=setup["project"].uuid, created_by=setup["engineer"].uuid,
+        status=status, person=setup["person"].uuid, latitude=0, longitude=0, self_payment=self_payment,
+    )
+    db_session.add(payment)
+    db_session.flush()
+    if with_item:
+        db_session.add(PaymentItem(payment_id=payment.uuid, item_id=setup["item"].uuid))
+    db_session.commit()
+    return payment
+
+
+def transfer(db_session, setup, payments):
+    return approve_payments_bulk(
+        BulkApprovePaymentsRequest(
+            payment_ids=[payment.uuid for payment in payments], bank_uuid=setup["bank"].uuid
+        ),
+        db=db_session,
+        current_user=setup["accountant"],
+    )
+
+
+def outcomes(result):
+    return [row["status"] for row in result["data"]["results"]]
+
+
+class TestBulkTransfer:
+    """Test bulk transfers and their balance side effects"""
+
+    def test_skips_transferred_and_rejects_khatabook_payments(self, db_session, setup):
+        """Test already transferred payments are not deducted again and khatabook ones are refused"""
+        approved = add_payment(db_session, setup, 100.0, "approved")
+        transferred = add_payment(db_session, setup, 200.0, "transferred")
+        khatabook = add_payment(db_session, setup, 300.0, "khatabook")
+
+        result = transfer(db_session, setup, [approved, transferred, khatabook])
+
+        assert result["status_code"] == 200
+        assert outcomes(result) == ["updated", "skipped", "rejected"]
+        db_session.expire_all()
+        assert db_session.get(BalanceDetail, setup["bank"].id).balance == 9900.0
+        assert db_session.get(Payment, khatabook.id).status == "khatabook"
+        assert db_session.query(PaymentStatusHistory).count() == 1
+
+    def test_balance_deltas(self, db_session, setup):
+        """Test the bank, project, item and khatabook balances move by the transferred amounts"""
+        with_item = add_payment(db_session, setup, 200.0, "approved", with_item=True)
+        self_payment = add_payment(db_session, setup, 300.0, "approved", self_payment=True)
+
+        result = transfer(db_session, setup, [with_item, self_payment])
+
+        assert outcomes(result) == ["updated", "updated"]
+        db_session.expire_all()
+        assert db_session.get(BalanceDetail, setup["bank"].id).balance == 9500.0
+        assert db_session.get(Project, setup["project"].id).actual_balance == 1500.0
+        assert db_session.query(ProjectBalance).count() == 2
+        assert db_session.get(ProjectItemMap, setup["item_map"].id).item_balance == 800.0
+        balance = db_session.query(KhatabookBalance).filter_by(user_uuid=setup["engineer"].uuid).one()
+        assert balance.balance == 300.0
+        payments = db_session.query(Payment).order_by(Payment.id)
+        assert [payment.status for payment in payments] == ["transferred", "transferred"]
+
+    def test_running_balance_across_self_payments(self, db_session, setup):
+        """Test several self payments of one user continue one running balance, also in the next transfer"""
+        db_session.add(Khatabook(
+            amount=50.0, person_id=setup["person"].uuid, created_by=setup["engineer"].uuid,
+            balance_after_entry=100.0, entry_type="Debit",
+        ))
+        db_session.commit()
+        first = add_payment(db_session, setup, 200.0, "approved", self_payment=True)
+        second = add_payment(db_session, setup, 300.0, "approved", self_payment=True)
+        transfer(db_session, setup, [first, second])
+
+        later = add_payment(db_session, setup, 400.0, "approved", self_payment=True)
+        transfer(db_session, setup, [later])
+
+        entries = db_session.query(Khatabook).order_by(Khatabook.id).all()
+        assert [entry.balance_after_entry for entry in entries] == [100.0, 300.0, 600.0, 1000.0]
+        assert db_session.query(KhatabookBalance).one().balance == 900.0
+
+
+class TestBulkApprove:
+    """Test bulk approval without a transfer"""
+
+    def test_status_behind_current_gets_history_only(self, db_session, setup):
+        """Test a payment already past the approver's status keeps its status but gets a history row"""
+        requested = add_payment(db_session, setup, 100.0, "requested")
+        transferred = add_payment(db_session, setup, 200.0, "transferred")
+
+        result = approve_payments_bulk(
+            BulkApprovePaymentsRequest(payment_ids=[requested.uuid, transferred.uuid]),
+            db=db_session,
+            current_user=setup["admin"],
+        )
+
+        assert outcomes(result) == ["updated", "updated"]
+        assert [row["payment_status"] for row in result["data"]["results"]] == ["approved", "transferred"]
+        db_session.expire_all()
+        assert db_session.get(Payment, requested.id).status == "approved"
+        assert db_session.get(Payment, transferred.id).status == "transferred"
+        assert db_session.query(PaymentStatusHistory).filter_by(payment_id=transferred.uuid).count() == 1
+        assert db_session.get(BalanceDetail, setup["bank"].id).balance == 10000.0
@@ -0,0 +1,171 @@
+"""
+Test cases for change counters and list ETags
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from src.app.database import change_counters
+from src.app.database.change_counters import (
+    BUMP_ATTEMPTS,
+    bump_after_commit,
+    bump_change_counters,
+    pending_bumps,
+    read_change_counters,
+)
+from src.app.database.database import SessionLocal
+from src.app.database.models import Item, TableChangeCounter
+from src.app.services import payment_service
+from src.app.utils import conditional_get
+from src.app.utils.conditional_get import compute_etag, etag_headers, etag_matches
+
+
+@pytest.fixture(autouse=True)
+def no_pending_bumps(monkeypatch):
+    """Failed bumps left behind by one test must not leak into the next"""
+    monkeypatch.setattr(change_counters, "_pending_bumps", set())
+    monkeypatch.setattr(change_counters, "BUMP_RETRY_DELAY", 0)
+
+
+class TestChangeCounters:
+    """Test bumping and reading table versions"""
+
+    def test_bump_and_read(self):
+        """Test tracked tables are bumped once per call and untracked ones ignored"""
+        engine = create_engine("sqlite://")
+        TableChangeCounter.__table__.create(engine)
+
+        with engine.begin() as connection:
+            bump_change_counters(connection, ["payments", "items", "logs"])
+            bump_change_counters(connection, ["payments"])
+
+        with Session(engine) as db:
+            versions = read_change_counters(db, ["payments", "items", "khatabook_entries"])
+        assert versions == {"payments": 2, "items": 1, "khatabook_entries": 0}
+
+    def test_bumped_after_commit_outside_the_write(self, tmp_path):
+        """Test writes bump counters only once committed, and never while the write is open"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}")
+        TableChangeCounter.__table__.create(engine)
+        Item.__table__.create(engine)
+
+        def items_version():
+            with Session(engine) as reader:
+                return read_change_counters(reader, ["items"])["items"]
+
+        db = SessionLocal(bind=engine)
+        try:
+            db.add(Item(name="Cement"))
+            db.flush()
+            assert items_version() == 0
+            db.commit()
+            assert items_version() == 1
+
+            db.execute(update(Item).values(category="Material"))
+            db.commit()
+            assert items_version() == 2
+
+            db.add(Item(name="Sand"))
+            db.flush()
+            db.rollback()
+            db.commit()
+            assert items_version() == 2
+        finally:
+            db.close()
+
+
+    def test_failed_bump_stays_pending(self):
+        """Test a bump that keeps failing is retried, left pending and carried by the next one"""
+        engine = create_engine("sqlite://")
+        TableChangeCounter.__table__.create(engine)
+        broken = MagicMock()
+        broken.begin.side_effect = OperationalError("UPDATE", {}, Exception("database is locked"))
+
+        assert bump_after_commit(broken, ["items"]) is False
+        assert broken.begin.call_count == BUMP_ATTEMPTS
+        assert pending_bumps(["items", "payments"]) == {"items"}
+
+        assert bump_after_commit(engine, ["payments"]) is True
+        assert pending_bumps(["items"]) == set()
+        with Session(engine) as db:
+            assert read_change_counters(db, ["items", "payments"]) == {"items": 1, "payments": 1}
+
+
+class TestListEtag:
+    """Test ETag computation and If-None-Match matching"""
+
+    def test_etag_changes_with_versions_scope_and_query(self):
+        """Test the ETag depends on table versions, caller scope and filters"""
+        etag = compute_etag({"payments": 1}, "user-1:Admin", "page=1")
+        assert etag.startswith('W/"')
+        assert etag == compute_etag({"payments": 1}, "user-1:Admin", "page=1")
+        assert etag != compute_etag({"payments": 2}, "user-1:Admin", "page=1")
+        assert etag != compute_etag({"payments": 1}, "user-2:Admin", "page=1")
+        assert etag != compute_etag({"payments": 1}, "user-1:Admin", "page=2")
+
+    def test_if_none_match(self):
+        """Test weak comparison, lists of tags and wildcard"""
+        etag = 'W/"abc"'
+        assert etag_matches('W/"abc"', etag)
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('W/"old", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('W/"old"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_headers_only_with_etag(self):
+        """Test error responses (no ETag) get no caching headers"""
+        assert etag_headers(None) == {}
+        assert etag_headers('W/"abc"')["Cache-Control"] == "private, no-cache"
+
+
+class TestItemsEndpoint:
+    """Test GET /payments/items answers If-None-Match before running its list queries"""
+
+    def test_not_modified_until_written(self, client, db_session, monkeypatch):
+        """Test 304 without the list query while current, 200 with the new item after a write"""
+        collect_items = payment_service.collect_items
+        calls = []
+
+        async def counted_collect_items(*args, **kwargs):
+            calls.append(kwargs)
+            return await collect_items(*args, **kwargs)
+
+        monkeypatch.setattr(payment_service, "collect_items", counted_collect_items)
+
+        first = client.get("/payments/items")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        current = client.get("/payments/items", headers={"If-None-Match": etag})
+        assert current.status_code == 304
+        assert len(calls) == 1
+
+        db_session.add(Item(name="Steel"))
+        db_session.commit()
+        # What the after_commit hook does for SessionLocal sessions
+        bump_change_counters(db_session.connection(), ["items"])
+
+        changed = client.get("/payments/items", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert [item["name"] for item in changed.json()["data"]] == ["Steel"]
+
+    def test_failed_bump_disables_not_modified(self, client, monkeypatch):
+        """Test a pending bump is retried by the next request, and no 304 is sent if it fails again"""
+        etag = client.get("/payments/items").headers["etag"]
+
+        change_counters._pending_bumps.add("items")
+        retried = client.get("/payments/items", headers={"If-None-Match": etag})
+        assert retried.status_code == 200
+        assert retried.headers["etag"] != etag
+        assert pending_bumps(["items"]) == set()
+
+        change_counters._pending_bumps.add("items")
+        monkeypatch.setattr(conditional_get, "bump_after_commit", lambda bind, tables: False)
+        still_pending = client.get("/payments/items", headers={"If-None-Match": retried.headers["etag"]})
+        assert still_pending.status_code == 200
+        assert "etag" not in still_pending.headers
@@ -0,0 +1,228 @@
+"""
+Test cases for per-request database session settings
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import anyio
+import pytest
+from sqlalchemy import create_engine, event, text
+from starlette.requests import Request
+
+from src.app.database import database
+from src.app.database.database import (
+    AsyncBackedSession,
+    SessionLocal,
+    _start_disconnect_watcher,
+    cancel_session_query,
+    run_concurrently,
+    settings,
+    statement_timeout_for,
+)
+
+
+@pytest.fixture
+def statements():
+    """SQL sent to ``pg_engine``"""
+    return []
+
+
+@pytest.fixture
+def pg_engine(statements):
+    """
+    SQLite engine that reports itself as Postgres, so the session hooks run;
+    SET LOCAL is captured and answered with a no-op.
+    """
+    engine = create_engine("sqlite://")
+    engine.dialect.name = "postgresql"
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        if statement.startswith("SET LOCAL"):
+            return "SELECT 1", ()
+        return statement, parameters
+
+    return engine
+
+
+class FakeAsyncSession:
+    """Stand-in for AsyncSession that records which session ran each callable"""
+
+    opened = []
+
+    bind = None
+
+    def __init__(self, name="own"):
+        self.name = name
+        if FakeAsyncSession.bind is None:
+            self.sync_session = MagicMock(info={})
+        else:
+            self.sync_session = AsyncBackedSession(bind=FakeAsyncSession.bind)
+
+    async def __aenter__(self):
+        FakeAsyncSession.opened.append(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run_sync(self, fn):
+        await asyncio.sleep(0)
+        if FakeAsyncSession.bind is None:
+            return fn(self)
+        return fn(self.sync_session)
+
+
+class TestStatementTimeouts:
+    """Test statement timeouts derived from the endpoint class"""
+
+    def test_timeout_per_endpoint_class(self):
+        """Test reads, writes and analytics get their own timeouts"""
+        assert statement_timeout_for("GET", "/payments") == settings.STATEMENT_TIMEOUT_READ_MS
+        assert statement_timeout_for("PUT", "/payments/approve") == settings.STATEMENT_TIMEOUT_WRITE_MS
+        assert statement_timeout_for("GET", "/admin/item-analytics") == settings.STATEMENT_TIMEOUT_ANALYTICS_MS
+        assert statement_timeout_for("GET", "/khatabook/export") == settings.STATEMENT_TIMEOUT_ANALYTICS_MS
+
+    def test_set_local_on_begin(self, pg_engine, statements):
+        """Test every transaction starts with the session's timeout"""
+        db = SessionLocal(bind=pg_engine)
+        db.info["statement_timeout_ms"] = 2500
+        try:
+            db.execute(text("SELECT 2"))
+            db.commit()
+            db.execute(text("SELECT 3"))
+        finally:
+            db.close()
+
+        assert statements == [
+            "SET LOCAL statement_timeout = 2500", "SELECT 2",
+            "SET LOCAL statement_timeout = 2500", "SELECT 3",
+        ]
+
+    def test_no_timeout_without_request(self, pg_engine, statements):
+        """Test sessions opened outside a request keep the server default"""
+        db = SessionLocal(bind=pg_engine)
+        try:
+            db.execute(text("SELECT 2"))
+        finally:
+            db.close()
+
+        assert statements == ["SELECT 2"]
+
+    def test_timeout_copied_to_concurrent_sessions(self, pg_engine, statements, monkeypatch):
+        """Test the extra sessions of run_concurrently use the request's timeout"""
+        monkeypatch.setattr(database, "AsyncSessionLocal", FakeAsyncSession)
+        monkeypatch.setattr(FakeAsyncSession, "bind", pg_engine)
+        db = FakeAsyncSession("db")
+        db.sync_session.info["statement_timeout_ms"] = 2500
+        query = lambda session: session.execute(text("SELECT 2")).scalar()
+
+        try:
+            assert asyncio.run(run_concurrently(db, query, query, query)) == [2, 2, 2]
+        finally:
+            db.sync_session.close()
+            for session in FakeAsyncSession.opened:
+                session.sync_session.close()
+
+        assert statements.count("SET LOCAL statement_timeout = 2500") == 3
+        assert statements.count("SELECT 2") == 3
+
+
+class TestCancelSessionQuery:
+    """Test server-side cancellation of a session's running query"""
+
+    def test_cancel_without_connection(self):
+        """Test nothing is cancelled when no transaction is active"""
+        db = SessionLocal()
+        try:
+            assert cancel_session_query(db) is False
+        finally:
+            db.close()
+
+    def test_cancel_running_query(self):
+        """Test the DBAPI connection of the active transaction is cancelled"""
+        db = SessionLocal()
+        dbapi_connection = MagicMock()
+        db.info["dbapi_connection"] = dbapi_connection
+        try:
+            assert cancel_session_query(db) is True
+            dbapi_connection.cancel.assert_called_once()
+        finally:
+            db.info.clear()
+            db.close()
+
+
+class TestDisconnectWatcher:
+    """Test queries are cancelled when the client goes away"""
+
+    def test_cancels_query_after_disconnect(self, monkeypatch):
+        """Test the watcher leaves a connected request alone and cancels once it disconnects"""
+        monkeypatch.setattr(database, "DISCONNECT_POLL_INTERVAL", 0.01)
+        client_gone = False
+
+        async def receive():
+            if client_gone:
+                return {"type": "http.disconnect"}
+            await asyncio.sleep(3600)
+
+        request = Request({"type": "http", "method": "GET", "path": "/payments", "headers": []}, receive)
+        db = SessionLocal()
+        dbapi_connection = MagicMock()
+        db.info["dbapi_connection"] = dbapi_connection
+
+        async def scenario():
+            nonlocal client_gone
+            # Spawned from a worker thread, as get_db runs in the thread pool
+            watcher = await anyio.to_thread.run_sync(_start_disconnect_watcher, request, db)
+            await asyncio.sleep(0.05)
+            assert not watcher.done()
+            dbapi_connection.cancel.assert_not_called()
+
+            client_gone = True
+            await asyncio.wait_for(watcher, 1)
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            db.info.clear()
+            db.close()
+
+        dbapi_connection.cancel.assert_called_once()
+
+    def test_not_started_outside_worker_thread(self):
+        """Test scripts and tests calling get_db directly get no watcher"""
+        request = Request({"type": "http", "method": "GET", "path": "/payments", "headers": []})
+        assert _start_disconnect_watcher(request, MagicMock()) is None
+
+
+class TestRunConcurrently:
+    """Test fan-out of independent queries onto extra sessions"""
+
+    def setup_method(self):
+        FakeAsyncSession.opened = []
+
+    def run(self, monkeypatch, slots, work_count):
+        monkeypatch.setattr(database, "AsyncSessionLocal", FakeAsyncSession)
+        monkeypatch.setattr(database, "fanout_connections", asyncio.Semaphore(slots))
+        db = FakeAsyncSession("db")
+        db.sync_session.info["statement_timeout_ms"] = 1234
+        work = [lambda session, i=i: (i, session.name) for i in range(work_count)]
+        return asyncio.run(run_concurrently(db, *work))
+
+    def test_extra_sessions_share_request_settings(self, monkeypatch):
+        """Test each extra callable gets its own session with the request's settings"""
+        results = self.run(monkeypatch, slots=4, work_count=3)
+
+        assert results == [(0, "db"), (1, "own"), (2, "own")]
+        assert [s.sync_session.info["statement_timeout_ms"] for s in FakeAsyncSession.opened] == [1234, 1234]
+        assert database.fanout_connections._value == 4
+
+    def test_falls_back_to_request_session(self, monkeypatch):
+        """Test work beyond the free fan-out connections runs on db, in order"""
+        results = self.run(monkeypatch, slots=1, work_count=4)
+
+        assert results == [(0, "db"), (1, "own"), (2, "db"), (3, "db")]
+        assert len(FakeAsyncSession.opened) == 1
+        assert database.fanout_connections._value == 1
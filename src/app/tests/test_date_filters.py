@@ -0,0 +1,80 @@
+"""
+Test cases for index-friendly date-range filters
+"""
+
+from datetime import date, datetime
+from uuid import uuid4
+
+from sqlalchemy import create_engine, func, select
+
+from src.app.database.models import Machinery, SelfAttendance
+from src.app.utils.date_filters import (
+    DateRange,
+    date_range_filter,
+    inclusive_range,
+    latest_month_range,
+    month_range,
+)
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return " ".join(row[-1] for row in rows)
+
+
+class TestDateRanges:
+    """Test turning filter parameters into half-open ranges"""
+
+    def test_ranges(self):
+        """Test month, latest month and inclusive ranges"""
+        assert month_range(2024, 2) == DateRange(date(2024, 2, 1), date(2024, 3, 1))
+        assert month_range(2024, 12) == DateRange(date(2024, 12, 1), date(2025, 1, 1))
+        assert latest_month_range(12, today=date(2026, 1, 15)) == month_range(2025, 12)
+        assert latest_month_range(1, today=date(2026, 1, 15)) == month_range(2026, 1)
+        assert inclusive_range(date(2025, 3, 1), date(2025, 3, 31)) == DateRange(date(2025, 3, 1), date(2025, 4, 1))
+        assert inclusive_range(None, None) == DateRange(None, None)
+
+    def test_timestamp_columns_compare_from_midnight(self):
+        """Test a timestamp column gets datetimes, and open ends add no predicate"""
+        start, end = date_range_filter(Machinery.start_time, month_range(2025, 3))
+        assert start.right.value == datetime(2025, 3, 1)
+        assert end.right.value == datetime(2025, 4, 1)
+        assert len(date_range_filter(SelfAttendance.attendance_date, inclusive_range(date(2025, 3, 1)))) == 1
+
+
+class TestDateFilterIndexUsage:
+    """Test the filters are answered by the composite indexes"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        SelfAttendance.__table__.create(self.engine)
+        Machinery.__table__.create(self.engine)
+
+    def test_self_attendance_month(self):
+        """Test a month of one user's attendance is an index range scan"""
+        user_id = uuid4()
+        sargable = select(SelfAttendance.id).where(
+            SelfAttendance.user_id == user_id,
+            *date_range_filter(SelfAttendance.attendance_date, month_range(2025, 3))
+        )
+        extracted = select(SelfAttendance.id).where(
+            SelfAttendance.user_id == user_id,
+            func.extract('month', SelfAttendance.attendance_date) == 3
+        )
+
+        plan = query_plan(self.engine, sargable)
+        assert "idx_self_attendance_user_date (user_id=? AND attendance_date>? AND attendance_date<?)" in plan
+        # The old filter could only use the user_id part of the index
+        assert "attendance_date>" not in query_plan(self.engine, extracted)
+
+    def test_machinery_month(self):
+        """Test a month of one user's machinery logs is an index range scan"""
+        sargable = select(Machinery.id).where(
+            Machinery.created_by == uuid4(),
+            *date_range_filter(Machinery.start_time, month_range(2025, 3))
+        )
+
+        plan = query_plan(self.engine, sargable)
+        assert "idx_machinery_created_by_start_time (created_by=? AND start_time>? AND start_time<?)" in plan
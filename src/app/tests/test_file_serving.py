@@ -0,0 +1,89 @@
+"""
+Test cases for serving uploads through the app
+"""
+
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.app.database.database import get_async_db, settings
+from src.app.services.media_endpoints import media_router
+
+CONTENT = b"0123456789" * 100
+
+
+@pytest.fixture
+def uploads_dir(tmp_path, monkeypatch):
+    """Uploads directory with a legacy file and a store blob"""
+    monkeypatch.setattr(settings, "UPLOADS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOADS_SERVING", "sendfile")
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    blob = f"store/{sha256[:2]}/{sha256[2:4]}/{sha256}.pdf"
+    os.makedirs(tmp_path / os.path.dirname(blob))
+    (tmp_path / blob).write_bytes(CONTENT)
+    os.makedirs(tmp_path / "payments")
+    (tmp_path / "payments" / "receipt.pdf").write_bytes(CONTENT)
+    return {"blob": blob, "sha256": sha256, "legacy": "payments/receipt.pdf"}
+
+
+@pytest.fixture
+def client():
+    async def no_db():
+        yield None
+
+    app = FastAPI()
+    app.include_router(media_router)
+    app.dependency_overrides[get_async_db] = no_db
+    return TestClient(app)
+
+
+class TestSendfileMode:
+    """Test files streamed by the app"""
+
+    def test_store_blob_is_immutable_with_content_etag(self, client, uploads_dir):
+        """Test store blobs carry their hash as a strong ETag and a long cache"""
+        response = client.get(f"/uploads/{uploads_dir['blob']}")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["etag"] == f'"{uploads_dir["sha256"]}"'
+        assert "immutable" in response.headers["cache-control"]
+
+        legacy = client.get(f"/uploads/{uploads_dir['legacy']}")
+        assert legacy.headers["cache-control"] == "public, max-age=2592000"
+
+    def test_range_and_revalidation(self, client, uploads_dir):
+        """Test byte ranges and If-None-Match"""
+        url = f"/uploads/{uploads_dir['blob']}"
+        partial = client.get(url, headers={"Range": "bytes=10-19"})
+        assert partial.status_code == 206
+        assert partial.content == CONTENT[10:20]
+        assert partial.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_only_files_inside_uploads(self, client, uploads_dir):
+        """Test traversal and missing files are not found"""
+        assert client.get("/uploads/../secret.txt").status_code == 404
+        assert client.get("/uploads/%2e%2e/%2e%2e/etc/passwd").status_code == 404
+        assert client.get("/uploads/payments/missing.pdf").status_code == 404
+
+
+class TestAccelMode:
+    """Test handing files to nginx"""
+
+    def test_redirects_to_internal_location(self, client, uploads_dir, monkeypatch):
+        """Test the app answers with X-Accel-Redirect and no body"""
+        monkeypatch.setattr(settings, "UPLOADS_SERVING", "x-accel")
+        response = client.get(f"/uploads/{uploads_dir['legacy']}")
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == f"/protected_uploads/{uploads_dir['legacy']}"
+        assert response.content == b""
+
+    def test_requires_token_when_configured(self, client, uploads_dir, monkeypatch):
+        """Test anonymous downloads are refused with UPLOADS_REQUIRE_AUTH"""
+        monkeypatch.setattr(settings, "UPLOADS_REQUIRE_AUTH", True)
+        response = client.get(f"/uploads/{uploads_dir['legacy']}")
+        assert response.status_code == 401
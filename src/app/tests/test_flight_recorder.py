@@ -0,0 +1,89 @@
+"""
+Test cases for the slow-request flight recorder
+"""
+
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from src.app.middleware.flight_recorder import FlightRecorder, current_recording
+
+
+@pytest.fixture
+def recorder_engine():
+    """In-memory SQLite engine for recording statements"""
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def _run_request(recorder, engine, duration, path="/payments", statements=1):
+    """Simulate one request executing a few statements"""
+    token = recorder.start_request()
+    with engine.connect() as conn:
+        for _ in range(statements):
+            conn.execute(text("SELECT 1"))
+    return recorder.finish_request(token, "GET", path, 200, duration)
+
+
+def _wait_for_plans(recorder, timeout=2.0):
+    """Wait until the background plan capture has filled in every plan"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        entries = recorder.snapshot()
+        if all(
+            s["plan"] is not None
+            for e in entries for s in e["statements"] if "plan" in s
+        ):
+            return entries
+        time.sleep(0.01)
+    return recorder.snapshot()
+
+
+class TestFlightRecorder:
+    """Test request recording and the ring buffer"""
+
+    def test_fast_request_is_not_kept(self, recorder_engine):
+        """Test requests below the threshold are discarded"""
+        recorder = FlightRecorder(size=5, slow_request_threshold=1.0)
+        recorder.instrument(recorder_engine)
+
+        assert _run_request(recorder, recorder_engine, duration=0.1) is None
+        assert recorder.snapshot() == []
+        assert current_recording.get() is None
+
+    def test_slow_request_records_statements(self, recorder_engine):
+        """Test slow requests keep their statements with timings"""
+        recorder = FlightRecorder(size=5, slow_request_threshold=1.0)
+        recorder.instrument(recorder_engine)
+
+        entry = _run_request(recorder, recorder_engine, duration=1.5, statements=3)
+
+        assert entry["path"] == "/payments"
+        assert entry["statement_count"] == 3
+        assert all(s["sql"] == "SELECT 1" for s in entry["statements"])
+        assert all("_raw" not in s for s in entry["statements"])
+        assert recorder.snapshot()[0]["id"] == entry["id"]
+
+    def test_ring_buffer_is_bounded(self, recorder_engine):
+        """Test only the newest N slow requests are kept, newest first"""
+        recorder = FlightRecorder(size=2, slow_request_threshold=0.0)
+        recorder.instrument(recorder_engine)
+
+        for i in range(4):
+            _run_request(recorder, recorder_engine, duration=1.0, path=f"/r{i}")
+
+        assert [e["path"] for e in recorder.snapshot()] == ["/r3", "/r2"]
+        assert [e["path"] for e in recorder.snapshot(path="/r2")] == ["/r2"]
+        assert len(recorder.snapshot(limit=1)) == 1
+
+    def test_plan_unavailable_outside_postgres(self, recorder_engine):
+        """Test slow statements get a plan marker when not on PostgreSQL"""
+        recorder = FlightRecorder(
+            size=2, slow_request_threshold=0.0, slow_statement_threshold=0.0
+        )
+        recorder.instrument(recorder_engine)
+
+        _run_request(recorder, recorder_engine, duration=1.0)
+        entries = _wait_for_plans(recorder)
+
+        assert entries[0]["statements"][0]["plan"].startswith("unavailable")
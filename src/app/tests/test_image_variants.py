@@ -0,0 +1,102 @@
+"""
+Test cases for photo thumbnails and medium variants
+"""
+
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+from src.app.services.media_endpoints import media_router
+from src.app.utils.image_variants import (
+    VARIANT_SIZES,
+    generate_variants,
+    parse_variant_name,
+    variant_name,
+    variant_path,
+    variant_urls,
+)
+
+# EXIF orientation 6: stored landscape, displayed rotated 90° clockwise
+ROTATE_90_CW = 6
+
+
+@pytest.fixture
+def uploads_cwd(tmp_path, monkeypatch):
+    """Run in an empty directory, as upload paths are relative"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("uploads/attendance_photos")
+    return tmp_path
+
+
+def write_photo(path, size=(4000, 3000), orientation=None):
+    image = Image.new("RGB", size, "red")
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(path, format="JPEG", exif=exif)
+    return path
+
+
+class TestVariantNames:
+    """Test mapping originals to variant names and back"""
+
+    def test_round_trip(self):
+        """Test a variant name leads back to its original"""
+        name = variant_name("uploads/store/ab/cd/abcd.jpg", "thumb")
+        assert name.startswith("store/ab/cd/abcd.jpg.thumb.")
+        assert parse_variant_name(name) == ("uploads/store/ab/cd/abcd.jpg", "thumb")
+
+    def test_only_uploaded_images_have_variants(self):
+        """Test documents, foreign paths and traversal get no variant"""
+        assert variant_urls("uploads/po_docs/PO_1.pdf") == {"thumb": None, "medium": None}
+        assert variant_name("/etc/photo.jpg", "thumb") is None
+        assert variant_urls(None)["thumb"] is None
+        assert parse_variant_name("../secret.jpg.thumb.webp") is None
+        assert parse_variant_name("store/a.pdf.thumb.webp") is None
+
+
+class TestGenerateVariants:
+    """Test writing variants"""
+
+    def test_sizes_and_orientation(self, uploads_cwd):
+        """Test variants fit their size and are rotated upright"""
+        photo = write_photo("uploads/attendance_photos/a.jpg", orientation=ROTATE_90_CW)
+        written = generate_variants(photo)
+
+        assert len(written) == 2
+        for variant, size in VARIANT_SIZES.items():
+            with Image.open(variant_path(photo, variant)) as image:
+                assert max(image.size) == size
+                # Portrait after applying the orientation
+                assert image.height > image.width
+                assert 0x0112 not in image.getexif()
+
+    def test_small_images_are_not_enlarged_or_redone(self, uploads_cwd):
+        """Test a small photo keeps its size and existing variants are kept"""
+        photo = write_photo("uploads/attendance_photos/small.jpg", size=(200, 100))
+        generate_variants(photo)
+        with Image.open(variant_path(photo, "medium")) as image:
+            assert image.size == (200, 100)
+        assert generate_variants(photo) == []
+
+
+class TestVariantEndpoint:
+    """Test serving variants"""
+
+    def test_generates_missing_variant_on_request(self, uploads_cwd):
+        """Test a listed variant URL works before the background job ran"""
+        app = FastAPI()
+        app.include_router(media_router)
+        client = TestClient(app)
+        photo = write_photo("uploads/attendance_photos/b.jpg")
+
+        response = client.get(f"/variants/{variant_name(photo, 'thumb')}")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("image/")
+        assert os.path.exists(variant_path(photo, "thumb"))
+        assert not os.path.exists(variant_path(photo, "medium"))
+
+        missing = client.get("/variants/attendance_photos/none.jpg.thumb.webp")
+        assert missing.status_code == 404
@@ -0,0 +1,113 @@
+"""
+Test cases for batch khatabook uploads
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from src.app.database.models import (
+    Item,
+    Khatabook,
+    KhatabookItem,
+    Payment,
+    PaymentItem,
+    PaymentStatusHistory,
+    Person,
+    Project,
+    User,
+)
+from src.app.schemas.khatabook_schemas import KhatabookBatchRequest
+from src.app.services.khatabook_endpoints import create_khatabook_entries_batch
+
+
+@pytest.fixture
+def setup(db_session):
+    """An engineer with 1000 transferred to their khatabook, a payee, a project and an item"""
+    engineer = User(name="Eng", phone=9000000003, password_hash="x", role="SiteEngineer")
+    person = Person(name="Vendor", account_number="123", ifsc_code="IFSC0000001", phone_number="9000000004")
+    project = Project(name="Tower")
+    item = Item(name="Cement")
+    db_session.add_all([engineer, person, project, item])
+    db_session.flush()
+    db_session.add(Payment(
+        amount=1000.0, project_id=project.uuid, created_by=engineer.uuid, status="transferred",
+        person=person.uuid, latitude=0, longitude=0, self_payment=True,
+    ))
+    db_session.commit()
+    return {"engineer": engineer, "person": person, "project": project, "item": item}
+
+
+def upload(db_session, setup, entries):
+    request = KhatabookBatchRequest(entries=[
+        {"person_id": setup["person"].uuid, **entry} for entry in entries
+    ])
+    return create_khatabook_entries_batch(request=request, db=db_session, current_user=setup["engineer"])
+
+
+def statuses(result):
+    return [row["status"] for row in result["data"]["results"]]
+
+
+class TestKhatabookBatch:
+    """Test batch upload of offline khatabook entries"""
+
+    def test_running_balance_in_request_order(self, db_session, setup):
+        """Test balances follow the request order and the last entry is the latest one"""
+        result = upload(db_session, setup, [
+            {"idempotency_key": "a", "amount": 100.0},
+            {"idempotency_key": "b", "amount": 200.0},
+            {"idempotency_key": "c", "amount": 50.0},
+        ])
+
+        assert result["status_code"] == 201
+        assert [row["balance_after_entry"] for row in result["data"]["results"]] == [900.0, 700.0, 650.0]
+        latest = db_session.query(Khatabook).order_by(Khatabook.created_at.desc(), Khatabook.id.desc()).first()
+        assert latest.idempotency_key == "c"
+        assert latest.balance_after_entry == 650.0
+
+    def test_duplicate_keys(self, db_session, setup):
+        """Test a key repeated in one batch, or sent again in a later one, creates one entry"""
+        first = upload(db_session, setup, [
+            {"idempotency_key": "a", "amount": 100.0},
+            {"idempotency_key": "a", "amount": 100.0},
+        ])
+        assert statuses(first) == ["created", "duplicate"]
+        assert first["data"]["results"][1]["uuid"] == first["data"]["results"][0]["uuid"]
+
+        retry = upload(db_session, setup, [
+            {"idempotency_key": "a", "amount": 100.0},
+            {"idempotency_key": "b", "amount": 200.0},
+        ])
+        assert statuses(retry) == ["duplicate", "created"]
+        assert retry["data"]["results"][0]["balance_after_entry"] == 900.0
+        assert retry["data"]["results"][1]["balance_after_entry"] == 700.0
+        assert db_session.query(Khatabook).count() == 2
+
+    def test_unknown_references(self, db_session, setup):
+        """Test unknown persons and projects are rejected and unknown items dropped"""
+        unknown_item = uuid4()
+        result = upload(db_session, setup, [
+            {"idempotency_key": "a", "amount": 10.0, "person_id": uuid4()},
+            {"idempotency_key": "b", "amount": 10.0, "project_id": uuid4()},
+            {"idempotency_key": "c", "amount": 10.0, "item_ids": [setup["item"].uuid, unknown_item]},
+        ])
+
+        assert statuses(result) == ["rejected", "rejected", "created"]
+        assert result["data"]["results"][2]["ignored_item_ids"] == [str(unknown_item)]
+        assert db_session.query(KhatabookItem).one().item_id == setup["item"].uuid
+        assert db_session.query(Khatabook).count() == 1
+
+    def test_payments_only_for_entries_with_a_project(self, db_session, setup):
+        """Test entries with a project get a khatabook payment, with history and items"""
+        upload(db_session, setup, [
+            {"idempotency_key": "a", "amount": 10.0},
+            {"idempotency_key": "b", "amount": 20.0, "project_id": setup["project"].uuid,
+             "item_ids": [setup["item"].uuid]},
+        ])
+
+        payment = db_session.query(Payment).filter(Payment.status == "khatabook").one()
+        assert payment.amount == 20.0
+        assert payment.project_id == setup["project"].uuid
+        assert db_session.query(PaymentStatusHistory).filter_by(payment_id=payment.uuid).count() == 1
+        assert db_session.query(PaymentItem).filter_by(payment_id=payment.uuid).one().item_id == setup["item"].uuid
@@ -0,0 +1,190 @@
+"""
+Test cases for the push notification outbox
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.app.database.models import NotificationBadge, NotificationOutbox
+from src.app.notification.outbox import (
+    OUTBOX_FAILED,
+    OUTBOX_PENDING,
+    OUTBOX_SENT,
+    Delivery,
+    StubTransport,
+    badge_counts,
+    clear_badge,
+    dispatch_pending,
+    enqueue_notification,
+    enqueue_notifications,
+    format_inr,
+    retry_delay,
+)
+from src.app.schemas import constants
+
+
+@pytest.fixture
+def outbox_db():
+    """SQLite session with only the outbox tables"""
+    engine = create_engine("sqlite://")
+    NotificationOutbox.__table__.create(engine)
+    NotificationBadge.__table__.create(engine)
+    with Session(engine) as db:
+        yield db
+
+
+class TestEnqueue:
+    """Test queuing notifications"""
+
+    def test_enqueue_is_part_of_the_callers_transaction(self, outbox_db):
+        """Test a rolled back transaction leaves nothing to deliver"""
+        enqueue_notification(outbox_db, topic="user-1", title="Payment Request", body="Payment of 100")
+        outbox_db.rollback()
+        assert outbox_db.query(NotificationOutbox).count() == 0
+
+        enqueue_notification(outbox_db, topic="user-1", title="Payment Request", body="Payment of 100")
+        outbox_db.commit()
+        row = outbox_db.query(NotificationOutbox).one()
+        assert row.status == OUTBOX_PENDING
+        assert row.attempts == 0
+
+
+class TestDispatch:
+    """Test delivering the outbox"""
+
+    def test_dispatch_sends_due_notifications_in_one_batch(self, outbox_db):
+        """Test all due rows go out in one transport call and are marked sent"""
+        for i in range(3):
+            enqueue_notification(outbox_db, topic=f"user-{i}", title="T", body="B", data={"i": str(i)})
+        outbox_db.commit()
+
+        calls = []
+        transport = StubTransport()
+        original_send = transport.send
+        transport.send = lambda messages: calls.append(len(messages)) or original_send(messages)
+
+        assert dispatch_pending(outbox_db, transport) == 3
+        assert calls == [3]
+        assert [m["topic"] for m in transport.sent] == ["user-0", "user-1", "user-2"]
+        assert transport.sent[0]["data"] == {"i": "0", "badge": "1"}
+        assert {row.status for row in outbox_db.query(NotificationOutbox)} == {OUTBOX_SENT}
+
+        # Nothing left to do
+        assert dispatch_pending(outbox_db, transport) == 0
+
+    def test_failed_delivery_is_retried_with_backoff(self, outbox_db):
+        """Test a transient error schedules a retry and the last attempt marks it failed"""
+        enqueue_notification(outbox_db, topic="user-1", title="T", body="B")
+        outbox_db.commit()
+        transport = StubTransport(fail=lambda message: Delivery(error="UNAVAILABLE"))
+
+        before = datetime.now()
+        dispatch_pending(outbox_db, transport, max_attempts=2, retry_base=30)
+        row = outbox_db.query(NotificationOutbox).one()
+        assert row.status == OUTBOX_PENDING
+        assert row.attempts == 1
+        assert row.last_error == "UNAVAILABLE"
+        assert row.next_attempt_at >= before + timedelta(seconds=30)
+
+        # Not due yet
+        assert dispatch_pending(outbox_db, transport, max_attempts=2, retry_base=30) == 0
+
+        row.next_attempt_at = datetime.now() - timedelta(seconds=1)
+        outbox_db.commit()
+        dispatch_pending(outbox_db, transport, max_attempts=2, retry_base=30)
+        outbox_db.refresh(row)
+        assert row.status == OUTBOX_FAILED
+        assert row.attempts == 2
+
+    def test_permanent_error_is_not_retried(self, outbox_db):
+        """Test errors marked not retryable fail on the first attempt"""
+        enqueue_notification(outbox_db, topic="user-1", title="T", body="B")
+        enqueue_notification(outbox_db, topic="user-2", title="T", body="B")
+        outbox_db.commit()
+        transport = StubTransport(
+            fail=lambda message: Delivery(error="UNREGISTERED", retryable=False)
+            if message["topic"] == "user-1" else None
+        )
+
+        dispatch_pending(outbox_db, transport)
+        statuses = {row.topic: row.status for row in outbox_db.query(NotificationOutbox)}
+        assert statuses == {"user-1": OUTBOX_FAILED, "user-2": OUTBOX_SENT}
+        assert [m["topic"] for m in transport.sent] == ["user-2"]
+
+    def test_retry_delay_doubles_and_is_capped(self):
+        """Test the backoff doubles per attempt up to an hour"""
+        assert retry_delay(1, 30) == timedelta(seconds=30)
+        assert retry_delay(3, 30) == timedelta(seconds=120)
+        assert retry_delay(20, 30) == timedelta(hours=1)
+
+
+class TestCoalescing:
+    """Test merging notifications into digests"""
+
+    def _make_due(self, db):
+        db.query(NotificationOutbox).update(
+            {NotificationOutbox.next_attempt_at: datetime.now() - timedelta(seconds=1)}
+        )
+        db.commit()
+
+    def test_notifications_within_window_become_one_digest(self, outbox_db):
+        """Test the first request goes out at once and the rest as one digest"""
+        kind = constants.NOTIFICATION_KIND_PAYMENT_REQUEST
+        transport = StubTransport()
+
+        enqueue_notifications(outbox_db, ["admin"], "Payment Request", "Payment of 100000", kind=kind, amount=100000)
+        outbox_db.commit()
+        assert dispatch_pending(outbox_db, transport) == 1
+
+        for amount in (120000, 80000, 40000):
+            enqueue_notifications(outbox_db, ["admin"], "Payment Request", f"Payment of {amount}", kind=kind, amount=amount)
+        outbox_db.commit()
+
+        # Held until the window ends
+        assert dispatch_pending(outbox_db, transport) == 0
+        pending = outbox_db.query(NotificationOutbox).filter(NotificationOutbox.status == OUTBOX_PENDING).all()
+        assert len({row.next_attempt_at for row in pending}) == 1
+
+        self._make_due(outbox_db)
+        assert dispatch_pending(outbox_db, transport) == 3
+        assert len(transport.sent) == 2
+        digest = transport.sent[1]
+        assert digest["body"] == "3 new payment requests (₹2.4L)"
+        assert digest["data"]["count"] == "3"
+        assert digest["badge"] == 4
+
+    def test_other_recipients_and_kinds_are_not_held(self, outbox_db):
+        """Test coalescing is per recipient and kind"""
+        kind = constants.NOTIFICATION_KIND_PAYMENT_REQUEST
+        enqueue_notifications(outbox_db, ["admin"], "Payment Request", "one", kind=kind, amount=1)
+        enqueue_notifications(outbox_db, ["admin", "accountant"], "Payment Request", "two", kind=kind, amount=2)
+        enqueue_notifications(outbox_db, ["admin"], "Payment Status Updated", "three",
+                              kind=constants.NOTIFICATION_KIND_PAYMENT_STATUS, amount=3)
+        outbox_db.commit()
+
+        transport = StubTransport()
+        dispatch_pending(outbox_db, transport)
+        assert sorted((m["topic"], m["body"]) for m in transport.sent) == [
+            ("accountant", "two"), ("admin", "one"), ("admin", "three")
+        ]
+
+    def test_badge_counts_since_last_clear(self, outbox_db):
+        """Test the badge counts notifications queued after the last clear"""
+        enqueue_notifications(outbox_db, ["admin", "accountant"], "T", "B")
+        outbox_db.commit()
+        assert badge_counts(outbox_db, ["admin", "accountant", "nobody"]) == {
+            "admin": 1, "accountant": 1, "nobody": 0
+        }
+
+        clear_badge(outbox_db, "admin")
+        outbox_db.commit()
+        assert badge_counts(outbox_db, ["admin", "accountant"]) == {"admin": 0, "accountant": 1}
+
+    def test_format_inr(self):
+        """Test short rupee amounts"""
+        assert format_inr(45000) == "₹45,000"
+        assert format_inr(340000) == "₹3.4L"
+        assert format_inr(500000) == "₹5L"
+        assert format_inr(12000000) == "₹1.2Cr"
@@ -0,0 +1,78 @@
+"""
+Test cases for live payment status events
+"""
+
+import asyncio
+
+from src.app.services.payment_events import (
+    RESYNC_EVENT,
+    PaymentEventHub,
+    PaymentEventScope,
+    Subscriber,
+)
+
+
+def event(status="approved", created_by="u-1", project_id="p-1", person=None):
+    return {
+        "type": "payment_status",
+        "payment_uuid": "pay-1",
+        "status": status,
+        "project_id": project_id,
+        "created_by": created_by,
+        "person": person,
+    }
+
+
+class TestVisibility:
+    """Test events are filtered like the payment list"""
+
+    def test_admin_roles_see_everything(self):
+        """Test admins and accountants see every payment"""
+        for role in ("Admin", "Accountant", "SuperAdmin"):
+            scope = PaymentEventScope("someone", role)
+            assert scope.can_see(event(created_by="u-2", project_id="p-9"))
+
+    def test_site_engineer_sees_own_and_named_khatabook(self):
+        """Test site engineers see their payments and khatabook payments naming them"""
+        scope = PaymentEventScope("u-1", "SiteEngineer", person_uuid="per-1")
+        assert scope.can_see(event(created_by="u-1"))
+        assert not scope.can_see(event(created_by="u-2"))
+        assert scope.can_see(event(status="khatabook", created_by="u-2", person="per-1"))
+        assert not scope.can_see(event(status="approved", created_by="u-2", person="per-1"))
+
+    def test_project_manager_sees_their_projects(self):
+        """Test project managers see payments of projects they are assigned to"""
+        scope = PaymentEventScope("u-1", "ProjectManager", project_ids=["p-1"])
+        assert scope.can_see(event(created_by="u-2", project_id="p-1"))
+        assert not scope.can_see(event(created_by="u-1", project_id="p-2"))
+
+    def test_other_roles_see_own_non_khatabook(self):
+        """Test other roles only see regular payments they created"""
+        scope = PaymentEventScope("u-1", "Client")
+        assert scope.can_see(event(created_by="u-1"))
+        assert not scope.can_see(event(status="khatabook", created_by="u-1"))
+
+
+class TestFanOut:
+    """Test delivering events to subscribers"""
+
+    def test_dispatch_only_reaches_subscribers_who_can_see(self):
+        """Test each subscriber only gets events in its scope"""
+        hub = PaymentEventHub(dsn="postgresql://unused")
+        admin = Subscriber(PaymentEventScope("a", "Admin"))
+        engineer = Subscriber(PaymentEventScope("u-9", "SiteEngineer"))
+        hub._subscribers.update({admin, engineer})
+
+        hub.dispatch(event(created_by="u-1"))
+        assert admin.queue.qsize() == 1
+        assert engineer.queue.empty()
+
+    def test_slow_subscriber_gets_resync(self):
+        """Test a full queue is replaced by a single resync event"""
+        async def run():
+            subscriber = Subscriber(PaymentEventScope("a", "Admin"), maxsize=2)
+            for _ in range(3):
+                subscriber.offer(event())
+            return [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+
+        assert asyncio.run(run()) == [RESYNC_EVENT]
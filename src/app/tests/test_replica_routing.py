@@ -0,0 +1,191 @@
+"""
+Test cases for read-replica routing
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.requests import Request
+from src.app.database import database
+from src.app.database.replica import (
+    PRIMARY_ONLY,
+    RoutingSession,
+    WriteTracker,
+    replica_reads,
+    user_key_from_token,
+)
+from src.app.services.auth_service import create_access_token
+from src.app.services.payment_service import list_priorities, list_items
+
+ReplicaTestBase = declarative_base()
+
+
+class Note(ReplicaTestBase):
+    __tablename__ = "replica_test_notes"
+
+    id = Column(Integer, primary_key=True)
+    text = Column(String)
+
+
+def make_session_factory():
+    primary = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    ReplicaTestBase.metadata.create_all(primary)
+    ReplicaTestBase.metadata.create_all(replica)
+    with primary.begin() as conn:
+        conn.execute(Note.__table__.insert(), [{"id": 1, "text": "primary"}])
+    with replica.begin() as conn:
+        conn.execute(Note.__table__.insert(), [{"id": 1, "text": "replica"}])
+    return sessionmaker(bind=primary, class_=RoutingSession, replica_bind=replica)
+
+
+class TestRoutingSession:
+    """Test which engine a session reads from"""
+
+    def test_reads_primary_by_default(self):
+        """Test sessions without use_replica stay on the primary"""
+        Session = make_session_factory()
+        with Session() as db:
+            assert db.scalar(select(Note.text)) == "primary"
+
+    def test_reads_replica_when_allowed(self):
+        """Test SELECTs go to the replica when the request allows it"""
+        Session = make_session_factory()
+        with Session() as db:
+            db.info["use_replica"] = True
+            assert db.scalar(select(Note.text)) == "replica"
+
+    def test_primary_only_statements(self):
+        """Test statements marked PRIMARY_ONLY skip the replica"""
+        Session = make_session_factory()
+        with Session() as db:
+            db.info["use_replica"] = True
+            assert db.scalar(select(Note.text).execution_options(**PRIMARY_ONLY)) == "primary"
+            assert db.query(Note.text).execution_options(**PRIMARY_ONLY).scalar() == "primary"
+
+    def test_pins_to_primary_after_write(self):
+        """Test a session reads its own writes once it has flushed"""
+        Session = make_session_factory()
+        with Session() as db:
+            db.info["use_replica"] = True
+            db.add(Note(id=2, text="new"))
+            db.flush()
+            assert db.info["use_replica"] is False
+            assert db.info["wrote"] is True
+            assert db.scalar(select(Note.text).where(Note.id == 2)) == "new"
+
+
+def make_request(method, endpoint, user_key="user-1"):
+    token = create_access_token(data={"sub": user_key})
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/payments",
+        "endpoint": endpoint,
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+class TestRouteReads:
+    """Test which requests may read from the replica"""
+
+    def test_only_marked_endpoints(self, monkeypatch):
+        """Test replica reads are limited to GETs of @replica_reads endpoints"""
+        monkeypatch.setattr(database, "replica_engine", MagicMock())
+        monkeypatch.setattr(database, "write_tracker", WriteTracker(window=5))
+        cases = [
+            ("GET", list_items, True),
+            ("GET", list_priorities, False),
+            ("GET", None, False),
+            ("POST", list_items, False),
+        ]
+        for method, endpoint, expected in cases:
+            info = {}
+            database.route_reads(info, make_request(method, endpoint))
+            assert info["user_key"] == "user-1"
+            assert info["use_replica"] is expected, (method, endpoint)
+
+    def test_write_window_uses_primary(self, monkeypatch):
+        """Test a marked endpoint reads from the primary right after the user wrote"""
+        monkeypatch.setattr(database, "replica_engine", MagicMock())
+        tracker = WriteTracker(window=5)
+        tracker.record_write("user-1")
+        monkeypatch.setattr(database, "write_tracker", tracker)
+        info = {}
+        database.route_reads(info, make_request("GET", replica_reads(lambda: None)))
+        assert info["use_replica"] is False
+
+
+class TestAsyncRouting:
+    """Test the async session dependency picks a database without blocking"""
+
+    def test_slow_redis_does_not_block_event_loop(self, monkeypatch):
+        """Test the write-window lookup runs off the event loop"""
+        redis_client = MagicMock()
+        redis_client.exists.side_effect = lambda key: time.sleep(0.2) or 1
+        monkeypatch.setattr(database, "replica_engine", MagicMock())
+        monkeypatch.setattr(database, "write_tracker", WriteTracker(window=5, redis_client=redis_client))
+        request = make_request("GET", list_items)
+
+        async def scenario():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.get_running_loop().create_task(tick())
+            sessions = database.get_async_db(request)
+            db = await sessions.__anext__()
+            info = dict(db.sync_session.info)
+            ticker.cancel()
+            await sessions.aclose()
+            return ticks, info
+
+        ticks, info = asyncio.run(scenario())
+
+        assert ticks >= 5
+        assert info["user_key"] == "user-1"
+        assert info["use_replica"] is False
+
+
+class TestWriteTracker:
+    """Test the read-your-writes window"""
+
+    def test_window_without_redis(self):
+        """Test a user reads from the primary only within the window"""
+        tracker = WriteTracker(window=0.05)
+        assert tracker.wrote_recently("user-1") is False
+        tracker.record_write("user-1")
+        assert tracker.wrote_recently("user-1") is True
+        assert tracker.wrote_recently("user-2") is False
+        time.sleep(0.06)
+        assert tracker.wrote_recently("user-1") is False
+
+    def test_redis_shared_across_workers(self):
+        """Test writes recorded by another worker are seen through Redis"""
+        redis_client = MagicMock()
+        redis_client.exists.return_value = 1
+        tracker = WriteTracker(window=5, redis_client=redis_client)
+        assert tracker.wrote_recently("user-1") is True
+
+        tracker.record_write("user-1")
+        redis_client.set.assert_called_once()
+        assert redis_client.set.call_args.kwargs["px"] == 5000
+
+    def test_redis_failure_uses_primary(self):
+        """Test reads go to the primary when Redis can not be reached"""
+        redis_client = MagicMock()
+        redis_client.exists.side_effect = ConnectionError("down")
+        tracker = WriteTracker(window=5, redis_client=redis_client)
+        assert tracker.wrote_recently("user-1") is True
+
+    def test_user_key_from_token(self):
+        """Test malformed or missing tokens yield no user key"""
+        assert user_key_from_token(None) is None
+        assert user_key_from_token("Basic abc") is None
+        assert user_key_from_token("Bearer not-a-jwt") is None
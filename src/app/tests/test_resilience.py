@@ -0,0 +1,112 @@
+"""
+Test cases for external service timeouts and circuit breakers
+"""
+
+import threading
+import time
+
+import pytest
+from src.app.utils.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitOpenError,
+    Dependency,
+    DependencyTimeout,
+)
+
+
+def failing():
+    raise ConnectionError("provider down")
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the breaker opens at the threshold and then rejects without calling"""
+        dependency = Dependency("test", timeout=1, failure_threshold=2, reset_timeout=60)
+        calls = []
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                dependency.call(failing)
+        assert dependency.state == OPEN
+
+        with pytest.raises(CircuitOpenError):
+            dependency.call(lambda: calls.append(1))
+        assert calls == []
+        assert dependency.snapshot()["rejected"] == 1
+
+    def test_success_resets_the_failure_count(self):
+        """Test only consecutive failures count"""
+        dependency = Dependency("test", timeout=1, failure_threshold=2, reset_timeout=60)
+        with pytest.raises(ConnectionError):
+            dependency.call(failing)
+        assert dependency.call(lambda: "ok") == "ok"
+        with pytest.raises(ConnectionError):
+            dependency.call(failing)
+        assert dependency.state == CLOSED
+
+    def test_half_open_probe(self):
+        """Test one probe is let through after the reset timeout"""
+        dependency = Dependency("test", timeout=1, failure_threshold=1, reset_timeout=0.05)
+        with pytest.raises(ConnectionError):
+            dependency.call(failing)
+        assert dependency.state == OPEN
+
+        time.sleep(0.06)
+        assert dependency.state == HALF_OPEN
+        # A failed probe opens it again straight away
+        with pytest.raises(ConnectionError):
+            dependency.call(failing)
+        assert dependency.state == OPEN
+
+        time.sleep(0.06)
+        assert dependency.call(lambda: "ok") == "ok"
+        assert dependency.state == CLOSED
+
+    def test_ignored_errors_do_not_open_the_breaker(self):
+        """Test errors the predicate rejects are re-raised but not counted"""
+        dependency = Dependency(
+            "test", timeout=1, failure_threshold=1,
+            is_failure=lambda error: not isinstance(error, ValueError)
+        )
+
+        def bad_request():
+            raise ValueError("wrong code")
+
+        with pytest.raises(ValueError):
+            dependency.call(bad_request)
+        assert dependency.state == CLOSED
+
+
+class TestTimeouts:
+    """Test per-call deadlines and the concurrency cap"""
+
+    def test_slow_call_times_out(self):
+        """Test the caller is released after the timeout and it counts as a failure"""
+        dependency = Dependency("test", timeout=0.05, failure_threshold=1)
+        release = threading.Event()
+
+        started = time.monotonic()
+        with pytest.raises(DependencyTimeout):
+            dependency.call(release.wait, 5)
+        assert time.monotonic() - started < 1
+        assert dependency.state == OPEN
+        assert dependency.snapshot()["timeouts"] == 1
+        release.set()
+
+    def test_calls_beyond_concurrency_fail_fast(self):
+        """Test a saturated dependency rejects new calls instead of queueing them"""
+        dependency = Dependency("test", timeout=0.05, failure_threshold=10, max_concurrency=1)
+        release = threading.Event()
+
+        with pytest.raises(DependencyTimeout):
+            dependency.call(release.wait, 5)
+        # The first call still holds the only thread
+        started = time.monotonic()
+        with pytest.raises(DependencyTimeout):
+            dependency.call(lambda: "ok")
+        assert time.monotonic() - started < 0.05
+        release.set()
@@ -0,0 +1,39 @@
+"""
+Test cases for the orjson-backed list responses
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+from fastapi.encoders import jsonable_encoder
+from src.app.utils.responses import fast_response
+
+
+class TestFastResponse:
+    """Test fast_response matches the jsonable_encoder output"""
+
+    def test_envelope_and_native_types(self):
+        """Test UUIDs, datetimes and decimals encode like the default path"""
+        data = {
+            "records": [{
+                "uuid": uuid4(),
+                "created_at": datetime(2025, 7, 1, 9, 30, 15, 120000),
+                "start_date": date(2025, 7, 1),
+                "amount": Decimal("1250.50"),
+                "count": Decimal("3"),
+            }],
+            "total_count": 1,
+        }
+        response = fast_response(data=data, message="ok")
+
+        assert response.status_code == 200
+        assert response.media_type == "application/json"
+        expected = jsonable_encoder({"data": data, "message": "ok", "status_code": 200})
+        assert json.loads(response.body) == expected
+
+    def test_error_status_in_body(self):
+        """Test the outcome is carried in the body status_code"""
+        response = fast_response(data=None, message="failed", status_code=500)
+        assert response.status_code == 200
+        assert json.loads(response.body)["status_code"] == 500
@@ -0,0 +1,126 @@
+"""
+Test cases for the uploads/database cross-check script
+"""
+
+import argparse
+import csv
+import os
+import time
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.app.database.models import CompanyInfo, KhatabookFile, PaymentFile
+from src.app.schemas.constants import KHATABOOK_FOLDER
+from src.scripts import scan_uploads
+from src.scripts.scan_uploads import normalise
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch, db_session):
+    """Empty working directory for the script, which reads the test database"""
+    monkeypatch.chdir(tmp_path)
+    # The script rolls back after reading; keep that to a savepoint of the test transaction
+    monkeypatch.setattr(scan_uploads, "SessionLocal", lambda: Session(
+        bind=db_session.connection(), join_transaction_mode="create_savepoint"
+    ))
+    return db_session
+
+
+def write_file(path, age=7200):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+    old = time.time() - age
+    os.utime(path, (old, old))
+
+
+def scan(**options):
+    """Run the script and return the rows of its report by kind"""
+    args = argparse.Namespace(
+        workers=2, batch_size=2, report="scan.csv", quarantine=None,
+        checkpoint=None, min_age=3600.0, exclude=["play_store"],
+    )
+    vars(args).update(options)
+    scan_uploads.main(args)
+    rows = {"missing": [], "orphan": []}
+    with open("scan.csv", newline="") as f:
+        for row in csv.DictReader(f):
+            rows[row["kind"]].append(row)
+    return rows
+
+
+class TestNormalise:
+    """Test stored file references are mapped to paths on disk"""
+
+    def test_stored_formats(self):
+        """Test URLs, bare names, store blobs and leading slashes"""
+        assert normalise("https://api.example.com/uploads/company/logo.png") == "uploads/company/logo.png"
+        assert normalise("receipt.jpg", KHATABOOK_FOLDER) == "uploads/khatabook_files/receipt.jpg"
+        assert normalise("uploads/store/3f/a2/3fa2e1.pdf", KHATABOOK_FOLDER) == "uploads/store/3f/a2/3fa2e1.pdf"
+        assert normalise("uploads/store/3f/a2/3fa2e1.pdf") == "uploads/store/3f/a2/3fa2e1.pdf"
+        assert normalise("/uploads/payments/a.jpg") == "uploads/payments/a.jpg"
+        assert normalise("uploads/payments//./a.jpg") == "uploads/payments/a.jpg"
+
+
+class TestScanUploads:
+    """Test missing file and orphan detection on a temporary tree"""
+
+    def test_missing_and_orphans(self, uploads):
+        """Test every reference format is matched and only unreferenced files are orphans"""
+        for path in (
+            "uploads/payments/a.jpg",
+            "uploads/khatabook_files/receipt.jpg",
+            "uploads/store/3f/a2/3fa2e1.pdf",
+            "uploads/company/logo.png",
+            "uploads/payments/orphan.jpg",
+            "uploads/variants/thumb/payments/a.webp",
+            "uploads/play_store/app.apk",
+        ):
+            write_file(path)
+        uploads.add_all([
+            PaymentFile(payment_id=uuid4(), file_path="uploads/payments/a.jpg"),
+            PaymentFile(payment_id=uuid4(), file_path="uploads/payments/gone.jpg"),
+            KhatabookFile(khatabook_id=uuid4(), file_path="receipt.jpg"),
+            KhatabookFile(khatabook_id=uuid4(), file_path="uploads/store/3f/a2/3fa2e1.pdf"),
+            CompanyInfo(logo_photo_url="https://api.example.com/uploads/company/logo.png"),
+        ])
+        uploads.commit()
+
+        rows = scan()
+
+        assert [(row["table"], row["path"]) for row in rows["missing"]] == [
+            ("payment_files", "uploads/payments/gone.jpg"),
+        ]
+        assert [row["path"] for row in rows["orphan"]] == ["uploads/payments/orphan.jpg"]
+
+    def test_recent_files_are_not_orphans(self, uploads, capsys):
+        """Test files younger than --min-age are skipped"""
+        write_file("uploads/payments/old.jpg")
+        write_file("uploads/payments/new.jpg", age=60)
+
+        rows = scan(min_age=3600.0)
+
+        assert [row["path"] for row in rows["orphan"]] == ["uploads/payments/old.jpg"]
+        assert "recent_skipped=1" in capsys.readouterr().out
+        assert len(scan(min_age=0)["orphan"]) == 2
+
+    def test_checkpoint_resume(self, uploads, tmp_path):
+        """Test finished directories are skipped and the rest are quarantined and recorded"""
+        write_file("uploads/payments/orphan.jpg")
+        write_file("uploads/invoices/orphan.pdf")
+        with open("scan.checkpoint", "w") as f:
+            f.write("uploads/payments\n")
+
+        rows = scan(quarantine=str(tmp_path / "quarantine"), checkpoint="scan.checkpoint")
+
+        assert [row["path"] for row in rows["orphan"]] == ["uploads/invoices/orphan.pdf"]
+        assert os.path.exists("uploads/payments/orphan.jpg")
+        assert not os.path.exists("uploads/invoices/orphan.pdf")
+        assert os.path.exists(tmp_path / "quarantine" / "invoices" / "orphan.pdf")
+        with open("scan.checkpoint") as f:
+            assert sorted(f.read().split()) == ["uploads", "uploads/invoices", "uploads/payments"]
+
+        # Run to completion: nothing is left to do
+        assert scan(checkpoint="scan.checkpoint")["orphan"] == []
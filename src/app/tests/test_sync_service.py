@@ -0,0 +1,150 @@
+"""
+Test cases for the delta sync helpers and the /sync endpoint
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.app.database.models import Item, Khatabook, Payment, Person, SyncTombstone
+from src.app.services.khatabook_service import hard_delete_khatabook_entry_service
+from src.app.services.payment_service import delete_item
+from src.app.services.sync_service import WATERMARK_OVERLAP, split_changes, tombstones_since
+
+
+class TestSplitChanges:
+    """Test splitting changed rows into upserts and deletions"""
+
+    def test_soft_deleted_rows_become_deletions(self):
+        """Test soft-deleted rows are returned as uuids only on delta syncs"""
+        live_row = SimpleNamespace(uuid=uuid.uuid4(), is_deleted=False)
+        deleted_row = SimpleNamespace(uuid=uuid.uuid4(), is_deleted=True)
+
+        live, deleted = split_changes([live_row, deleted_row], since=datetime.now())
+        assert live == [live_row]
+        assert deleted == [str(deleted_row.uuid)]
+
+        # A full snapshot has nothing to delete on the client
+        live, deleted = split_changes([live_row], since=None)
+        assert deleted == []
+
+
+class TestTombstones:
+    """Test hard-delete tombstones"""
+
+    def test_tombstones_since_watermark(self):
+        """Test only tombstones of the entity newer than the watermark are returned"""
+        engine = create_engine("sqlite://")
+        SyncTombstone.__table__.create(engine)
+        now = datetime.now()
+        old_uuid, new_uuid, other_uuid = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        with Session(engine) as db:
+            db.add_all([
+                SyncTombstone(entity="item", entity_uuid=old_uuid, deleted_at=now - timedelta(hours=1)),
+                SyncTombstone(entity="item", entity_uuid=new_uuid, deleted_at=now),
+                SyncTombstone(entity="khatabook", entity_uuid=other_uuid, deleted_at=now),
+            ])
+            db.commit()
+
+            assert tombstones_since(db, "item", now - timedelta(minutes=5)) == [str(new_uuid)]
+            assert tombstones_since(db, "item", None) == []
+
+
+@pytest.fixture
+def utc_clock(monkeypatch):
+    """
+    SQLite's CURRENT_TIMESTAMP (updated_at, deleted_at) is always UTC while
+    the watermark is local time; on Postgres both follow the session zone.
+    """
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+class TestSyncEndpoint:
+    """Test /sync end to end: snapshot, changes and deletions since the watermark"""
+
+    def sync(self, client, headers, since=None):
+        params = {"since": since} if since else {}
+        body = client.get("/sync", params=params, headers=headers).json()
+        assert body["status_code"] == 200, body["message"]
+        return body["data"]
+
+    def uuids(self, section):
+        return sorted(record["uuid"] for record in section["upserted"])
+
+    def test_changes_since_watermark(self, utc_clock, client, db_session, auth_headers,
+                                     test_user, test_admin_user, test_project, test_person):
+        """Test a site engineer syncs only what they can see, including deletions"""
+        own_person = Person(
+            name="Test User", account_number="1111222233334444", ifsc_code="TEST0005678",
+            phone_number="9876543210", user_id=test_user.uuid,
+        )
+        db_session.add(own_person)
+
+        def payment(created_by):
+            return Payment(
+                amount=100.0, project_id=test_project.uuid, created_by=created_by,
+                status="requested", person=test_person.uuid, latitude=0.0, longitude=0.0,
+            )
+
+        def entry(created_by):
+            return Khatabook(
+                amount=50.0, person_id=test_person.uuid, created_by=created_by, is_suspicious=False
+            )
+
+        own_payment, other_payment = payment(test_user.uuid), payment(test_admin_user.uuid)
+        soft_deleted, hard_deleted, other_entry = (
+            entry(test_user.uuid), entry(test_user.uuid), entry(test_admin_user.uuid)
+        )
+        deleted_item = Item(name="Cement")
+        db_session.add_all([own_payment, other_payment, soft_deleted, hard_deleted, other_entry, deleted_item])
+        db_session.commit()
+
+        # Everything so far was written long before the first sync...
+        hour_ago = datetime.now() - timedelta(hours=1)
+        for model in (Payment, Khatabook, Item, Person):
+            db_session.query(model).update({model.updated_at: hour_ago})
+        # ...except this item, written just before it
+        recent_item = Item(name="Sand")
+        db_session.add(recent_item)
+        db_session.commit()
+
+        snapshot = self.sync(client, auth_headers)
+
+        assert self.uuids(snapshot["payments"]) == [str(own_payment.uuid)]
+        assert self.uuids(snapshot["khatabook"]) == sorted([str(soft_deleted.uuid), str(hard_deleted.uuid)])
+        assert self.uuids(snapshot["items"]) == sorted([str(deleted_item.uuid), str(recent_item.uuid)])
+        assert self.uuids(snapshot["persons"]) == [str(test_person.uuid)]
+        watermark = datetime.fromisoformat(snapshot["watermark"])
+        assert abs(datetime.now() - WATERMARK_OVERLAP - watermark) < timedelta(seconds=5)
+
+        new_payment = payment(test_user.uuid)
+        db_session.add(new_payment)
+        soft_deleted.is_deleted = True
+        other_payment.is_deleted = True
+        test_person.upi_number = "9876543212@upi"
+        own_person.upi_number = "9876543210@upi"
+        db_session.commit()
+        assert hard_delete_khatabook_entry_service(db_session, hard_deleted.uuid) is True
+        assert delete_item(deleted_item.uuid, db=db_session)["status_code"] == 200
+
+        changes = self.sync(client, auth_headers, since=snapshot["watermark"])
+
+        assert self.uuids(changes["payments"]) == [str(new_payment.uuid)]
+        # Another user's payment is out of scope, deleted or not
+        assert changes["payments"]["deleted"] == []
+        assert changes["khatabook"]["upserted"] == []
+        assert sorted(changes["khatabook"]["deleted"]) == sorted([str(soft_deleted.uuid), str(hard_deleted.uuid)])
+        # Written inside the overlap before the first sync, so sent again
+        assert self.uuids(changes["items"]) == [str(recent_item.uuid)]
+        assert changes["items"]["deleted"] == [str(deleted_item.uuid)]
+        assert self.uuids(changes["persons"]) == [str(test_person.uuid)]
+        assert changes["persons"]["deleted"] == []
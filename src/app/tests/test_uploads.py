@@ -0,0 +1,75 @@
+"""
+Test cases for the streaming upload writer
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from src.app.database.database import settings
+from src.app.utils.uploads import (
+    UploadTooLarge,
+    safe_extension,
+    save_upload,
+    upload_size_error,
+)
+
+
+class CountingFile(io.BytesIO):
+    """BytesIO remembering the largest read it served"""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+def make_upload(content: bytes, filename="photo.jpg", size=None):
+    return UploadFile(file=CountingFile(content), filename=filename, size=size)
+
+
+class TestSaveUpload:
+    """Test writing uploads to disk"""
+
+    def test_streams_in_chunks_and_hashes(self, tmp_path, monkeypatch):
+        """Test the file is copied chunk by chunk with its SHA-256"""
+        monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 1024)
+        content = os.urandom(10 * 1024 + 7)
+        upload = make_upload(content)
+
+        stored = save_upload(upload, str(tmp_path), prefix="Test_")
+
+        assert stored.filename.startswith("Test_") and stored.filename.endswith(".jpg")
+        assert stored.size == len(content)
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+        with open(stored.path, "rb") as f:
+            assert f.read() == content
+        assert upload.file.largest_read == 1024
+
+    def test_too_large_leaves_nothing_behind(self, tmp_path):
+        """Test an oversized upload is rejected and no partial file remains"""
+        with pytest.raises(UploadTooLarge):
+            save_upload(make_upload(b"x" * 2048), str(tmp_path), max_bytes=1024)
+        assert os.listdir(tmp_path) == []
+
+    def test_client_filename_can_not_choose_the_path(self, tmp_path):
+        """Test only a sanitised extension of the client's filename is used"""
+        stored = save_upload(make_upload(b"data", filename="../../etc/passwd"), str(tmp_path))
+        assert os.path.dirname(stored.path) == str(tmp_path)
+        assert safe_extension("../../evil.sh;rm -rf") == ""
+        assert safe_extension("invoice.PDF") == ".PDF"
+
+
+class TestUploadSizeError:
+    """Test rejecting oversized uploads before any work is done"""
+
+    def test_reports_known_oversized_uploads(self):
+        """Test the declared size is checked against the limit"""
+        small = make_upload(b"", filename="a.jpg", size=10)
+        large = make_upload(b"", filename="b.jpg", size=5000)
+        assert upload_size_error([small, None], max_bytes=1024) is None
+        assert "b.jpg" in upload_size_error([small, large], max_bytes=1024)
@@ -0,0 +1,64 @@
+"""
+Test cases for the working-day calendar
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.database.database import get_db
+from src.app.services.attendance_endpoints import attendance_router
+from src.app.services.auth_service import get_current_user
+from src.app.utils.attendance_utils import get_working_days_in_month, get_working_days_up_to_date
+from src.app.utils.working_calendar import WorkingCalendar
+
+
+def count_day_by_day(start, end, holidays=()):
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    return sum(1 for day in days if day.weekday() != 6 and day not in holidays)
+
+
+class TestWorkingCalendar:
+    """Test working-day counts"""
+
+    def test_matches_day_by_day_count(self):
+        """Test ranges within a year and across years, leap years included"""
+        holidays = {date(2024, 1, 26), date(2024, 8, 15), date(2025, 1, 26), date(2024, 12, 29)}
+        working_calendar = WorkingCalendar(holidays)
+        for start, end in [
+            (date(2024, 1, 1), date(2024, 12, 31)),
+            (date(2024, 2, 28), date(2024, 3, 1)),
+            (date(2023, 11, 15), date(2026, 2, 3)),
+            (date(2024, 8, 15), date(2024, 8, 15)),
+        ]:
+            assert working_calendar.working_days(start, end) == count_day_by_day(start, end, holidays)
+        assert working_calendar.working_days(date(2024, 2, 1), date(2024, 1, 1)) == 0
+
+    def test_holidays(self):
+        """Test holidays are days off, and a holiday on a Sunday changes nothing"""
+        # January 2024: 27 working days without holidays
+        assert get_working_days_in_month(2024, 1, [date(2024, 1, 26)]) == 26
+        assert get_working_days_in_month(2024, 1, [date(2024, 1, 7)]) == 27
+        assert get_working_days_up_to_date(date(2024, 1, 27), [date(2024, 1, 26)]) == 23
+
+        working_calendar = WorkingCalendar([date(2024, 1, 26)])
+        assert not working_calendar.is_working_day(date(2024, 1, 26))
+        assert not working_calendar.is_working_day(date(2024, 1, 28))
+        assert working_calendar.is_working_day(date(2024, 1, 27))
+
+
+class TestHolidayEndpoints:
+    """Test the holiday endpoints' parameter validation"""
+
+    def test_out_of_range_year(self):
+        """Test years outside the calendar fail validation instead of erroring"""
+        app = FastAPI()
+        app.include_router(attendance_router)
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+        app.dependency_overrides[get_current_user] = lambda: MagicMock()
+        client = TestClient(app)
+
+        for year in (0, 10000):
+            assert client.get(f"/attendance/holidays?year={year}").status_code == 422
@@ -0,0 +1,100 @@
+"""
+Test cases for streamed ZIP archives and the project documents bundle
+"""
+
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime
+
+from src.app.database.database import get_db
+from src.app.main import app
+from src.app.services import project_service
+from src.app.services.project_documents import ProjectDocument, document_sources
+from src.app.utils import zip_stream
+from src.app.utils.zip_stream import ZipSource, stream_zip
+
+
+class TestStreamZip:
+    """Test writing archives chunk by chunk"""
+
+    def test_archive_round_trips(self, tmp_path, monkeypatch):
+        """Test small, large and in-memory entries all land in a valid ZIP"""
+        monkeypatch.setattr(zip_stream, "READ_AHEAD_MAX_BYTES", 1000)
+        small = tmp_path / "small.pdf"
+        small.write_bytes(b"receipt")
+        large = tmp_path / "large.jpg"
+        large.write_bytes(os.urandom(5000))
+        when = datetime(2025, 3, 4, 10, 30)
+
+        chunks = list(stream_zip([
+            ZipSource("a/small.pdf", when, path=str(small)),
+            ZipSource("b/large.jpg", when, path=str(large)),
+            ZipSource("c/gone.jpg", when, path=str(tmp_path / "gone.jpg")),
+            ZipSource("notes.txt", when, data=b"notes"),
+        ], read_ahead=2))
+
+        assert len(chunks) > 3
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert archive.namelist() == ["a/small.pdf", "b/large.jpg", "notes.txt"]
+            assert archive.read("b/large.jpg") == large.read_bytes()
+            assert archive.read("notes.txt") == b"notes"
+            assert archive.getinfo("a/small.pdf").date_time == (2025, 3, 4, 10, 30, 0)
+
+
+class TestDocumentSources:
+    """Test the layout of the project documents bundle"""
+
+    def test_layout_and_manifest(self, tmp_path):
+        """Test files are grouped by type and month and missing ones are listed"""
+        receipt = tmp_path / "r.JPG"
+        receipt.write_bytes(b"x")
+        documents = [
+            ProjectDocument("payments", datetime(2025, 3, 20), "payment_1a2b_150", str(receipt), "payment 1"),
+            ProjectDocument("payments", datetime(2025, 3, 20), "payment_1a2b_150", str(receipt), "payment 1"),
+            ProjectDocument("invoices", datetime(2025, 4, 1), "INV 7/25", str(tmp_path / "no.pdf"), "invoice 2"),
+        ]
+
+        sources = list(document_sources(documents))
+
+        assert [source.arcname for source in sources] == [
+            "payments/2025-03/2025-03-20_payment_1a2b_150.jpg",
+            "payments/2025-03/2025-03-20_payment_1a2b_150_2.jpg",
+            "manifest.csv",
+        ]
+        rows = list(csv.reader(io.StringIO(sources[-1].data.decode())))
+        assert rows[-1] == ["invoices", "2025-04-01", "invoice 2", str(tmp_path / "no.pdf"), "missing"]
+
+
+class TestDocumentsDownload:
+    """Test the documents.zip endpoint releases its sessions before streaming"""
+
+    def test_sessions_closed_before_streaming(self, client, db_session, test_project,
+                                              admin_auth_headers, monkeypatch):
+        """Test every database session is closed before the first ZIP byte"""
+        events = []
+
+        def tracked_get_db():
+            index = len([event for event in events if event.startswith("open")])
+            events.append(f"open{index}")
+            try:
+                yield db_session
+            finally:
+                events.append(f"close{index}")
+
+        def tracked_sources(documents):
+            events.append("stream")
+            yield from document_sources(documents)
+
+        app.dependency_overrides[get_db] = tracked_get_db
+        monkeypatch.setattr(project_service, "document_sources", tracked_sources)
+
+        response = client.get(
+            f"/projects/{test_project.uuid}/documents.zip", headers=admin_auth_headers
+        )
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["manifest.csv"]
+        assert events == ["open0", "close0", "stream"]
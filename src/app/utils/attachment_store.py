@@ -0,0 +1,119 @@
+"""
+Content-addressed store for payment, khatabook and invoice attachments.
+
+A file is stored once, under the SHA-256 of its content, in a two-level
+hash-prefix tree (``uploads/store/3f/a2/3fa2...e1.pdf``), so no directory
+grows past a few hundred entries and uploading the same receipt twice keeps
+one copy. The extension stays in the name so ``StaticFiles`` can still pick
+the content type; the same bytes under a different extension are a second
+blob.
+
+Blobs are never changed once written. Their reference count is the number of
+``PaymentFile``, ``KhatabookFile`` and ``Invoice`` rows (soft-deleted ones
+included, as they can be restored) whose ``file_path`` points at them;
+``remove_unreferenced`` deletes blobs nobody points at any more.
+"""
+
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.app.database.models import Invoice, KhatabookFile, PaymentFile
+from src.app.schemas.constants import ATTACHMENT_STORE_DIR
+from src.app.utils.image_variants import remove_variants, schedule_variants
+from src.app.utils.uploads import StoredUpload, safe_extension, stream_to_temp_file
+
+# Partial uploads live here, inside the store so the final rename is atomic
+STORE_TEMP_DIR = os.path.join(ATTACHMENT_STORE_DIR, ".tmp")
+
+# Columns holding store paths; each row is one reference
+REFERENCE_COLUMNS = (PaymentFile.file_path, KhatabookFile.file_path, Invoice.file_path)
+
+
+def blob_path(sha256: str, ext: str = "", root: str = ATTACHMENT_STORE_DIR) -> str:
+    return os.path.join(root, sha256[:2], sha256[2:4], f"{sha256}{ext.lower()}")
+
+
+def is_store_path(path: Optional[str]) -> bool:
+    return bool(path) and path.startswith(ATTACHMENT_STORE_DIR + "/")
+
+
+def add_blob(temp_path: str, sha256: str, ext: str = "", root: str = ATTACHMENT_STORE_DIR) -> str:
+    """
+    Move a complete file into the store and return its path. If the content
+    is already stored the file is dropped and the existing blob is reused;
+    its mtime is refreshed so ``remove_unreferenced`` gives it the same grace
+    period as a new blob until the reusing row commits.
+    """
+    path = blob_path(sha256, ext, root)
+    try:
+        if os.path.exists(path):
+            try:
+                os.utime(path, None)
+            except FileNotFoundError:
+                # Collected in the meantime: store this copy instead
+                pass
+            else:
+                os.remove(temp_path)
+                return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Two concurrent uploads of the same bytes both land on identical content
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+def store_upload(upload: UploadFile, max_bytes: Optional[int] = None) -> StoredUpload:
+    """Stream ``upload`` into the store; see ``save_upload`` for the limits."""
+    temp_path, size, sha256 = stream_to_temp_file(upload, STORE_TEMP_DIR, max_bytes)
+    path = add_blob(temp_path, sha256, safe_extension(upload.filename))
+    schedule_variants(path)
+    return StoredUpload(path=path, filename=os.path.basename(path), size=size, sha256=sha256)
+
+
+def reference_counts(db: Session, paths: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Number of rows pointing at each store path (only paths with references)."""
+    counts: Counter = Counter()
+    paths = list(paths) if paths is not None else None
+    for column in REFERENCE_COLUMNS:
+        query = db.query(column, func.count()).group_by(column)
+        if paths is None:
+            query = query.filter(column.like(f"{ATTACHMENT_STORE_DIR}/%"))
+        else:
+            query = query.filter(column.in_(paths))
+        for path, count in query:
+            counts[path] += count
+    return dict(counts)
+
+
+def remove_unreferenced(
+    db: Session,
+    root: str = ATTACHMENT_STORE_DIR,
+    min_age: float = 3600.0,
+    dry_run: bool = False,
+) -> List[str]:
+    """
+    Delete blobs no row references. Blobs younger than ``min_age`` seconds are
+    kept: their upload's transaction may not have committed yet.
+    """
+    referenced = set(reference_counts(db))
+    cutoff = time.time() - min_age
+    removed = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if path in referenced or os.path.getmtime(path) > cutoff:
+                continue
+            if not dry_run:
+                os.remove(path)
+                remove_variants(path)
+            removed.append(path)
+    return removed
@@ -4,66 +4,49 @@ Attendance utility functions for calculating working days, analytics, and other
 
 import calendar
 from datetime import date, datetime, timedelta
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 from src.app.utils.logging_config import get_logger
+from src.app.utils.working_calendar import WorkingCalendar
 
 logger = get_logger(__name__)
 
 
-def get_working_days_in_month(year: int, month: int) -> int:
+def get_working_days_in_month(year: int, month: int, holidays: Iterable[date] = ()) -> int:
     """
     Calculate the number of working days in a given month.
-    Working days exclude only Sundays (6-day work week: Monday to Saturday).
+    Working days exclude Sundays (6-day work week: Monday to Saturday) and
+    the given holidays.
 
     Args:
         year (int): The year
         month (int): The month (1-12)
+        holidays (Iterable[date]): Days off besides Sundays, see load_month_holidays
 
     Returns:
         int: Number of working days in the month
     """
     try:
-        # Get the number of days in the month
-        days_in_month = calendar.monthrange(year, month)[1]
-
-        working_days = 0
-        for day in range(1, days_in_month + 1):
-            current_date = date(year, month, day)
-            # Monday = 0, Sunday = 6
-            # Only Sunday (6) is a holiday, Monday to Saturday (0-5) are working days
-            if current_date.weekday() != 6:  # Monday to Saturday
-                working_days += 1
-
-        return working_days
+        return WorkingCalendar(holidays).working_days_in_month(year, month)
     except Exception as e:
         logger.error(f"Error calculating working days for {year}-{month}: {str(e)}")
         return 0
 
 
-def get_working_days_up_to_date(target_date: date) -> int:
+def get_working_days_up_to_date(target_date: date, holidays: Iterable[date] = ()) -> int:
     """
     Calculate the number of working days from the start of the month up to the target date (inclusive).
-    Working days exclude only Sundays (6-day work week: Monday to Saturday).
+    Working days exclude Sundays (6-day work week: Monday to Saturday) and
+    the given holidays.
 
     Args:
         target_date (date): The target date
+        holidays (Iterable[date]): Days off besides Sundays, see load_month_holidays
 
     Returns:
         int: Number of working days from start of month to target date
     """
     try:
-        year = target_date.year
-        month = target_date.month
-
-        working_days = 0
-        for day in range(1, target_date.day + 1):
-            current_date = date(year, month, day)
-            # Monday = 0, Sunday = 6
-            # Only Sunday (6) is a holiday, Monday to Saturday (0-5) are working days
-            if current_date.weekday() != 6:  # Monday to Saturday
-                working_days += 1
-
-        return working_days
+        return WorkingCalendar(holidays).working_days_up_to(target_date)
     except Exception as e:
         logger.error(f"Error calculating working days up to {target_date}: {str(e)}")
         return 0
@@ -186,51 +169,74 @@ def get_month_date_range(year: int, month: int) -> Tuple[date, date]:
         raise ValueError(f"Invalid year or month: {year}-{month}")
 
 
-def is_working_day(check_date: date) -> bool:
+def get_months_in_range(start_month: int, start_year: int, end_month: int, end_year: int) -> List[Tuple[int, int]]:
     """
-    Check if a given date is a working day (Monday to Saturday).
-    Only Sundays are considered holidays in a 6-day work week.
+    List the months from start to end (both included).
+
+    Args:
+        start_month (int): First month (1-12)
+        start_year (int): Year of the first month
+        end_month (int): Last month (1-12)
+        end_year (int): Year of the last month
+
+    Returns:
+        List[Tuple[int, int]]: (year, month) pairs in order, empty if end is before start
+    """
+    first = start_year * 12 + start_month - 1
+    last = end_year * 12 + end_month - 1
+    return [(index // 12, index % 12 + 1) for index in range(first, last + 1)]
+
+
+def is_working_day(check_date: date, holidays: Iterable[date] = ()) -> bool:
+    """
+    Check if a given date is a working day (Monday to Saturday and not a holiday).
+    Sundays are off in a 6-day work week.
 
     Args:
         check_date (date): The date to check
+        holidays (Iterable[date]): Days off besides Sundays
 
     Returns:
         bool: True if it's a working day, False otherwise
     """
     try:
-        # Monday = 0, Sunday = 6
-        # Only Sunday (6) is a holiday, Monday to Saturday (0-5) are working days
-        return check_date.weekday() != 6
+        return WorkingCalendar(holidays).is_working_day(check_date)
     except Exception as e:
         logger.error(f"Error checking if {check_date} is a working day: {str(e)}")
         return False
 
 
-def get_current_month_working_days() -> int:
+def get_current_month_working_days(holidays: Iterable[date] = ()) -> int:
     """
     Get the number of working days in the current month.
-    
+
+    Args:
+        holidays (Iterable[date]): Days off besides Sundays
+
     Returns:
         int: Number of working days in current month
     """
     try:
         today = date.today()
-        return get_working_days_in_month(today.year, today.month)
+        return get_working_days_in_month(today.year, today.month, holidays)
     except Exception as e:
         logger.error(f"Error getting current month working days: {str(e)}")
         return 0
 
 
-def get_current_month_working_days_up_to_today() -> int:
+def get_current_month_working_days_up_to_today(holidays: Iterable[date] = ()) -> int:
     """
     Get the number of working days from the start of current month up to today.
-    
+
+    Args:
+        holidays (Iterable[date]): Days off besides Sundays
+
     Returns:
         int: Number of working days from start of current month to today
     """
     try:
         today = date.today()
-        return get_working_days_up_to_date(today)
+        return get_working_days_up_to_date(today, holidays)
     except Exception as e:
         logger.error(f"Error getting current month working days up to today: {str(e)}")
         return 0
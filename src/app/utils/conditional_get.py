@@ -0,0 +1,95 @@
+"""
+Conditional GET for list endpoints.
+
+``list_etag(tables)`` is a route dependency. It builds a weak ETag from the
+change counters of the tables the list reads, the caller's identity and role
+(their visibility scope) and the query string. When the request's
+``If-None-Match`` matches, it answers ``304 Not Modified`` before the handler
+runs any of its list queries. Otherwise the handler receives the ETag and
+passes ``etag_headers(etag)`` to its successful response; error responses
+carry no ETag, so clients never revalidate against an error. Nor do lists
+whose tables have a failed counter bump pending (see change_counters.py).
+"""
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.database.change_counters import bump_after_commit, pending_bumps, read_change_counters
+from src.app.database.database import get_async_db
+from src.app.database.models import User
+from src.app.services.auth_service import get_current_user_async
+
+
+def compute_etag(versions: dict, scope: str, query: str) -> str:
+    """Weak ETag over table versions, visibility scope and request filters."""
+    parts = [f"{name}={version}" for name, version in sorted(versions.items())]
+    parts += [scope, query]
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def etag_headers(etag: Optional[str]) -> dict:
+    """Headers for a successful list response; clients must revalidate each time."""
+    if not etag:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+async def _check_etag(request: Request, db: AsyncSession, tables: tuple, scope: str) -> Optional[str]:
+    if pending_bumps(tables):
+        flushed = await db.run_sync(lambda session: bump_after_commit(session.bind, ()))
+        if not flushed:
+            # The counters miss a committed write: no 304, and no ETag to revalidate
+            return None
+    versions = await db.run_sync(lambda session: read_change_counters(session, tables))
+    etag = compute_etag(versions, scope, str(request.url.query))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=etag_headers(etag))
+    return etag
+
+
+def list_etag(tables: Iterable[str], per_user: bool = True):
+    """
+    Dependency returning the list ETag, or raising 304 when the client is
+    current. With ``per_user`` the caller's uuid and role are part of the
+    ETag; public lists pass ``per_user=False``.
+    """
+    tables = tuple(tables)
+
+    if not per_user:
+        async def public_dependency(
+            request: Request,
+            db: AsyncSession = Depends(get_async_db),
+        ) -> Optional[str]:
+            return await _check_etag(request, db, tables, scope="public")
+
+        return public_dependency
+
+    async def user_dependency(
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user_async),
+    ) -> Optional[str]:
+        # Unauthenticated requests get the handler's own error response
+        if not isinstance(current_user, User):
+            return None
+        return await _check_etag(
+            request, db, tables, scope=f"{current_user.uuid}:{current_user.role}"
+        )
+
+    return user_dependency
@@ -0,0 +1,62 @@
+"""
+Date-range filters that can use an index on the filtered column.
+
+Filtering with ``extract('month', column) == month`` hides the column inside
+a function, so the database has to evaluate it for every row. These helpers
+turn day, month and from/to parameters into a half-open range and filter
+with ``column >= start AND column < end``, which an index on the column (or
+one that starts with the other filtered columns and ends with it) can
+answer directly.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import DateTime
+
+
+class DateRange(NamedTuple):
+    """Dates from ``start`` (included) to ``end`` (excluded); ``None`` is unbounded."""
+    start: Optional[date]
+    end: Optional[date]
+
+
+def day_range(day: date) -> DateRange:
+    return DateRange(day, day + timedelta(days=1))
+
+
+def month_range(year: int, month: int) -> DateRange:
+    days_in_month = calendar.monthrange(year, month)[1]
+    return DateRange(date(year, month, 1), date(year, month, days_in_month) + timedelta(days=1))
+
+
+def latest_month_range(month: int, today: Optional[date] = None) -> DateRange:
+    """The most recent ``month`` that has started, this year or last year."""
+    today = today or date.today()
+    year = today.year if month <= today.month else today.year - 1
+    return month_range(year, month)
+
+
+def inclusive_range(from_date: Optional[date] = None, to_date: Optional[date] = None) -> DateRange:
+    """Range for ``from_date``..``to_date`` with both days included."""
+    return DateRange(from_date, to_date + timedelta(days=1) if to_date else None)
+
+
+def date_range_filter(column, date_range: DateRange) -> List:
+    """
+    Predicates for ``date_range`` on ``column``, to be passed to ``filter()``.
+
+    Dates are compared as midnight on timestamp columns, so a day's range
+    covers the whole day.
+    """
+    start, end = date_range
+    if isinstance(column.type, DateTime):
+        start = datetime.combine(start, datetime.min.time()) if start else None
+        end = datetime.combine(end, datetime.min.time()) if end else None
+    predicates = []
+    if start is not None:
+        predicates.append(column >= start)
+    if end is not None:
+        predicates.append(column < end)
+    return predicates
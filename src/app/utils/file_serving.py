@@ -0,0 +1,91 @@
+"""
+Responses for uploaded files served by the app.
+
+``UPLOADS_SERVING`` picks how ``/uploads`` (and ``/variants``) reach the
+client:
+
+* ``static``   - the ``StaticFiles`` mount, as before.
+* ``sendfile`` - a ``FileResponse``: Range / If-Range handling, and the
+  file is handed to the server with ``http.response.pathsend`` (zero copy)
+  when the ASGI server supports it.
+* ``x-accel``  - the app only checks the request and answers with an
+  ``X-Accel-Redirect`` to nginx's internal ``UPLOADS_ACCEL_PREFIX``
+  location; nginx sends the file with sendfile and serves Range requests,
+  so no worker is held for the length of a slow download.
+
+Content-addressed store blobs get their SHA-256 as a strong ETag; they and
+the variants derived from them never change, so they are cached as
+immutable. Everything else keeps the 30 days nginx has always used.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from src.app.database.database import settings
+from src.app.utils.conditional_get import etag_matches
+
+IMMUTABLE_MAX_AGE = 31536000
+DEFAULT_MAX_AGE = 2592000
+
+_STORE_BLOB = re.compile(r"^store/[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(\.[A-Za-z0-9]{1,10})?$")
+
+
+def file_etag(name: str, stat_result: os.stat_result) -> str:
+    """Strong ETag: the content hash for store blobs, else mtime and size."""
+    match = _STORE_BLOB.match(name)
+    if match:
+        return f'"{match.group("sha256")}"'
+    digest = hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def cache_control(name: str, private: bool = False) -> str:
+    visibility = "private" if private else "public"
+    if name.startswith(("store/", "variants/")):
+        return f"{visibility}, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"{visibility}, max-age={DEFAULT_MAX_AGE}"
+
+
+def resolve_upload(name: str, root: Optional[str] = None) -> Optional[str]:
+    """Path of ``name`` under the uploads directory, or None if it is not a file there."""
+    root = os.path.realpath(root or settings.UPLOADS_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def file_response(
+    request: Request,
+    path: str,
+    name: str,
+    media_type: Optional[str] = None,
+    private: bool = False,
+) -> Response:
+    """
+    Serve ``path``, known to clients as ``/uploads/<name>``, in the configured
+    mode. Answers ``304`` when ``If-None-Match`` already holds the ETag.
+    """
+    stat_result = os.stat(path)
+    etag = file_etag(name, stat_result)
+    headers = {"ETag": etag, "Cache-Control": cache_control(name, private)}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if settings.UPLOADS_SERVING == "x-accel":
+        headers["X-Accel-Redirect"] = settings.UPLOADS_ACCEL_PREFIX.rstrip("/") + "/" + name
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
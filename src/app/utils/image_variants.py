@@ -0,0 +1,161 @@
+"""
+Thumbnails and compressed variants of uploaded photos.
+
+Every image saved through ``save_upload`` or ``store_upload`` is queued on a
+small thread pool that writes a ``thumb`` and a ``medium`` variant (WebP, or
+JPEG where Pillow lacks WebP) with the EXIF orientation applied and the
+metadata dropped. Variants mirror the original's path under
+``uploads/variants``::
+
+    uploads/store/3f/a2/3fa2...e1.jpg -> uploads/variants/store/3f/a2/3fa2...e1.jpg.thumb.webp
+
+so list APIs can build variant URLs from the stored path alone. The URLs
+point at ``GET /variants/...``, which serves the file and generates it first
+if the background job has not run yet (or the upload predates it), so a
+listed variant URL always works. Originals are only fetched when opened.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.app.database.database import settings
+from src.app.schemas import constants
+from src.app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    # Pillow is in requirements.txt; without it uploads simply get no variants
+    Image = None
+    logger.warning("Pillow not installed, image variants are disabled")
+
+UPLOADS_ROOT = "uploads"
+VARIANTS_DIR = os.path.join(UPLOADS_ROOT, "variants")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+# Longest side in pixels; images are never enlarged
+VARIANT_SIZES = {
+    "thumb": settings.IMAGE_THUMB_SIZE,
+    "medium": settings.IMAGE_MEDIUM_SIZE,
+}
+
+if Image is not None and features.check("webp"):
+    VARIANT_FORMAT, VARIANT_EXT = "WEBP", ".webp"
+else:
+    VARIANT_FORMAT, VARIANT_EXT = "JPEG", ".jpg"
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants"
+)
+
+
+def is_image(path: Optional[str]) -> bool:
+    return bool(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _relative_to_uploads(path: str) -> Optional[str]:
+    prefix = UPLOADS_ROOT + "/"
+    if not path.startswith(prefix) or path.startswith(VARIANTS_DIR + "/"):
+        return None
+    return path[len(prefix):]
+
+
+def variant_name(path: Optional[str], variant: str) -> Optional[str]:
+    """Name of ``path``'s variant relative to ``VARIANTS_DIR``, if it can have one."""
+    if Image is None or not is_image(path):
+        return None
+    relative = _relative_to_uploads(path)
+    if relative is None:
+        return None
+    return f"{relative}.{variant}{VARIANT_EXT}"
+
+
+def variant_path(path: str, variant: str) -> Optional[str]:
+    name = variant_name(path, variant)
+    return os.path.join(VARIANTS_DIR, name) if name else None
+
+
+def variant_urls(path: Optional[str]) -> Dict[str, Optional[str]]:
+    """``{"thumb": url, "medium": url}`` for an uploaded file; None for non-images."""
+    urls = {}
+    for variant in VARIANT_SIZES:
+        name = variant_name(path, variant)
+        urls[variant] = f"{constants.HOST_URL}/variants/{name}" if name else None
+    return urls
+
+
+def parse_variant_name(name: str):
+    """Reverse of ``variant_name``: ``(original_path, variant)`` or None."""
+    if Image is None or ".." in name.split("/") or name.startswith("/"):
+        return None
+    for variant in VARIANT_SIZES:
+        suffix = f".{variant}{VARIANT_EXT}"
+        if name.endswith(suffix):
+            original = os.path.join(UPLOADS_ROOT, name[:-len(suffix)])
+            if is_image(original) and _relative_to_uploads(original) is not None:
+                return original, variant
+    return None
+
+
+def generate_variants(path: str, variants: Optional[List[str]] = None, overwrite: bool = False) -> List[str]:
+    """Write the missing variants of the image at ``path``; returns the files written."""
+    variants = variants or list(VARIANT_SIZES)
+    targets = {
+        variant: variant_path(path, variant) for variant in variants
+    }
+    todo = {
+        variant: target for variant, target in targets.items()
+        if target and (overwrite or not os.path.exists(target))
+    }
+    if not todo or not os.path.isfile(path):
+        return []
+
+    written = []
+    with Image.open(path) as image:
+        # Let the JPEG decoder downscale while decoding; far faster for camera photos
+        image.draft("RGB", (max(VARIANT_SIZES[v] for v in todo),) * 2)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L") and not (VARIANT_FORMAT == "WEBP" and image.mode == "RGBA"):
+            image = image.convert("RGB")
+        # Largest first, so each smaller variant is resized from a smaller image
+        for variant in sorted(todo, key=lambda v: VARIANT_SIZES[v], reverse=True):
+            size = VARIANT_SIZES[variant]
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            target = todo[variant]
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-")
+            try:
+                with os.fdopen(fd, "wb") as buffer:
+                    image.save(buffer, format=VARIANT_FORMAT, quality=settings.IMAGE_VARIANT_QUALITY)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, target)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            written.append(target)
+    return written
+
+
+def _generate_logged(path: str):
+    try:
+        generate_variants(path)
+    except Exception as e:
+        logger.warning(f"Could not create image variants for {path}: {str(e)}")
+
+
+def schedule_variants(path: str):
+    """Create ``path``'s variants in the background if it is an image."""
+    if variant_name(path, "thumb") is not None:
+        _executor.submit(_generate_logged, path)
+
+
+def remove_variants(path: Optional[str]):
+    for variant in VARIANT_SIZES:
+        target = variant_path(path, variant) if path else None
+        if target and os.path.exists(target):
+            os.remove(target)
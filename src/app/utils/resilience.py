@@ -0,0 +1,181 @@
+"""
+Timeouts and circuit breakers for calls to external services.
+
+Each external dependency (Firebase, Twilio) gets one ``Dependency``. Calls go
+through ``Dependency.call``, which runs them on the dependency's own small
+thread pool and waits at most ``timeout`` seconds, so a slow provider can
+hold neither more than ``max_concurrency`` threads nor the caller's worker
+thread and database session for longer than the timeout.
+
+The breaker counts consecutive failures (errors and timeouts; errors the
+``is_failure`` predicate rejects, such as a provider's 4xx answers, do not
+count). After ``failure_threshold`` of them it opens and calls fail at once
+with ``CircuitOpenError``. After ``reset_timeout`` seconds it lets a single
+probe call through (half-open): success closes it, failure opens it again.
+Callers catch ``DependencyUnavailable`` to degrade instead of failing.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+from src.app.database.database import settings
+from src.app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DependencyUnavailable(Exception):
+    """The dependency was not called, or did not answer in time."""
+
+
+class CircuitOpenError(DependencyUnavailable):
+    pass
+
+
+class DependencyTimeout(DependencyUnavailable):
+    pass
+
+
+class Dependency:
+    """Timeout, bulkhead and circuit breaker for one external service."""
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_concurrency: int = 8,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix=f"dependency-{name}"
+        )
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = dict.fromkeys(
+            ("calls", "successes", "failures", "timeouts", "rejected"), 0
+        )
+        self._total_latency = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _admit(self):
+        with self._lock:
+            self._stats["calls"] += 1
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            if state == HALF_OPEN:
+                self._probing = True
+
+    def _record(self, success: bool, latency: float = 0.0, timed_out: bool = False):
+        with self._lock:
+            self._probing = False
+            if success:
+                self._stats["successes"] += 1
+                self._total_latency += latency
+                self._consecutive_failures = 0
+                if self._state != CLOSED:
+                    logger.info(f"{self.name} circuit closed")
+                self._state = CLOSED
+                return
+            self._stats["timeouts" if timed_out else "failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(
+                        f"{self.name} circuit opened after {self._consecutive_failures} failures"
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _run(self, fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Call ``fn(*args, **kwargs)`` under the breaker; see the module docstring."""
+        self._admit()
+        if not self._slots.acquire(blocking=False):
+            # Every thread is stuck on earlier calls; treat like a timeout
+            self._record(success=False, timed_out=True)
+            raise DependencyTimeout(f"{self.name} has too many calls in flight")
+
+        started = time.monotonic()
+        future = self._executor.submit(self._run, fn, args, kwargs)
+        try:
+            result = future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            self._record(success=False, timed_out=True)
+            raise DependencyTimeout(f"{self.name} did not answer within {timeout or self.timeout}s")
+        except Exception as e:
+            if self.is_failure(e):
+                self._record(success=False)
+            else:
+                self._record(success=True, latency=time.monotonic() - started)
+            raise
+        self._record(success=True, latency=time.monotonic() - started)
+        return result
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                **stats,
+                "avg_latency_ms": round(self._total_latency / stats["successes"] * 1000, 1)
+                if stats["successes"] else None,
+                "timeout_s": self.timeout,
+            }
+
+
+def _twilio_failure(error: Exception) -> bool:
+    # A 4xx (wrong code, expired verification) is an answer, not an outage
+    status = getattr(error, "status", None)
+    return not (isinstance(status, int) and 400 <= status < 500)
+
+
+firebase_dependency = Dependency(
+    "firebase",
+    timeout=settings.FIREBASE_TIMEOUT,
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+)
+twilio_dependency = Dependency(
+    "twilio",
+    timeout=settings.TWILIO_TIMEOUT,
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+    is_failure=_twilio_failure,
+)
+
+DEPENDENCIES = {dependency.name: dependency for dependency in (firebase_dependency, twilio_dependency)}
@@ -0,0 +1,58 @@
+"""
+Fast JSON responses for large list endpoints.
+
+A dict returned from a route is walked by ``jsonable_encoder`` and then
+``json.dumps``; wrapping it in a ``*ServiceResponse(...).model_dump()`` first
+copies the whole structure once more. For list endpoints that return
+hundreds of rows this dominates the response time.
+
+List handlers should therefore build each row once as a plain dict (UUIDs,
+datetimes and dates can stay as objects) and return ``fast_response(...)``,
+which serialises the envelope directly with orjson. Single-object and error
+responses can keep using the service response models.
+"""
+
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    """Encode the types orjson does not support natively, as jsonable_encoder would."""
+    if isinstance(value, UUID):
+        # asyncpg returns its own UUID subclass, which orjson does not accept
+        return str(value)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; UUIDs and datetimes are encoded natively."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_response(
+    data: Any, message: str, status_code: int = 200, headers: Optional[dict] = None
+) -> FastJSONResponse:
+    """
+    Build the standard ``{"data", "message", "status_code"}`` envelope without
+    going through a response model. The HTTP status stays 200, like the other
+    endpoints, and the outcome is carried in ``status_code``.
+    """
+    return FastJSONResponse(
+        content={"data": data, "message": message, "status_code": status_code},
+        headers=headers
+    )
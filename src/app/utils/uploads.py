@@ -0,0 +1,112 @@
+"""
+Streaming writer for uploaded attachments.
+
+Every upload endpoint saves files with ``save_upload``. It copies the upload
+to disk in ``UPLOAD_CHUNK_SIZE`` pieces, so memory per upload stays at one
+chunk whatever the file size, hashes the content (SHA-256) on the way, and
+writes to a temporary file in the target directory that is renamed into
+place only when complete: readers never see a partial file and a failed
+upload leaves nothing behind.
+
+The stored name is always ``<prefix><uuid4><ext>``; the client's filename
+only contributes a sanitised extension, so it can not choose the path.
+
+Handlers call ``upload_size_error`` before doing any work to reject files
+over the limit up front (Starlette has already spooled the body and knows
+each file's size); ``save_upload`` enforces the same limit while streaming
+and raises ``UploadTooLarge``. Saved images get their thumbnails made in the
+background (see ``image_variants``).
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from typing import Iterable, NamedTuple, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from src.app.database.database import settings
+from src.app.utils.image_variants import schedule_variants
+
+_EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    filename: str
+    size: int
+    sha256: str
+
+
+def safe_extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(os.path.basename(filename or ""))[1]
+    return ext if _EXTENSION.match(ext) else ""
+
+
+def _limit_message(upload: UploadFile, max_bytes: int) -> str:
+    return f"File {upload.filename or ''} is larger than the {round(max_bytes / (1024 * 1024), 1):g} MB limit."
+
+
+def upload_size_error(uploads: Iterable[Optional[UploadFile]], max_bytes: Optional[int] = None) -> Optional[str]:
+    """Return an error message if any upload is known to exceed the limit."""
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    for upload in uploads:
+        if upload is not None and upload.size is not None and upload.size > max_bytes:
+            return _limit_message(upload, max_bytes)
+    return None
+
+
+def stream_to_temp_file(upload: UploadFile, directory: str, max_bytes: Optional[int] = None):
+    """
+    Copy ``upload`` into a new temporary file in ``directory``, chunk by chunk.
+    Returns ``(temp_path, size, sha256)``; the caller renames the file into place.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(_limit_message(upload, max_bytes))
+
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = upload.file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(_limit_message(upload, max_bytes))
+                digest.update(chunk)
+                buffer.write(chunk)
+        # mkstemp creates the file 0600; give it the usual permissions
+        os.chmod(temp_path, 0o644)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, size, digest.hexdigest()
+
+
+def save_upload(
+    upload: UploadFile,
+    upload_dir: str,
+    prefix: str = "",
+    max_bytes: Optional[int] = None,
+) -> StoredUpload:
+    """Stream ``upload`` into ``upload_dir`` under a new unique name."""
+    temp_path, size, sha256 = stream_to_temp_file(upload, upload_dir, max_bytes)
+    filename = f"{prefix}{str(uuid4())}{safe_extension(upload.filename)}"
+    path = os.path.join(upload_dir, filename)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    schedule_variants(path)
+    return StoredUpload(path=path, filename=filename, size=size, sha256=sha256)
@@ -0,0 +1,106 @@
+"""
+Working-day calendar for attendance analytics.
+
+Attendance runs a six-day week: every day except Sunday is a working day,
+unless it is a holiday (``Holiday`` rows, either global or for one project).
+
+For each year and set of holidays, the calendar builds a prefix count of
+the year's working days once and caches it: ``prefix[n]`` is the number of
+working days in the first ``n`` days of the year. Counting the working days
+between two dates in the same year is then one subtraction. A range across
+several years adds one cached year total for each year in between.
+"""
+
+import calendar
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from src.app.database.models import Holiday
+
+# Weekdays that are never worked (Monday = 0)
+WEEKLY_OFF = frozenset({calendar.SUNDAY})
+
+
+def _day_of_year(day: date) -> int:
+    return day.toordinal() - date(day.year, 1, 1).toordinal() + 1
+
+
+@lru_cache(maxsize=512)
+def _year_prefix(year: int, off_days: FrozenSet[int]) -> Tuple[int, ...]:
+    """Working days among the first n days of ``year``, for n = 0..days in year."""
+    first_weekday = date(year, 1, 1).weekday()
+    days = 366 if calendar.isleap(year) else 365
+    prefix = [0] * (days + 1)
+    count = 0
+    for day in range(days):
+        if (first_weekday + day) % 7 not in WEEKLY_OFF and day + 1 not in off_days:
+            count += 1
+        prefix[day + 1] = count
+    return tuple(prefix)
+
+
+class WorkingCalendar:
+    """Working days given a set of holidays."""
+
+    def __init__(self, holidays: Iterable[date] = ()):
+        off_days = defaultdict(set)
+        for holiday in holidays:
+            off_days[holiday.year].add(_day_of_year(holiday))
+        self._off_days = {year: frozenset(days) for year, days in off_days.items()}
+
+    def _prefix(self, year: int) -> Tuple[int, ...]:
+        return _year_prefix(year, self._off_days.get(year, frozenset()))
+
+    def working_days(self, start: date, end: date) -> int:
+        """Working days from ``start`` to ``end``, both included."""
+        if start > end:
+            return 0
+        first = self._prefix(start.year)
+        if start.year == end.year:
+            return first[_day_of_year(end)] - first[_day_of_year(start) - 1]
+        total = first[-1] - first[_day_of_year(start) - 1]
+        for year in range(start.year + 1, end.year):
+            total += self._prefix(year)[-1]
+        return total + self._prefix(end.year)[_day_of_year(end)]
+
+    def is_working_day(self, day: date) -> bool:
+        prefix = self._prefix(day.year)
+        index = _day_of_year(day)
+        return prefix[index] != prefix[index - 1]
+
+    def working_days_in_month(self, year: int, month: int) -> int:
+        days_in_month = calendar.monthrange(year, month)[1]
+        return self.working_days(date(year, month, 1), date(year, month, days_in_month))
+
+    def working_days_up_to(self, day: date) -> int:
+        """Working days from the first of ``day``'s month up to ``day``."""
+        return self.working_days(day.replace(day=1), day)
+
+
+def load_holidays(
+    db: Session,
+    start: date,
+    end: date,
+    project_id: Optional[UUID] = None,
+) -> List[date]:
+    """Global holidays between ``start`` and ``end``, plus ``project_id``'s own."""
+    query = db.query(Holiday.holiday_date).filter(
+        Holiday.holiday_date >= start,
+        Holiday.holiday_date <= end,
+        Holiday.is_deleted.is_(False),
+    )
+    if project_id:
+        query = query.filter(or_(Holiday.project_id.is_(None), Holiday.project_id == project_id))
+    else:
+        query = query.filter(Holiday.project_id.is_(None))
+    return [holiday_date for (holiday_date,) in query]
+
+
+def load_month_holidays(db: Session, year: int, month: int, project_id: Optional[UUID] = None) -> List[date]:
+    days_in_month = calendar.monthrange(year, month)[1]
+    return load_holidays(db, date(year, month, 1), date(year, month, days_in_month), project_id)
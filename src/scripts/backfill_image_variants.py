@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Create the thumbnail and medium variants (see src/app/utils/image_variants.py)
+for photos uploaded before variants were generated on upload.
+
+Walks ``uploads/`` (skipping the variants themselves and partial uploads) and
+decodes the images in a pool of worker processes, as resizing is CPU bound.
+Images that already have both variants are skipped, so the script can be
+stopped and run again; --overwrite regenerates everything, e.g. after the
+variant sizes or quality were changed. Run it from the directory holding
+``uploads/``.
+
+Usage:
+    python src/scripts/backfill_image_variants.py [--workers 4] [--overwrite] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.app.utils.image_variants import (  # noqa: E402
+    UPLOADS_ROOT,
+    VARIANT_SIZES,
+    VARIANTS_DIR,
+    generate_variants,
+    is_image,
+    variant_path,
+)
+
+
+def find_images(root: str = UPLOADS_ROOT):
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(
+            name for name in subdirectories
+            if not name.startswith(".") and os.path.join(directory, name) != VARIANTS_DIR
+        )
+        for filename in sorted(filenames):
+            if not filename.startswith(".") and is_image(filename):
+                yield os.path.join(directory, filename)
+
+
+def has_variants(path: str) -> bool:
+    return all(os.path.exists(variant_path(path, variant)) for variant in VARIANT_SIZES)
+
+
+def process(job):
+    path, overwrite = job
+    try:
+        return path, len(generate_variants(path, overwrite=overwrite)), None
+    except Exception as e:
+        return path, 0, str(e)
+
+
+def main(args):
+    stats = Counter()
+    todo = []
+    for path in find_images():
+        if not args.overwrite and has_variants(path):
+            stats["skipped"] += 1
+        else:
+            todo.append(path)
+    print(f"{len(todo)} images to process, {stats['skipped']} already done")
+
+    if not args.dry_run and todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            jobs = ((path, args.overwrite) for path in todo)
+            for path, written, error in pool.map(process, jobs, chunksize=16):
+                if error:
+                    stats["failed"] += 1
+                    print(f"  failed: {path}: {error}")
+                else:
+                    stats["processed"] += 1
+                    stats["variants_written"] += written
+
+    print(", ".join(f"{key}={value}" for key, value in sorted(stats.items())) or "nothing to do")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create thumbnails and medium variants for existing uploads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Images resized in parallel")
+    parser.add_argument("--overwrite", action="store_true", help="Regenerate variants that already exist")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the images that need variants")
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the hot read endpoints.
+
+Fires concurrent GET requests at a running API and reports requests per
+second and latency percentiles per endpoint. To compare the sync and async
+database paths, start the server at each revision with the same worker
+count and run this script against both with the same settings, e.g.
+
+    uvicorn src.app.main:app --workers 2 --port 8000
+    python src/scripts/benchmark_read_endpoints.py --base-url http://localhost:8000 \
+        --token <jwt> --concurrency 50 --requests 500
+
+Usage:
+    python src/scripts/benchmark_read_endpoints.py --token <jwt> [options]
+
+Requirements:
+    - httpx (already used by the test client)
+    - A valid access token for a user that can see the benchmarked data
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/payments?page=1",
+    "/payments?pending_request=true&page=1",
+    "/projects",
+    "/payments/items",
+    "/khatabook",
+    "/attendance/self/status",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> Dict:
+    """Send `total` requests to one endpoint with at most `concurrency` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200 or response.json().get("status_code", 200) >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def main(args):
+    headers = {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        # Warm up connection pools on both sides
+        for path in endpoints:
+            await client.get(path)
+
+        print(f"{'endpoint':45} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for path in endpoints:
+            result = await run_endpoint(client, path, args.requests, args.concurrency)
+            print(
+                f"{result['path']:45} {result['rps']:8.1f} {result['p50_ms']:8.1f} "
+                f"{result['p95_ms']:8.1f} {result['p99_ms']:8.1f} {result['errors']:7d}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot read endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer token used for every request")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--endpoint", action="append",
+        help="Endpoint path to benchmark (repeatable, defaults to the hot read endpoints)"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Serialisation benchmark for a large payments list response.
+
+Builds the same synthetic payments page (1,000 rows by default) the old way
+- a PaymentsResponse model per row, a PaymentServiceResponse envelope,
+``jsonable_encoder`` and ``JSONResponse`` - and the new way - plain dicts
+rendered by ``fast_response`` - and reports the time per response for each.
+No database or running server is needed.
+
+Usage:
+    python src/scripts/benchmark_serialization.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from src.app.schemas.payment_service_schemas import (  # noqa: E402
+    PaymentServiceResponse,
+    PaymentsResponse,
+    StatusDatePair,
+)
+from src.app.utils.responses import fast_response  # noqa: E402
+
+
+def make_rows(count: int):
+    """Synthetic rows shaped like the values assemble_payments_response reads."""
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        created = now - timedelta(hours=i)
+        rows.append({
+            "uuid": uuid4(),
+            "amount": 1000.0 + i,
+            "description": f"Cement and sand for block {i % 12}",
+            "project": {"uuid": str(uuid4()), "name": f"Project {i % 7}"},
+            "person": {"uuid": str(uuid4()), "name": f"Vendor {i % 40}"},
+            "payment_details": {
+                "person_uuid": str(uuid4()),
+                "name": f"Vendor {i % 40}",
+                "account_number": "123456789012",
+                "ifsc_code": "HDFC0001234",
+                "upi_number": None,
+            },
+            "created_by": {"uuid": str(uuid4()), "name": "Site Engineer"},
+            "files": [f"https://example.com/uploads/payments/{uuid4()}.jpg"],
+            "items": ["Cement", "Sand"],
+            "remarks": None,
+            "status_history": [
+                {"status": status, "date": created.strftime("%Y-%m-%d %H:%M:%S"),
+                 "created_by": "Site Engineer", "role": "SiteEngineer"}
+                for status in ("requested", "approved", "verified")
+            ],
+            "current_status": "verified",
+            "created_at": created.strftime("%Y-%m-%d"),
+            "update_remarks": None,
+            "latitude": 28.61,
+            "longitude": 77.21,
+            "transferred_date": None,
+            "payment_history": [],
+        })
+    return rows
+
+
+EXTRA_FIELDS = {
+    "priority_name": "High",
+    "edit": False,
+    "decline_remark": None,
+    "approval_files": [],
+    "transferred_from_bank": None,
+    "payment_type": None,
+}
+
+
+def old_path(rows) -> bytes:
+    records = []
+    for row in rows:
+        fields = dict(row, status_history=[StatusDatePair(**h) for h in row["status_history"]])
+        records.append({**PaymentsResponse(**fields).model_dump(), **EXTRA_FIELDS})
+    content = PaymentServiceResponse(
+        data={"records": records, "total_count": len(records)},
+        message="All payments fetched successfully.",
+        status_code=200,
+    ).model_dump()
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def new_path(rows) -> bytes:
+    records = [{**row, **EXTRA_FIELDS} for row in rows]
+    return fast_response(
+        data={"records": records, "total_count": len(records)},
+        message="All payments fetched successfully.",
+    ).body
+
+
+def measure(fn, rows, repeat: int) -> float:
+    fn(rows)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(rows)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(args):
+    rows = make_rows(args.rows)
+    assert json.loads(old_path(rows)) == json.loads(new_path(rows)), "outputs differ"
+
+    old = measure(old_path, rows, args.repeat)
+    new = measure(new_path, rows, args.repeat)
+    print(f"{args.rows} payments, {len(new_path(rows)) / 1024:.0f} KiB per response")
+    print(f"models + jsonable_encoder + json : {old * 1000:8.2f} ms")
+    print(f"plain dicts + orjson             : {new * 1000:8.2f} ms")
+    print(f"speed-up                         : {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list response serialisation")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Working-day calendar benchmark.
+
+Counts working days the old way - a ``date`` per day, checked one by one -
+and with ``WorkingCalendar`` (cached per-year prefix counts), for every month
+of 2020-2030 and for random ranges of up to two years, with a handful of
+holidays. Checks that both agree and reports the time per query for each.
+No database is needed.
+
+Usage:
+    python src/scripts/benchmark_working_days.py [--ranges 2000] [--repeat 5]
+"""
+
+import argparse
+import calendar
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.app.utils.working_calendar import WorkingCalendar  # noqa: E402
+
+HOLIDAYS = [
+    date(year, month, day)
+    for year in range(2020, 2031)
+    for month, day in ((1, 26), (8, 15), (10, 2), (11, 1), (12, 25))
+]
+
+
+def old_working_days(start: date, end: date, holidays: set) -> int:
+    count = 0
+    current = start
+    while current <= end:
+        if current.weekday() != 6 and current not in holidays:
+            count += 1
+        current += timedelta(days=1)
+    return count
+
+
+def make_queries(ranges: int):
+    months = []
+    for year in range(2020, 2031):
+        for month in range(1, 13):
+            months.append((date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])))
+    rng = random.Random(42)
+    spans = []
+    for _ in range(ranges):
+        start = date(2020, 1, 1) + timedelta(days=rng.randrange(3650))
+        spans.append((start, start + timedelta(days=rng.randrange(730))))
+    return months, spans
+
+
+def measure(fn, queries, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for start, end in queries:
+            fn(start, end)
+    return (time.perf_counter() - started) / (repeat * len(queries))
+
+
+def main(args):
+    holiday_set = set(HOLIDAYS)
+    working_calendar = WorkingCalendar(HOLIDAYS)
+    months, spans = make_queries(args.ranges)
+    for start, end in months + spans:
+        assert old_working_days(start, end, holiday_set) == working_calendar.working_days(start, end), (start, end)
+
+    def old(start, end):
+        return old_working_days(start, end, holiday_set)
+
+    for label, queries in (("month", months), ("range (<= 2 years)", spans)):
+        before = measure(old, queries, args.repeat)
+        after = measure(working_calendar.working_days, queries, args.repeat)
+        print(f"{label}: {len(queries)} queries")
+        print(f"  day by day      : {before * 1e6:9.2f} us")
+        print(f"  prefix counts   : {after * 1e6:9.2f} us")
+        print(f"  speed-up        : {before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark working-day counting")
+    parser.add_argument("--ranges", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Move existing payment, khatabook and invoice attachments into the
+content-addressed store (see src/app/utils/attachment_store.py) and point
+their rows at the new paths.
+
+Files are hashed and rehomed by a pool of worker threads: hard-linked into
+the store when it is on the same filesystem, copied otherwise. Identical
+files collapse into one blob. Each table's ``file_path`` values are then
+rewritten in batches, one transaction per batch. Originals are only deleted
+with --remove-originals, once every table has been rewritten. Running it
+again only picks up paths that are not in the store yet.
+
+Usage:
+    python src/scripts/migrate_attachments_to_store.py [--workers 8] [--batch-size 500]
+        [--dry-run] [--remove-originals] [--gc]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import bindparam, update  # noqa: E402
+from src.app.database.change_counters import bump_change_counters  # noqa: E402
+from src.app.database.database import SessionLocal, settings  # noqa: E402
+from src.app.database.models import Invoice, KhatabookFile, PaymentFile  # noqa: E402
+from src.app.schemas import constants  # noqa: E402
+from src.app.utils.attachment_store import (  # noqa: E402
+    STORE_TEMP_DIR,
+    add_blob,
+    blob_path,
+    remove_unreferenced,
+)
+from src.app.utils.uploads import safe_extension  # noqa: E402
+
+# Model and, where rows only kept a file name, the folder the file is served from
+SOURCES = (
+    (PaymentFile, None),
+    (KhatabookFile, constants.KHATABOOK_FOLDER),
+    (Invoice, None),
+)
+
+
+def source_file(stored_path: str, folder: str = None) -> str:
+    if folder:
+        return os.path.join(folder, os.path.basename(stored_path))
+    return stored_path
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rehome(source: str, dry_run: bool = False):
+    """Put ``source`` in the store; returns ``(store_path, already_stored)``."""
+    if not os.path.isfile(source):
+        return None, False
+    sha256 = hash_file(source)
+    ext = safe_extension(source)
+    target = blob_path(sha256, ext)
+    if os.path.exists(target) or dry_run:
+        return target, os.path.exists(target)
+
+    os.makedirs(STORE_TEMP_DIR, exist_ok=True)
+    temp_path = os.path.join(STORE_TEMP_DIR, f".migrate-{uuid4()}")
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    add_blob(temp_path, sha256, ext)
+    return target, False
+
+
+def rewrite_paths(db, model, mapping: dict, batch_size: int):
+    table = model.__table__
+    statement = (
+        update(table)
+        .where(table.c.file_path == bindparam("old_path"))
+        .values(file_path=bindparam("new_path"))
+    )
+    items = list(mapping.items())
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        connection = db.connection()
+        connection.execute(statement, [{"old_path": old, "new_path": new} for old, new in batch])
+        bump_change_counters(connection, [table.name])
+        db.commit()
+
+
+def main(args):
+    db = SessionLocal()
+    stats = Counter()
+    originals = set()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for model, folder in SOURCES:
+                column = model.file_path
+                paths = [
+                    path for (path,) in db.query(column).filter(
+                        column.isnot(None),
+                        column != "",
+                        ~column.like(f"{constants.ATTACHMENT_STORE_DIR}/%")
+                    ).distinct()
+                ]
+                db.rollback()
+                sources = [source_file(path, folder) for path in paths]
+                results = pool.map(lambda source: rehome(source, args.dry_run), sources)
+
+                mapping = {}
+                for path, source, (new_path, already_stored) in zip(paths, sources, results):
+                    if new_path is None:
+                        stats["missing"] += 1
+                        print(f"  missing: {model.__tablename__} {path}")
+                        continue
+                    mapping[path] = new_path
+                    originals.add(source)
+                    stats["deduplicated" if already_stored else "stored"] += 1
+
+                print(f"{model.__tablename__}: {len(mapping)} of {len(paths)} paths rehomed")
+                if not args.dry_run:
+                    rewrite_paths(db, model, mapping, args.batch_size)
+
+        if args.remove_originals and not args.dry_run:
+            for source in originals:
+                if os.path.exists(source):
+                    os.remove(source)
+                    stats["originals_removed"] += 1
+
+        if args.gc:
+            removed = remove_unreferenced(db, dry_run=args.dry_run)
+            stats["unreferenced_removed"] = len(removed)
+    finally:
+        db.close()
+
+    print(", ".join(f"{key}={value}" for key, value in sorted(stats.items())) or "nothing to do")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move attachments into the content-addressed store")
+    parser.add_argument("--workers", type=int, default=8, help="Files hashed and moved in parallel")
+    parser.add_argument("--batch-size", type=int, default=500, help="Path updates per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--remove-originals", action="store_true", help="Delete the old files after the rows are updated")
+    parser.add_argument("--gc", action="store_true", help="Also delete store blobs no row references")
+    main(parser.parse_args())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Cross-check the files the database references against ``uploads/``.
+
+Reports
+  * missing files: rows whose file is not on disk, and
+  * orphans: files under ``uploads/`` that no row references,
+and with --quarantine moves orphans out of ``uploads/`` (keeping their
+relative path) so they can be inspected or restored before being deleted.
+
+References are read column by column in batches with a server-side cursor
+(PaymentFile, KhatabookFile, ProjectPO, Invoice, ProjectAttendance,
+Machinery, MachineryPhotos, User photos and company logos). Existence
+checks and the directory walk run on a thread pool, so the scan is bound by
+the filesystem rather than by round trips. Derived files (image variants),
+partial uploads and --exclude'd directories are not scanned, and files
+younger than --min-age are never orphans: their upload may not have
+committed yet.
+
+With --checkpoint, every directory whose orphans have been handled is
+appended to the checkpoint file and skipped when the command is run again,
+so a quarantine of a very large tree can be stopped and resumed. Delete the
+file to start over.
+
+Run it from the directory holding ``uploads/``.
+
+Usage:
+    python src/scripts/scan_uploads.py [--workers 16] [--batch-size 5000] [--report scan.csv]
+        [--quarantine DIR] [--checkpoint FILE] [--min-age 3600] [--exclude play_store]
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Set, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from src.app.database.database import SessionLocal  # noqa: E402
+from src.app.database.models import (  # noqa: E402
+    CompanyInfo,
+    Invoice,
+    KhatabookFile,
+    Machinery,
+    MachineryPhotos,
+    PaymentFile,
+    ProjectAttendance,
+    ProjectPO,
+    User,
+)
+from src.app.schemas import constants  # noqa: E402
+from src.app.utils.image_variants import UPLOADS_ROOT, VARIANTS_DIR, remove_variants  # noqa: E402
+
+# Column holding a file reference and, where rows only kept a file name,
+# the folder the file lives in
+REFERENCES = (
+    (PaymentFile.file_path, None),
+    (KhatabookFile.file_path, constants.KHATABOOK_FOLDER),
+    (ProjectPO.file_path, None),
+    (Invoice.file_path, None),
+    (ProjectAttendance.photo_path, None),
+    (Machinery.photo_path, None),
+    (MachineryPhotos.photo_path, None),
+    (User.photo_path, None),
+    (CompanyInfo.logo_photo_url, None),
+)
+
+# Directories under uploads/ that hold no referenced files
+SKIPPED_DIRS = (VARIANTS_DIR,)
+
+
+def normalise(value: str, folder: str = None) -> str:
+    """Path (relative to the working directory) of a stored file reference."""
+    if "://" in value:
+        # Some rows keep the public URL, e.g. user photos
+        value = urlparse(value).path
+    value = value.lstrip("/")
+    if not value.startswith(UPLOADS_ROOT + "/") and folder:
+        return os.path.join(folder, os.path.basename(value))
+    return os.path.normpath(value)
+
+
+def read_references(db, batch_size: int) -> Iterator[Tuple[str, int, str]]:
+    """``(table, row id, path)`` for every file reference, in batches."""
+    for column, folder in REFERENCES:
+        model = column.class_
+        query = (
+            db.query(model.id, column)
+            .filter(column.isnot(None), column != "")
+            .execution_options(yield_per=batch_size)
+        )
+        for row_id, value in query:
+            yield model.__tablename__, row_id, normalise(value, folder)
+
+
+def scan_directory(directory: str, skipped: Set[str]) -> Tuple[List[str], List[os.DirEntry]]:
+    """Subdirectories and files of ``directory`` (no stat calls on Linux)."""
+    subdirectories, files = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.path not in skipped:
+                    subdirectories.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                files.append(entry)
+    return subdirectories, files
+
+
+def walk(pool: ThreadPoolExecutor, root: str, skipped: Set[str]) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+    """``(directory, files)`` for every directory under ``root``, listed in parallel."""
+    pending = deque([(root, pool.submit(scan_directory, root, skipped))])
+    while pending:
+        directory, future = pending.popleft()
+        subdirectories, files = future.result()
+        pending.extend(
+            (subdirectory, pool.submit(scan_directory, subdirectory, skipped))
+            for subdirectory in sorted(subdirectories)
+        )
+        yield directory, files
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def quarantine_file(path: str, target_root: str):
+    target = os.path.join(target_root, os.path.relpath(path, UPLOADS_ROOT))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(path, target)
+    remove_variants(path)
+
+
+def main(args):
+    skipped = set(SKIPPED_DIRS) | {os.path.join(UPLOADS_ROOT, name) for name in args.exclude}
+    if args.quarantine and not os.path.relpath(os.path.abspath(args.quarantine), os.path.abspath(UPLOADS_ROOT)).startswith(".."):
+        sys.exit("--quarantine must be outside uploads/, or orphans would stay public")
+    stats = Counter()
+    report = open(args.report, "w", newline="") if args.report else None
+    writer = csv.writer(report) if report else None
+    if writer:
+        writer.writerow(["kind", "table", "row_id", "path", "size"])
+
+    db = SessionLocal()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            # 1. Every referenced path, and whether it exists
+            referenced: Dict[str, List[Tuple[str, int]]] = {}
+            for table, row_id, path in read_references(db, args.batch_size):
+                referenced.setdefault(path, []).append((table, row_id))
+                stats["references"] += 1
+            db.rollback()
+
+            paths = list(referenced)
+            for path, exists in zip(paths, pool.map(os.path.isfile, paths, chunksize=256)):
+                if exists:
+                    continue
+                for table, row_id in referenced[path]:
+                    stats["missing"] += 1
+                    print(f"  missing: {table} #{row_id} {path}")
+                    if writer:
+                        writer.writerow(["missing", table, row_id, path, ""])
+
+            # 2. Every file on disk that nothing references
+            done = load_checkpoint(args.checkpoint)
+            checkpoint = open(args.checkpoint, "a") if args.checkpoint else None
+            cutoff = time.time() - args.min_age
+            try:
+                for directory, files in walk(pool, UPLOADS_ROOT, skipped):
+                    if directory in done:
+                        stats["directories_resumed"] += 1
+                        continue
+                    candidates = [entry for entry in files if os.path.normpath(entry.path) not in referenced]
+                    stats["files"] += len(files)
+                    for entry, stat_result in zip(candidates, pool.map(lambda e: e.stat(), candidates)):
+                        if stat_result.st_mtime > cutoff:
+                            stats["recent_skipped"] += 1
+                            continue
+                        stats["orphans"] += 1
+                        stats["orphan_bytes"] += stat_result.st_size
+                        if writer:
+                            writer.writerow(["orphan", "", "", entry.path, stat_result.st_size])
+                        if args.quarantine:
+                            quarantine_file(entry.path, args.quarantine)
+                            stats["quarantined"] += 1
+                    if checkpoint:
+                        checkpoint.write(directory + "\n")
+                        checkpoint.flush()
+            finally:
+                if checkpoint:
+                    checkpoint.close()
+    finally:
+        db.close()
+        if report:
+            report.close()
+
+    print(", ".join(f"{key}={value}" for key, value in sorted(stats.items())) or "nothing to do")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report missing and unreferenced upload files")
+    parser.add_argument("--workers", type=int, default=16, help="Threads for directory listings and stat calls")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows fetched per database round trip")
+    parser.add_argument("--report", help="Write every missing file and orphan to this CSV")
+    parser.add_argument("--quarantine", help="Move orphans into this directory (outside uploads/)")
+    parser.add_argument("--checkpoint", help="Record finished directories here and skip them on the next run")
+    parser.add_argument("--min-age", type=float, default=3600.0, help="Seconds before an unreferenced file counts as an orphan")
+    parser.add_argument("--exclude", nargs="*", default=["play_store"], help="Directories under uploads/ to leave alone")
+    main(parser.parse_args())